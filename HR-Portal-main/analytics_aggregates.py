@@ -0,0 +1,238 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from functools import lru_cache
+import threading
+
+# Headline counters of /api/analytics: name -> (column, value)
+STATUS_COUNTERS = {
+    'total_rejected': ('Application Status', 'Rejected'),
+    'no_response': ('Application Status', 'No Resp Call/Email'),
+    'not_interviewed': ('Interview Status', 'Applied'),  # Assuming 'Applied' means not yet interviewed
+    'total_round_2_completed': ('Interview Status', 'Tech Inter Comp'),  # Assuming Tech Inter Comp is Round 2
+    'did_not_join': ('Application Status', 'Did Not Join'),
+    'on_hold': ('Application Status', 'On Hold'),
+    'accepted_waiting_reference': ('Application Status', 'Accepted'),
+    'total_in_notice_yet_to_join': ('Application Status', 'In Notice'),
+    'total_joined': ('Application Status', 'Joined'),
+    'intern': ('Interested Position', 'Intern')  # Assuming 'Intern' is a position
+}
+
+# Application statuses broken out in the monthly statistics
+MONTHLY_STATUS_KEYS = {
+    'Accepted': 'accepted',
+    'Rejected': 'rejected',
+    'In Notice': 'in_notice',
+    'Joined': 'joined'
+}
+
+# Column holding the application date ('YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS')
+DATE_FIELD = 'Date'
+
+# Month buckets are keyed 'YYYY-MM', which sorts chronologically; this is how they are shown
+MONTH_LABEL_FORMAT = '%b %Y'
+
+
+# Compute the analytics payload with a full pass over every record
+def compute_analytics(data):
+    """Reference implementation, used to verify the maintained aggregates"""
+    total_applicant = len(data)
+    total_rejected = sum(1 for item in data if item.get('Application Status') == 'Rejected')
+    no_response = sum(1 for item in data if item.get('Application Status') == 'No Resp Call/Email')
+    not_interviewed = sum(1 for item in data if item.get('Interview Status') == 'Applied') # Assuming 'Applied' means not yet interviewed
+
+    total_round_2_completed = sum(1 for item in data if item.get('Interview Status') == 'Tech Inter Comp') # Assuming Tech Inter Comp is Round 2
+    did_not_join = sum(1 for item in data if item.get('Application Status') == 'Did Not Join')
+    on_hold = sum(1 for item in data if item.get('Application Status') == 'On Hold')
+    accepted_waiting_reference = sum(1 for item in data if item.get('Application Status') == 'Accepted')
+    total_in_notice_yet_to_join = sum(1 for item in data if item.get('Application Status') == 'In Notice')
+    total_joined = sum(1 for item in data if item.get('Application Status') == 'Joined')
+    intern = sum(1 for item in data if item.get('Interested Position') == 'Intern') # Assuming 'Intern' is a position
+
+    # Monthly Statistics
+    monthly_stats = defaultdict(lambda: {"applicants": 0, "accepted": 0, "rejected": 0, "in_notice": 0, "joined": 0})
+    for item in data:
+        month = record_month(item)
+        if month:
+            monthly_stats[month]["applicants"] += 1
+            status = item.get('Application Status')
+            if status in MONTHLY_STATUS_KEYS:
+                monthly_stats[month][MONTHLY_STATUS_KEYS[status]] += 1
+
+    # Sort monthly statistics by date
+    sorted_monthly_stats = []
+    for month in sorted(monthly_stats):
+        stats = monthly_stats[month]
+        sorted_monthly_stats.append({
+            "month": month_label(month),
+            "applicants": stats["applicants"],
+            "accepted": stats["accepted"],
+            "rejected": stats["rejected"],
+            "in_notice": stats["in_notice"],
+            "joined": stats["joined"]
+        })
+
+    # Hiring Funnel Status by Role
+    hiring_funnel_by_role = defaultdict(lambda: {"count": 0})
+    for item in data:
+        role = item.get('Interested Position')
+        if role:
+            hiring_funnel_by_role[role]["count"] += 1
+
+    sorted_hiring_funnel_by_role = [{"role": role, "count": stats["count"]} for role, stats in hiring_funnel_by_role.items()]
+
+    # Position Statistics
+    position_stats = defaultdict(lambda: {"applied": 0, "joined": 0})
+    for item in data:
+        position = item.get('Interested Position')
+        if position:
+            position_stats[position]["applied"] += 1
+            if item.get('Application Status') == 'Joined':
+                position_stats[position]["joined"] += 1
+
+    sorted_position_stats = [{"position": pos, "applied": stats["applied"], "joined": stats["joined"]} for pos, stats in position_stats.items()]
+
+    return {
+        'total_applicant': total_applicant,
+        'total_rejected': total_rejected,
+        'no_response': no_response,
+        'not_interviewed': not_interviewed,
+        'total_round_2_completed': total_round_2_completed,
+        'did_not_join': did_not_join,
+        'on_hold': on_hold,
+        'accepted_waiting_reference': accepted_waiting_reference,
+        'total_in_notice_yet_to_join': total_in_notice_yet_to_join,
+        'total_joined': total_joined,
+        'intern': intern,
+        'monthly_statistics': sorted_monthly_stats,
+        'hiring_funnel_by_role': sorted_hiring_funnel_by_role,
+        'position_statistics': sorted_position_stats
+    }
+
+
+# Month bucket ('2025-11') of a date cell, parsed once per distinct day
+@lru_cache(maxsize=4096)
+def date_month(day):
+    try:
+        return datetime.strptime(day, '%Y-%m-%d').strftime('%Y-%m')
+    except ValueError:
+        return None
+
+
+# Month bucket ('2025-11') of a record, or None if it has no usable date
+def record_month(item):
+    date_str = item.get(DATE_FIELD)
+    if not date_str:
+        return None
+    # Only the day matters, and rows of the same day share it
+    return date_month(str(date_str)[:10])
+
+
+# Display label ('Nov 2025') of a month bucket
+def month_label(month):
+    return datetime.strptime(month, '%Y-%m').strftime(MONTH_LABEL_FORMAT)
+
+
+class AnalyticsAggregates:
+    """Running totals behind /api/analytics.
+
+    Registered as a CandidateStore listener: rebuilt once per load and then
+    adjusted for every added, updated or deleted record, so serving the
+    analytics never needs another pass over the data.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.total = 0
+        self.column_counts = {column: Counter() for column in ('Application Status', 'Interview Status', 'Interested Position')}
+        self.monthly = defaultdict(Counter)
+        self.month_keys = {}
+        self.position_joined = Counter()
+
+    def _add(self, item, sign):
+        self.total += sign
+        for column, counts in self.column_counts.items():
+            counts[item.get(column)] += sign
+
+        status = item.get('Application Status')
+        position = item.get('Interested Position')
+        if position and status == 'Joined':
+            self.position_joined[position] += sign
+
+        month = record_month(item)
+        if month:
+            stats = self.monthly[month]
+            stats['applicants'] += sign
+            if status in MONTHLY_STATUS_KEYS:
+                stats[MONTHLY_STATUS_KEYS[status]] += sign
+            if stats['applicants'] <= 0:
+                del self.monthly[month]
+
+    def reset(self, rows):
+        """Rebuild every counter from the given rows"""
+        with self._lock:
+            self._clear()
+            for item in rows:
+                self._add(item, 1)
+
+    def apply(self, old, new):
+        """Move one record from its old values to its new ones"""
+        with self._lock:
+            if old is not None:
+                self._add(old, -1)
+            if new is not None:
+                self._add(new, 1)
+
+    def snapshot(self):
+        """Return the /api/analytics payload from the running totals"""
+        with self._lock:
+            result = {'total_applicant': self.total}
+            for name, (column, value) in STATUS_COUNTERS.items():
+                result[name] = self.column_counts[column][value]
+
+            result['monthly_statistics'] = [
+                {
+                    "month": month_label(month),
+                    "applicants": stats['applicants'],
+                    "accepted": stats['accepted'],
+                    "rejected": stats['rejected'],
+                    "in_notice": stats['in_notice'],
+                    "joined": stats['joined']
+                }
+                for month, stats in sorted(self.monthly.items())
+            ]
+
+            positions = [(position, count) for position, count in self.column_counts['Interested Position'].items() if position and count > 0]
+            result['hiring_funnel_by_role'] = [{"role": position, "count": count} for position, count in positions]
+            result['position_statistics'] = [
+                {"position": position, "applied": count, "joined": self.position_joined[position]}
+                for position, count in positions
+            ]
+            return result
+
+    def counts(self):
+        """Return {'total': n, column: {value: n}} of the status, stage and position columns"""
+        with self._lock:
+            result = {'total': self.total}
+            for column, counts in self.column_counts.items():
+                result[column] = {value: count for value, count in counts.items() if value and count > 0}
+            return result
+
+    def verify(self, rows):
+        """Recompute from scratch and report every value that drifted"""
+        maintained = self.snapshot()
+        recomputed = compute_analytics(rows)
+        drift = {}
+        for key, expected in recomputed.items():
+            actual = maintained.get(key)
+            # List order of the per-role/position/month stats is not significant
+            if isinstance(expected, list):
+                expected_set = sorted(expected, key=lambda entry: sorted(entry.items()))
+                actual_set = sorted(actual or [], key=lambda entry: sorted(entry.items()))
+                if expected_set != actual_set:
+                    drift[key] = {'maintained': actual, 'recomputed': expected}
+            elif actual != expected:
+                drift[key] = {'maintained': actual, 'recomputed': expected}
+        return drift
@@ -0,0 +1,264 @@
+from collections import OrderedDict
+from datetime import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+from analytics_aggregates import DATE_FIELD, MONTH_LABEL_FORMAT, MONTHLY_STATUS_KEYS, STATUS_COUNTERS
+from dropdown_options import DROPDOWN_OPTIONS
+from group_analysis import CTC_FIELDS, MAX_CACHED_RESULTS
+from metrics import stage
+
+# Categorical columns kept as pandas categories: few distinct values repeated on every row
+CATEGORY_FIELDS = ['Application Status', 'Interview Status', 'Interested Position']
+
+# Interview stages in pipeline order; a candidate at one stage has passed every earlier one
+FUNNEL_STAGES = DROPDOWN_OPTIONS['Interview Status']
+
+# Quantiles reported for each CTC column
+CTC_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Number of equal-width histogram bins of each CTC column
+CTC_HISTOGRAM_BINS = 10
+
+
+# Engine-only parts of the /api/analytics payload, by ?sections= name
+REPORT_SECTIONS = {
+    'weekly': ['weekly_statistics'],
+    'funnel': ['funnel', 'position_funnel'],
+    'conversion': ['conversion'],
+    'ctc': ['ctc_distribution']
+}
+
+
+# Turn a NumPy/pandas scalar into a plain int or float for JSON
+def plain_number(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+# Read the ?sections= list of an analytics request
+def section_args(args):
+    """Return the requested REPORT_SECTIONS names ('all' for every one); raise ValueError on an unknown name"""
+    names = [name.strip() for name in args.get('sections', '').split(',') if name.strip()]
+    if 'all' in names:
+        return list(REPORT_SECTIONS)
+    unknown = [name for name in names if name not in REPORT_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown analytics sections: {', '.join(unknown)} (expected {', '.join(REPORT_SECTIONS)} or all)")
+    return names
+
+
+# Read the ?from= and ?to= date range of an analytics request
+def date_range_args(args):
+    """Return (start, end) as dates, None where not given; raise ValueError on a bad date or range"""
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name, '').strip()
+        try:
+            bounds.append(datetime.strptime(value, '%Y-%m-%d').date() if value else None)
+        except ValueError:
+            raise ValueError(f"{name} must be a date like 2025-01-31")
+    start, end = bounds
+    if start and end and start > end:
+        raise ValueError("from must not be after to")
+    return start, end
+
+
+# Build the typed columns of the analytics from the store rows
+def build_frame(rows):
+    """Return a DataFrame with one row per record.
+
+    date is a datetime64 column (NaT when the cell is blank or not a date),
+    the status and position columns are categoricals, and the CTC columns
+    are float64 (NaN for blanks and text).
+    """
+    columns = {field: [row.get(field) or None for row in rows] for field in CATEGORY_FIELDS}
+    frame = pd.DataFrame({field: pd.Categorical(values) for field, values in columns.items()})
+    frame['date'] = pd.to_datetime(pd.Series([row.get(DATE_FIELD) or None for row in rows], dtype='object'),
+                                   format='ISO8601', errors='coerce')
+    for field in CTC_FIELDS:
+        values = [row.get(field) for row in rows]
+        frame[field] = pd.to_numeric(pd.Series([str(value).replace(',', '') if value else None for value in values], dtype='object'),
+                                     errors='coerce')
+    return frame
+
+
+# Applicants and the broken-out statuses per period of the date column
+def period_statistics(frame, frequency, key, label):
+    """Return [{key: label(period), 'applicants': n, 'accepted': n, ...}] in date order"""
+    dated = frame[frame['date'].notna()]
+    if dated.empty:
+        return []
+    period_codes, periods = pd.factorize(dated['date'].dt.to_period(frequency), sort=True)
+    status_codes = pd.Categorical(dated['Application Status'].astype(object), categories=list(MONTHLY_STATUS_KEYS)).codes
+    applicants = np.bincount(period_codes, minlength=len(periods))
+    # One bincount over (period, status) pairs gives the whole table
+    known = status_codes >= 0
+    broken_out = np.bincount(period_codes[known] * len(MONTHLY_STATUS_KEYS) + status_codes[known],
+                             minlength=len(periods) * len(MONTHLY_STATUS_KEYS)).reshape(len(periods), -1)
+    names = list(MONTHLY_STATUS_KEYS.values())
+    return [
+        {key: label(period), 'applicants': int(total), **dict(zip(names, map(int, row)))}
+        for period, total, row in zip(periods, applicants, broken_out)
+    ]
+
+
+# Candidates who reached each interview stage, overall and per position
+def funnel_statistics(frame):
+    """Return (funnel, position_funnel).
+
+    A candidate counts towards their current stage and every stage before
+    it. conversion is the share of the previous stage that reached this one.
+    """
+    stage_codes = pd.Categorical(frame['Interview Status'].astype(object), categories=FUNNEL_STAGES).codes
+    positions = frame['Interested Position'].cat.remove_unused_categories()
+    known = stage_codes >= 0
+    # [position, stage] counts in one pass, then "reached" is the sum over later stages
+    # Candidates without a position (code -1) go to an extra last row
+    position_codes = positions.cat.codes.to_numpy().astype(np.int64) % (len(positions.cat.categories) + 1)
+    counts = np.bincount(position_codes[known] * len(FUNNEL_STAGES) + stage_codes[known],
+                         minlength=(len(positions.cat.categories) + 1) * len(FUNNEL_STAGES)).reshape(-1, len(FUNNEL_STAGES))
+    reached = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+
+    def stages(row):
+        previous = np.concatenate(([row[0]], row[:-1]))
+        conversion = np.divide(row, previous, out=np.zeros(len(row)), where=previous > 0)
+        return [{'stage': name, 'reached': int(count), 'conversion': round(float(rate), 4)}
+                for name, count, rate in zip(FUNNEL_STAGES, row, conversion)]
+
+    position_counts = positions.value_counts()
+    position_funnel = [
+        {'position': position, 'applied': int(position_counts[position]), 'stages': stages(reached[code])}
+        for code, position in enumerate(positions.cat.categories)
+    ]
+    return stages(reached.sum(axis=0)), position_funnel
+
+
+# Share of candidates in each application status, overall and per position
+def conversion_rates(frame):
+    total = len(frame)
+    status = frame['Application Status'].astype(object).fillna('')
+    overall = status.value_counts()
+    result = {
+        'joined_rate': round(float(overall.get('Joined', 0)) / total, 4) if total else 0.0,
+        'rejected_rate': round(float(overall.get('Rejected', 0)) / total, 4) if total else 0.0,
+        'offer_rate': round(float((frame['Interview Status'].astype(object) == 'Offer').mean()), 4) if total else 0.0
+    }
+    positions = frame['Interested Position'].cat.remove_unused_categories()
+    joined = (status == 'Joined').groupby(positions, observed=True).agg(['sum', 'count'])
+    result['by_position'] = [
+        {'position': position, 'applied': int(row['count']), 'joined': int(row['sum']),
+         'joined_rate': round(float(row['sum']) / row['count'], 4)}
+        for position, row in joined.iterrows()
+    ]
+    return result
+
+
+# Quantiles and a histogram of the numeric values of each CTC column
+def ctc_distribution(frame):
+    result = {}
+    for field in CTC_FIELDS:
+        values = frame[field].dropna().to_numpy()
+        if not len(values):
+            result[field] = {'count': 0}
+            continue
+        counts, edges = np.histogram(values, bins=CTC_HISTOGRAM_BINS)
+        result[field] = {
+            'count': int(len(values)),
+            'mean': float(values.mean()),
+            'std': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'quantiles': {f'p{round(q * 100)}': float(v) for q, v in zip(CTC_QUANTILES, np.quantile(values, CTC_QUANTILES))},
+            'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()}
+        }
+    return result
+
+
+# The full analytics payload of one slice of the frame
+def analytics_report(frame):
+    """Return the /api/analytics payload computed from the frame, plus the
+    weekly, funnel, conversion and CTC sections"""
+    result = {'total_applicant': len(frame)}
+    value_counts = {field: frame[field].value_counts() for field in CATEGORY_FIELDS}
+    for name, (column, value) in STATUS_COUNTERS.items():
+        result[name] = plain_number(value_counts[column].get(value, 0))
+
+    result['monthly_statistics'] = period_statistics(frame, 'M', 'month', lambda period: period.strftime(MONTH_LABEL_FORMAT))
+    # Weeks start on Monday and are labelled with that day
+    result['weekly_statistics'] = period_statistics(frame, 'W-SUN', 'week', lambda period: period.start_time.strftime('%Y-%m-%d'))
+
+    positions = value_counts['Interested Position']
+    positions = positions[positions > 0]
+    joined = frame.loc[frame['Application Status'] == 'Joined', 'Interested Position'].value_counts()
+    result['hiring_funnel_by_role'] = [{'role': position, 'count': int(count)} for position, count in positions.items()]
+    result['position_statistics'] = [
+        {'position': position, 'applied': int(count), 'joined': int(joined.get(position, 0))}
+        for position, count in positions.items()
+    ]
+
+    result['funnel'], result['position_funnel'] = funnel_statistics(frame)
+    result['conversion'] = conversion_rates(frame)
+    result['ctc_distribution'] = ctc_distribution(frame)
+    return result
+
+
+class AnalyticsEngine:
+    """Columnar analytics built once per dataset version.
+
+    The store rows are turned into typed pandas columns (parsed dates,
+    categorical statuses, numeric CTCs) on first use after a change, and
+    every report is then a handful of vectorized group-bys over them.
+    Reports are memoized per date range until the store's version changes.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._version = None
+        self._frame = None
+        self._results = OrderedDict()
+
+    def frame(self):
+        """Return (frame, version) for the store's current rows"""
+        with self._build_lock:
+            rows, version = self.store.snapshot()
+            with self._lock:
+                if version == self._version:
+                    return self._frame, version
+            with stage('analytics_frame'):
+                frame = build_frame(rows)
+            with self._lock:
+                self._frame, self._version = frame, version
+                self._results.clear()
+            return frame, version
+
+    def report(self, start=None, end=None):
+        """Return the analytics of the candidates who applied between start and end.
+
+        start and end are dates (either may be None for an open range); end
+        is inclusive. Rows without a usable date are only counted when no
+        range is given.
+        """
+        frame, version = self.frame()
+        key = (start, end)
+        with self._lock:
+            if version == self._version and key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        with stage('analytics'):
+            if start is not None:
+                frame = frame[frame['date'] >= pd.Timestamp(start)]
+            if end is not None:
+                frame = frame[frame['date'] < pd.Timestamp(end) + pd.Timedelta(days=1)]
+            result = analytics_report(frame)
+
+        with self._lock:
+            if version == self._version:
+                self._results[key] = result
+                if len(self._results) > MAX_CACHED_RESULTS:
+                    self._results.popitem(last=False)
+        return result
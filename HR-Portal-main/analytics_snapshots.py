@@ -0,0 +1,186 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from metrics import stage
+
+# Counter columns recorded in every daily snapshot
+SNAPSHOT_COLUMNS = ['Application Status', 'Interview Status', 'Interested Position']
+
+# Seconds between two recordings of today's snapshot
+SNAPSHOT_INTERVAL = 3600
+
+# Days covered by a trend query that gives no start date
+DEFAULT_TREND_DAYS = 90
+
+# Resolutions of a trend; week and month keep the last snapshot of each period
+TREND_INTERVALS = ('day', 'week', 'month')
+
+
+# Label of the period a snapshot day falls in
+def period_of(day, interval):
+    """Return the day itself, the Monday of its week, or its 'YYYY-MM' month"""
+    if interval == 'week':
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if interval == 'month':
+        return day.strftime('%Y-%m')
+    return day.isoformat()
+
+
+class AnalyticsSnapshots:
+    """Daily rollups of the analytics counters in a SQLite database.
+
+    Each day keeps one snapshot: the candidate total and the count of every
+    value of the status, interview stage and position columns, as they were
+    when it was last recorded that day. Recording the same day again
+    replaces it, so several workers recording the same counters is harmless.
+    Counts are keyed (dimension, day, value), so a trend of one column over
+    any date range is a single index range scan, however large the dataset.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._initialized = False
+
+    def connect(self):
+        """Open a connection, creating the schema on first use"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS snapshot_days (
+                    day TEXT PRIMARY KEY,
+                    recorded_at TEXT NOT NULL,
+                    total INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS snapshot_counts (
+                    dimension TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (dimension, day, value)
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def record(self, counts, day=None, recorded_at=None):
+        """Store counts as the snapshot of day (today by default).
+
+        counts is {'total': n, column: {value: n}} for the SNAPSHOT_COLUMNS;
+        values with no candidates are left out.
+        """
+        day = (day or date.today()).isoformat()
+        recorded_at = recorded_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with stage('snapshot'):
+            conn = self.connect()
+            try:
+                with conn:
+                    conn.execute('INSERT OR REPLACE INTO snapshot_days (day, recorded_at, total) VALUES (?, ?, ?)',
+                                 (day, recorded_at, counts['total']))
+                    conn.execute('DELETE FROM snapshot_counts WHERE day = ?', (day,))
+                    conn.executemany(
+                        'INSERT INTO snapshot_counts (dimension, day, value, count) VALUES (?, ?, ?, ?)',
+                        [(column, day, value, count) for column in SNAPSHOT_COLUMNS
+                         for value, count in counts[column].items() if value and count > 0]
+                    )
+            finally:
+                conn.close()
+
+    def trend(self, column, start, end, interval='day'):
+        """Return the counts of one column on every snapshot day from start to end (inclusive).
+
+        With interval 'week' or 'month' only the last snapshot of each
+        period is kept. The result is laid out for charting: periods, the
+        snapshot day used for each, the totals, and one list of counts per
+        value, all aligned.
+        """
+        conn = self.connect()
+        try:
+            days = conn.execute('SELECT day, total FROM snapshot_days WHERE day BETWEEN ? AND ? ORDER BY day',
+                                (start.isoformat(), end.isoformat())).fetchall()
+            counts = conn.execute(
+                'SELECT day, value, count FROM snapshot_counts WHERE dimension = ? AND day BETWEEN ? AND ?',
+                (column, start.isoformat(), end.isoformat())
+            ).fetchall()
+        finally:
+            conn.close()
+
+        # The last snapshot day of each period, in date order
+        chosen = {}
+        for day, total in days:
+            chosen[period_of(date.fromisoformat(day), interval)] = (day, total)
+        position = {day: i for i, (day, total) in enumerate(chosen.values())}
+
+        series = {}
+        for day, value, count in counts:
+            if day in position:
+                series.setdefault(value, [0] * len(position))[position[day]] = count
+        return {
+            'dimension': column,
+            'interval': interval,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'periods': list(chosen),
+            'days': [day for day, total in chosen.values()],
+            'total': [total for day, total in chosen.values()],
+            'series': dict(sorted(series.items()))
+        }
+
+
+class SnapshotRecorder:
+    """Daemon thread that records today's snapshot every interval seconds once started.
+
+    snapshot() returns (counts, version) of the current data; a recording
+    is skipped while neither the day nor the version has changed since the
+    last one.
+    """
+
+    def __init__(self, snapshots, snapshot, interval=SNAPSHOT_INTERVAL):
+        self.snapshots = snapshots
+        self.snapshot = snapshot
+        self.interval = interval
+        self.last_recorded = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def record_now(self):
+        """Record today's snapshot unless it is already up to date; return whether it was written"""
+        counts, version = self.snapshot()
+        key = (date.today(), version)
+        if key == self.last_recorded:
+            return False
+        self.snapshots.record(counts, day=key[0])
+        self.last_recorded = key
+        return True
+
+    def start(self):
+        # Threads do not survive a fork, so a forked worker starts its own
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='analytics-snapshots', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.record_now()
+            except Exception as e:
+                print(f"Error recording the analytics snapshot: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
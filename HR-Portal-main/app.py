@@ -1,23 +1,128 @@
-from flask import Flask, jsonify, request, render_template, redirect, url_for, session
+from flask import Flask, jsonify, request, render_template, redirect, url_for, session, Response, stream_with_context, make_response, g
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import atexit
+import threading
+import time
 import openpyxl
 from openpyxl.cell.cell import MergedCell
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
 import json
-from collections import defaultdict
 import secrets
 import sqlite3
 import hashlib
+from candidate_store import CandidateStore, VersionConflict
+from analytics_aggregates import AnalyticsAggregates
+from analytics_engine import REPORT_SECTIONS, AnalyticsEngine, date_range_args, section_args
+from analytics_snapshots import AnalyticsSnapshots, SnapshotRecorder, DEFAULT_TREND_DAYS, SNAPSHOT_COLUMNS, SNAPSHOT_INTERVAL, TREND_INTERVALS
+from change_log import ChangeLog
+from event_stream import EventBroadcaster
+from search_index import SearchIndex
+from facet_index import FacetIndex
+from group_analysis import GroupByEngine
+from excel_storage import ExcelCandidateStorage, CANDIDATE_HEADERS, RECORD_FIELDS, VERSION_FIELD, record_number
+from sqlite_storage import SQLiteCandidateStorage
+from candidate_query import query_candidates, iter_candidates, page_args, parse_filters, field_args, project_rows
+from export_stream import csv_chunks, xlsx_chunks
+from bulk_import import UploadError, read_upload, build_records
+from compact_json import encode_columnar
+from compression import compress_response
+from dropdown_options import DROPDOWN_OPTIONS
+from metrics import metrics, stage
+from row_store import CompactRow, record_dict
+from sampling_profiler import SamplingProfiler, collapsed, top_functions
+
+# Time JSON serialization of every jsonify() response
+class TimedJSONProvider(DefaultJSONProvider):
+    # Cached candidate rows are compact tuples; they become dicts only here
+    @staticmethod
+    def default(o):
+        if isinstance(o, CompactRow):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+    def response(self, *args, **kwargs):
+        with stage('serialize'):
+            return super().response(*args, **kwargs)
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(16)  # Generate a secure secret key
+app.json = TimedJSONProvider(app)
 CORS(app)
 
+# Profile every request and keep the profiles of those slower than this
+# many milliseconds (unset: only requests made with ?profile=1 by an admin)
+PROFILE_SLOW_MS = float(os.environ['PROFILE_SLOW_MS']) if os.environ.get('PROFILE_SLOW_MS') else None
+
+# Sampling profiler for individual slow requests
+profiler = SamplingProfiler()
+
+# Start timing (and, if asked for, profiling) a request
+@app.before_request
+def start_request_timing():
+    g.request_started = time.perf_counter()
+    metrics.begin_request()
+    g.profile_requested = request.args.get('profile') in ('1', 'true', 'yes') and is_admin()
+    g.profiling = g.profile_requested or PROFILE_SLOW_MS is not None
+    if g.profiling:
+        profiler.start()
+
+# Record the request's latency and stage timings. Registered before compress()
+# so it runs after it: after_request functions run in reverse order
+@app.after_request
+def record_request_timing(response):
+    if 'request_started' not in g:
+        return response
+    seconds = time.perf_counter() - g.request_started
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    stages = metrics.end_request(request.method, route, response.status_code, seconds)
+    timings = [f"{name};dur={value * 1000:.1f}" for name, value in stages.items()]
+    response.headers['Server-Timing'] = ', '.join(timings + [f"total;dur={seconds * 1000:.1f}"])
+    if g.profiling:
+        samples = profiler.stop()
+        if g.profile_requested or seconds * 1000 >= PROFILE_SLOW_MS:
+            profile_id = profiler.record(samples, method=request.method, route=route, path=request.full_path,
+                                         status=response.status_code, seconds=round(seconds, 4),
+                                         stages={name: round(value, 4) for name, value in stages.items()},
+                                         recorded=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            response.headers['X-Profile-Id'] = str(profile_id)
+    return response
+
+# Stop sampling a request that ended without a response (after_request skipped)
+@app.teardown_request
+def stop_profiling(exc):
+    if g.get('profiling'):
+        profiler.stop()
+
+# Compress JSON and page responses for clients that accept it
+@app.after_request
+def compress(response):
+    with stage('compress'):
+        return compress_response(response, request.accept_encodings)
+
 EXCEL_FILE = 'data.xlsx'
 SHEET_NAME = 'Candidates'
 USER_DB = 'instance/users.db'
+CANDIDATE_DB = 'instance/candidates.db'
+ANALYTICS_DB = 'instance/analytics.db'
+CANDIDATE_STORAGE = os.environ.get('CANDIDATE_STORAGE', 'excel')
+
+# Acknowledge workbook writes once journaled and save the workbook in the
+# background every EXCEL_SAVE_INTERVAL seconds (EXCEL_WRITE_BEHIND=0 saves on every write)
+EXCEL_WRITE_BEHIND = os.environ.get('EXCEL_WRITE_BEHIND', '1') != '0'
+EXCEL_SAVE_INTERVAL = float(os.environ.get('EXCEL_SAVE_INTERVAL', '2'))
+
+# Record today's analytics snapshot every ANALYTICS_SNAPSHOT_INTERVAL seconds (0 turns the recording off)
+ANALYTICS_SNAPSHOT_INTERVAL = float(os.environ.get('ANALYTICS_SNAPSHOT_INTERVAL', str(SNAPSHOT_INTERVAL)))
+
+# Largest number of operations accepted by /api/data/batch
+MAX_BATCH_OPERATIONS = 1000
+
+# Results returned by /api/search by default, and at most
+DEFAULT_SEARCH_RESULTS = 20
+MAX_SEARCH_RESULTS = 100
 
 # Default admin credentials
 ADMIN_USERNAME = "admin"
@@ -25,28 +130,17 @@ ADMIN_PASSWORD = "password123"
 
 # Create sample Excel file if it doesn't exist
 def create_sample_excel():
+    # Never overwrite existing candidate data
     if os.path.exists(EXCEL_FILE):
-        os.remove(EXCEL_FILE)
+        return
 
     wb = openpyxl.Workbook()
     sheet = wb.active
     if sheet is not None:
         sheet.title = SHEET_NAME
     
-    # Define headers
-    headers = [
-        'Date', 'Name', 'Email ID', 'Contact Number', 'Interested Position', 
-        'Current Role', 'Current Organization', 'Current Location',
-        'Current CTC per Annum', 'Expected CTC per Annum', 'Total Years of Experience',
-        'Notice Period', 'In Notice', 'Immediate Joiner', 'Offers in Hand',
-        'Offered CTC', 'Location Preference', 'Certifications', 'Resume',
-        'LinkedIn Profile', 'Comments', 'Referred By', 'Interview Status',
-        'Application Status',
-        # Stage-specific remarks
-        'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks',
-        # General remarks
-        'Remarks', 'Reject Mail Sent', 'Final Remarks'
-    ]
+    # Define headers in the desired order, so a new file needs no header migration
+    headers = CANDIDATE_HEADERS
     
     # Add headers to the first row
     for col_num, header in enumerate(headers, 1):
@@ -56,223 +150,288 @@ def create_sample_excel():
             if cell is not None and not isinstance(cell, MergedCell):
                 cell.value = header
         
-        # Sample data
-        sample_data = [
-            {
-                'Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'Name': 'John Doe',
-                'Email ID': 'john.doe@example.com',
-                'Contact Number': '9876543210',
-                'Interested Position': 'Software Developer',
-                'Current Role': 'Junior Developer',
-                'Current Organization': 'Tech Solutions Inc.',
-                'Current Location': 'Bangalore',
-                'Current CTC per Annum': '800000',
-                'Expected CTC per Annum': '1200000',
-                'Total Years of Experience': '2-3 years',
-                'Notice Period': '30 days',
-                'In Notice': 'Yes',
-                'Immediate Joiner': 'No',
-                'Offers in Hand': 'No',
-                'Offered CTC': '',
-                'Location Preference': 'Bangalore',
-                'Certifications': 'AWS Certified Developer',
-                'Resume': 'https://example.com/resume/johndoe',
-                'LinkedIn Profile': 'https://linkedin.com/in/johndoe',
-                'Comments': 'Good communication skills',
-                'Referred By': 'Employee Referral',
-                'Interview Status': 'Scheduled',
-                'Application Status': 'In Process',
-                'Remarks': 'Promising candidate',
-                'Reject Mail Sent': 'No',
-                'Initial Screening': 'Candidate performed well in initial screening.',
-                'Round 1 Remarks': 'Strong technical skills demonstrated in Round 1.',
-                'Round 2 Remarks': 'Good problem-solving approach in Round 2.',
-                'Final Remarks': '',
-               
-                'Reference': 'Jane Smith'
-            },
-            {
-                'Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'Name': 'Jane Smith',
-                'Email ID': 'jane.smith@example.com',
-                'Contact Number': '8765432109',
-                'Interested Position': 'Data Scientist',
-                'Current Role': 'Data Analyst',
-                'Current Organization': 'Data Insights Ltd.',
-                'Current Location': 'Hyderabad',
-                'Current CTC per Annum': '1000000',
-                'Expected CTC per Annum': '1500000',
-                'Total Years of Experience': '3-5 years',
-                'Notice Period': '60 days',
-                'In Notice': 'No',
-                'Immediate Joiner': 'No',
-                'Offers in Hand': 'Yes',
-                'Offered CTC': '1400000',
-                'Location Preference': 'Remote',
-                'Certifications': 'Google Data Analytics',
-                'Resume': 'https://example.com/resume/janesmith',
-                'LinkedIn Profile': 'https://linkedin.com/in/janesmith',
-                'Comments': 'Strong analytical skills',
-                'Referred By': 'Job Portal',
-                'Interview Status': 'Selected',
-                'Application Status': 'Offer Made',
-                'Remarks': 'Top candidate',
-                'Reject Mail Sent': 'No',
-                'Initial Remarks': '',
-                'Round 1 Remarks': '',
-                'Round 2 Remarks': '',
-                'Final Remarks': 'Waiting for candidate response',
-                
-                'Reference': 'Robert Johnson'
-            },
-            {
-                'Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'Email ID': 'sam.wilson@example.com',
-                'Contact Number': '7654321098',
-                'Interested Position': 'UI/UX Designer',
-                'Current Role': 'Graphic Designer',
-                'Current Organization': 'Creative Designs',
-                'Current Location': 'Chennai',
-                'Current CTC per Annum': '700000',
-                'Expected CTC per Annum': '1000000',
-                'Total Years of Experience': '1-2 years',
-                'Notice Period': '15 days',
-                'In Notice': 'Yes',
-                'Immediate Joiner': 'Yes',
-                'Offers in Hand': 'No',
-                'Offered CTC': '',
-                'Location Preference': 'Chennai',
-                'Certifications': 'Adobe Certified Expert',
-                'Resume': 'https://example.com/resume/samwilson',
-                'LinkedIn Profile': 'https://linkedin.com/in/samwilson',
-                'Comments': 'Creative portfolio',
-                'Referred By': 'Campus Recruitment',
-                'Interview Status': 'Rejected',
-                'Application Status': 'Rejected',
-                'Remarks': 'Not enough experience',
-                'Reject Mail Sent': 'Yes',
-                'Initial Remarks': '',
-                'Round 1 Remarks': '',
-                'Round 2 Remarks': '',
-                'Final Remarks': 'Consider for junior positions',
-                
-                'Reference': 'Emily Davis'
-            }
-        ]
-        
-        # Add sample data
-        for row_num, data in enumerate(sample_data, 2):
-            for col_num, header in enumerate(headers, 1):
-                if sheet is not None:
-                    cell = sheet.cell(row=row_num, column=col_num)
-                    # Check if cell is not a merged cell before assigning value
-                    if cell is not None and not isinstance(cell, MergedCell):
-                        cell.value = data.get(header, '')
-        
-        # Save the workbook
-        wb.save(EXCEL_FILE)
-        wb.close()
-        print(f"Created sample Excel file: {EXCEL_FILE}")
-
-# Load data from Excel
-def load_data():
-    if not os.path.exists(EXCEL_FILE):
-        create_sample_excel()
-    
-    wb = openpyxl.load_workbook(EXCEL_FILE)
-    sheet = wb[SHEET_NAME]
-    
-    # Get headers from the first row
-    headers = [cell.value for cell in sheet[1] if cell is not None]
+    # Sample data
+    sample_data = [
+        {
+            'Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'Name': 'John Doe',
+            'Email ID': 'john.doe@example.com',
+            'Contact Number': '9876543210',
+            'Interested Position': 'Software Developer',
+            'Current Role': 'Junior Developer',
+            'Current Organization': 'Tech Solutions Inc.',
+            'Current Location': 'Bangalore',
+            'Current CTC per Annum': '800000',
+            'Expected CTC per Annum': '1200000',
+            'Total Years of Experience': '2-3 years',
+            'Notice Period': '30 days',
+            'In Notice': 'Yes',
+            'Immediate Joiner': 'No',
+            'Offers in Hand': 'No',
+            'Offered CTC': '',
+            'Location Preference': 'Bangalore',
+            'Certifications': 'AWS Certified Developer',
+            'Resume': 'https://example.com/resume/johndoe',
+            'LinkedIn Profile': 'https://linkedin.com/in/johndoe',
+            'Comments': 'Good communication skills',
+            'Referred By': 'Employee Referral',
+            'Interview Status': 'Scheduled',
+            'Application Status': 'In Process',
+            'Remarks': 'Promising candidate',
+            'Reject Mail Sent': 'No',
+            'Initial Screening': 'Candidate performed well in initial screening.',
+            'Round 1 Remarks': 'Strong technical skills demonstrated in Round 1.',
+            'Round 2 Remarks': 'Good problem-solving approach in Round 2.',
+            'Final Remarks': '',
+           
+            'Reference': 'Jane Smith'
+        },
+        {
+            'Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'Name': 'Jane Smith',
+            'Email ID': 'jane.smith@example.com',
+            'Contact Number': '8765432109',
+            'Interested Position': 'Data Scientist',
+            'Current Role': 'Data Analyst',
+            'Current Organization': 'Data Insights Ltd.',
+            'Current Location': 'Hyderabad',
+            'Current CTC per Annum': '1000000',
+            'Expected CTC per Annum': '1500000',
+            'Total Years of Experience': '3-5 years',
+            'Notice Period': '60 days',
+            'In Notice': 'No',
+            'Immediate Joiner': 'No',
+            'Offers in Hand': 'Yes',
+            'Offered CTC': '1400000',
+            'Location Preference': 'Remote',
+            'Certifications': 'Google Data Analytics',
+            'Resume': 'https://example.com/resume/janesmith',
+            'LinkedIn Profile': 'https://linkedin.com/in/janesmith',
+            'Comments': 'Strong analytical skills',
+            'Referred By': 'Job Portal',
+            'Interview Status': 'Selected',
+            'Application Status': 'Offer Made',
+            'Remarks': 'Top candidate',
+            'Reject Mail Sent': 'No',
+            'Initial Remarks': '',
+            'Round 1 Remarks': '',
+            'Round 2 Remarks': '',
+            'Final Remarks': 'Waiting for candidate response',
+            
+            'Reference': 'Robert Johnson'
+        },
+        {
+            'Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'Email ID': 'sam.wilson@example.com',
+            'Contact Number': '7654321098',
+            'Interested Position': 'UI/UX Designer',
+            'Current Role': 'Graphic Designer',
+            'Current Organization': 'Creative Designs',
+            'Current Location': 'Chennai',
+            'Current CTC per Annum': '700000',
+            'Expected CTC per Annum': '1000000',
+            'Total Years of Experience': '1-2 years',
+            'Notice Period': '15 days',
+            'In Notice': 'Yes',
+            'Immediate Joiner': 'Yes',
+            'Offers in Hand': 'No',
+            'Offered CTC': '',
+            'Location Preference': 'Chennai',
+            'Certifications': 'Adobe Certified Expert',
+            'Resume': 'https://example.com/resume/samwilson',
+            'LinkedIn Profile': 'https://linkedin.com/in/samwilson',
+            'Comments': 'Creative portfolio',
+            'Referred By': 'Campus Recruitment',
+            'Interview Status': 'Rejected',
+            'Application Status': 'Rejected',
+            'Remarks': 'Not enough experience',
+            'Reject Mail Sent': 'Yes',
+            'Initial Remarks': '',
+            'Round 1 Remarks': '',
+            'Round 2 Remarks': '',
+            'Final Remarks': 'Consider for junior positions',
+            
+            'Reference': 'Emily Davis'
+        }
+    ]
     
-    # Get data from the remaining rows
-    data = []
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        row_data = {}
-        for i, value in enumerate(row):
-            # Convert datetime objects to string
-            if isinstance(value, datetime):
-                value = value.strftime('%Y-%m-%d %H:%M:%S')
-            header = headers[i]
-            # Migrate old "Initial Remarks" to "Initial Screening"
-            if header == 'Initial Remarks':
-                header = 'Initial Screening'
-            row_data[header] = str(value) if value is not None else ''
-        data.append(row_data)
+    # Add sample data
+    for row_num, data in enumerate(sample_data, 2):
+        for col_num, header in enumerate(headers, 1):
+            if sheet is not None:
+                cell = sheet.cell(row=row_num, column=col_num)
+                # Check if cell is not a merged cell before assigning value
+                if cell is not None and not isinstance(cell, MergedCell):
+                    cell.value = data.get(header, '')
     
-    return data
+    # Save the workbook
+    wb.save(EXCEL_FILE)
+    wb.close()
+    print(f"Created sample Excel file: {EXCEL_FILE}")
+
+# Candidate storage backend: 'excel' keeps data.xlsx as the database,
+# 'sqlite' keeps candidates in an indexed table (import/export via sqlite_storage.py)
+if CANDIDATE_STORAGE == 'sqlite':
+    candidate_storage = SQLiteCandidateStorage(CANDIDATE_DB)
+else:
+    candidate_storage = ExcelCandidateStorage(EXCEL_FILE, SHEET_NAME, create_sample_excel,
+                                              write_behind=EXCEL_WRITE_BEHIND, save_interval=EXCEL_SAVE_INTERVAL)
+    # Save journaled writes on a clean shutdown; after a crash the next start replays them
+    atexit.register(candidate_storage.close)
+
+# Shared in-memory cache of the candidate records
+candidate_store = CandidateStore(candidate_storage)
+
+# Random per-process tag for ETags and change feed versions, since the
+# dataset version restarts at 0
+DATASET_EPOCH = secrets.token_hex(4)
+
+# Dataset version as handed to clients, valid only for this process
+def client_version(version):
+    return f"{DATASET_EPOCH}.{version}"
+
+# Parse a version sent back by a client, None if it is from another process
+def parse_client_version(value):
+    epoch, _, version = (value or '').partition('.')
+    if epoch != DATASET_EPOCH or not version.isdigit():
+        return None
+    return int(version)
+
+# Analytics counters kept up to date on every write
+analytics_aggregates = AnalyticsAggregates()
+candidate_store.add_listener(analytics_aggregates)
+
+# Daily rollups of the analytics counters, for /api/analytics/trends
+analytics_snapshots = AnalyticsSnapshots(ANALYTICS_DB)
+
+# Counters of the current data and the dataset version they belong to
+def analytics_counts():
+    rows, version = candidate_store.snapshot()  # Reloads if another process changed the data
+    return analytics_aggregates.counts(), version
+
+snapshot_recorder = SnapshotRecorder(analytics_snapshots, analytics_counts, interval=ANALYTICS_SNAPSHOT_INTERVAL)
+
+# Which records changed at which version, for /api/data/changes
+change_log = ChangeLog()
+candidate_store.add_listener(change_log)
+
+# Live updates for connected browsers (after the analytics counters, which it publishes)
+event_broadcaster = EventBroadcaster(analytics_aggregates, client_version)
+candidate_store.add_listener(event_broadcaster)
+
+# Full-text index for /api/search
+search_index = SearchIndex()
+candidate_store.add_listener(search_index)
+
+# Distinct values per filterable column, for /api/facets
+facet_index = FacetIndex()
+candidate_store.add_listener(facet_index)
+
+# Group-by results memoized per dataset version
+group_engine = GroupByEngine(candidate_store)
+
+# Columnar time-series, funnel and CTC analytics, rebuilt once per dataset version
+analytics_engine = AnalyticsEngine(candidate_store)
+
+# Load data from Excel (served from the in-memory cache)
+def load_data():
+    """Return a copy of the candidate rows that the caller may modify"""
+    return [record_dict(row) for row in candidate_store.get_rows()]
+
+# Find a record by its ID inside a mutation
+def find_record(rows, record_id, expected_version=None):
+    """Return the position of the record, checking its version if one is expected"""
+    index = candidate_store.position_of(record_id, rows)
+    if index is None:
+        raise IndexError(f"No record found with id {record_id}")
+    if expected_version is not None and rows[index][VERSION_FIELD] != expected_version:
+        raise VersionConflict(rows[index])
+    return index
+
+# Patch a single record
+def update_row(record_id, changes, expected_version=None):
+    """Write only the changed fields of the record with the given ID"""
+    def patch(rows, storage):
+        index = find_record(rows, record_id, expected_version)
+        old = rows[index]
+        record = storage.update_row(rows, index, changes)
+        candidate_store.notify(old, record)
+        return record
+
+    record = candidate_store.mutate(patch)
+    print(f"Record updated: id {record_id}")
+    return record
+
+# Patch several records in a single write
+def update_rows(updates):
+    """Apply [(record_id, changes, expected_version)] all at once, persisting once.
+
+    Every ID and expected version is checked before anything is written, so
+    either all of the changes are stored or none are.
+    """
+    def patch(rows, storage):
+        merged = {}
+        for record_id, changes, expected_version in updates:
+            index = find_record(rows, record_id, expected_version)
+            merged.setdefault(index, {}).update(changes)
+        old = [rows[index] for index in merged]
+        records = storage.update_rows(rows, list(merged.items()))
+        for old_record, record in zip(old, records):
+            candidate_store.notify(old_record, record)
+        return records
+
+    records = candidate_store.mutate(patch)
+    print(f"Records updated: {len(records)}")
+    return records
+
+# Append a single record
+def append_row(row_data):
+    """Store one new record after the last one"""
+    def append(rows, storage):
+        record = storage.append_row(rows, row_data)
+        candidate_store.notify(None, record)
+        return record
+
+    record = candidate_store.mutate(append)
+    print("Record added")
+    return record
+
+# Append a batch of records in a single write
+def append_rows(records):
+    """Store new records after the last one, persisting once"""
+    def append(rows, storage):
+        added = storage.append_rows(rows, records)
+        for record in added:
+            candidate_store.notify(None, record)
+        return added
+
+    added = candidate_store.mutate(append)
+    print(f"Records added: {len(added)}")
+    return added
+
+# Remove a single record
+def delete_row(record_id, expected_version=None):
+    """Delete the record with the given ID"""
+    def remove(rows, storage):
+        index = find_record(rows, record_id, expected_version)
+        record = storage.delete_row(rows, index)
+        candidate_store.notify(record, None)
+        return record
+
+    record = candidate_store.mutate(remove)
+    print(f"Record deleted: id {record_id}")
+    return record
 
 # Save data to Excel
 def save_data(data):
+    """Rewrite every record (used for header migration)"""
     try:
-        if not os.path.exists(EXCEL_FILE):
-            create_sample_excel()
-
-        wb = openpyxl.load_workbook(EXCEL_FILE)
-        sheet = wb[SHEET_NAME]
+        def rewrite(rows, storage):
+            storage.replace_all(rows, data)
+            candidate_store.notify_reset(rows)
 
-        # Get current headers
-        headers = [cell.value for cell in sheet[1] if cell is not None and cell.value]
-        
-        # Desired field order (keep 'Date' at the beginning)
-        desired_fields = [
-            'Name', 'Email ID', 'Contact Number', 'Interested Position', 'Current Role',
-            'Current Organization', 'Current Location', 'Current CTC per Annum',
-            'Expected CTC per Annum', 'Total Years of Experience', 'Notice Period',
-            'Interview Status', 'Application Status', 'Referred By', 'Comments',
-            'In Notice', 'Immediate Joiner', 'Offers in Hand', 'Offered CTC',
-            'Location Preference', 'Certifications', 'Resume', 'LinkedIn Profile',
-            # Stage-specific remarks that should be persisted
-            'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks',
-            # General/legacy remarks
-            'Remarks', 'Reject Mail Sent', 'Final Remarks'
-        ]
-        
-        # Build ordered headers: Date + desired fields present + any remaining headers
-        ordered_headers = []
-        if 'Date' in headers:
-            ordered_headers.append('Date')
-        ordered_headers.extend([h for h in desired_fields if h in headers])
-        # Include any headers not in desired list (e.g., 'Reference')
-        ordered_headers.extend([h for h in headers if h not in ordered_headers])
-        
-        # If there are desired fields missing from headers, append them so they are created
-        ordered_headers.extend([h for h in desired_fields if h not in ordered_headers])
-        
-        # Rewrite headers in desired order
-        for col_num, header in enumerate(ordered_headers, 1):
-            if sheet is not None:
-                cell = sheet.cell(row=1, column=col_num)
-                if cell is not None and not isinstance(cell, MergedCell):
-                    cell.value = header
-        
-        # Clear existing data (except headers)
-        for row in range(sheet.max_row, 1, -1):
-            sheet.delete_rows(row)
-        
-        # Add updated data
-        for row_num, row_data in enumerate(data, 2):
-            for col_num, header in enumerate(ordered_headers, 1):
-                # Migrate old "Initial Remarks" to "Initial Screening"
-                if header == 'Initial Screening':
-                    value = row_data.get('Initial Screening') or row_data.get('Initial Remarks', '')
-                else:
-                    value = row_data.get(header, '')
-                # Convert value to string, handle None
-                if value is None:
-                    value = ''
-                else:
-                    value = str(value)
-                if sheet is not None:
-                    cell = sheet.cell(row=row_num, column=col_num)
-                    if cell is not None and not isinstance(cell, MergedCell):
-                        cell.value = value
-        
-        # Save and close the workbook
-        wb.save(EXCEL_FILE)
-        wb.close()
-        print(f"Data saved to Excel: {len(data)} records")
+        candidate_store.mutate(rewrite)
+        print(f"Data saved to {candidate_storage.name}: {len(data)} records")
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -381,78 +540,420 @@ def admin_required(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+
+# Current dataset version (reloads the rows first if the storage changed)
+def dataset_version():
+    return candidate_store.snapshot()[1]
+
+# Version of responses that only change when the app is restarted
+def static_version():
+    return 'static'
+
+# Answer conditional GETs from a version instead of recomputing the response (decorator)
+def conditional_get(current_version):
+    """Tag responses with an ETag built from current_version() and reply 304
+    to a matching If-None-Match without calling the view.
+
+    The ETag also covers the query string and the user's role, since both
+    change the response. Responses may be stored by the browser but must be
+    revalidated (Cache-Control: private, no-cache), which the browser does
+    on its own for fetch() calls.
+    """
+    def decorator(f):
+        def decorated_function(*args, **kwargs):
+            variant = hashlib.sha1(f"{is_admin()}|{request.query_string.decode()}".encode()).hexdigest()[:8]
+            etag = f"{DATASET_EPOCH}-{current_version()}-{variant}"
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        decorated_function.__name__ = f.__name__
+        return decorated_function
+    return decorator
+
 @app.route('/')
 @login_required
 def index():
-    return render_template('index.html')
+    return render_template('index.html', is_admin=is_admin())
+
+# Run the table view query as an indexed SQLite query
+def query_candidate_table(args):
+    page, limit = page_args(args)
+    return candidate_storage.query(
+        parse_filters(args),
+        sort_key=args.get('sort', '').strip() or None,
+        descending=args.get('order', 'asc').lower() == 'desc',
+        limit=limit,
+        offset=(page - 1) * limit if page is not None else 0
+    )
+
+# Query parameters that shape the /api/data response rather than select rows
+RESPONSE_ARGS = {'fields', 'format', 'dictionary', 'profile'}
+
+# Put rows into a response payload in the requested format
+def list_payload(rows, **payload):
+    """?format=compact sends the headers once and each row as a list of
+    values; adding dictionary=1 also sends low-cardinality columns as
+    indexes into a per-column list of values"""
+    if request.args.get('format') == 'compact':
+        payload['format'] = 'compact'
+        payload['data'] = encode_columnar(rows, dictionary=request.args.get('dictionary') in ('1', 'true'))
+    else:
+        payload['data'] = rows
+    return jsonify(payload)
+
+# Read ?fields= and check it against the known columns
+def requested_fields(args):
+    """Return the projected columns, or None for all; raises ValueError for an unknown column"""
+    fields = field_args(args)
+    if fields is not None:
+        columns = set(CANDIDATE_HEADERS) | set(group_engine.columns()) | set(RECORD_FIELDS)
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise ValueError(f"Unknown field: {', '.join(unknown)}")
+    return fields
 
 @app.route('/api/data', methods=['GET'])
 @login_required
+@conditional_get(dataset_version)
 def get_data():
-    data = load_data()
+    """Return candidates, optionally filtered, sorted and paginated.
+
+    Query parameters: position, status, location, experience, notice_period,
+    sort, order (asc/desc), page and limit. fields=<column>,<column>...
+    returns just those columns (and _id/_version); GET /api/data/<id> has
+    the whole record. format=compact (and dictionary=1) shrinks the rows,
+    see list_payload().
+    """
+    try:
+        fields = requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    data, version = candidate_store.snapshot()
     is_admin_user = is_admin()  # Check if the user is an admin
-    return jsonify({"data": data, "is_admin": is_admin_user})
+    if not request.args.keys() - RESPONSE_ARGS:
+        return list_payload(project_rows(data, fields), is_admin=is_admin_user, total=len(data), version=client_version(version))
+
+    if candidate_storage.name == 'sqlite':
+        page_rows, total = query_candidate_table(request.args)
+    else:
+        page_rows, total = query_candidates(data, request.args)
+    response = {"is_admin": is_admin_user, "total": total, "version": client_version(version)}
+    page, limit = page_args(request.args)
+    if page is not None:
+        response["page"] = page
+        response["limit"] = limit
+    return list_payload(project_rows(page_rows, fields), **response)
+
+@app.route('/api/data/changes', methods=['GET'])
+@login_required
+def get_data_changes():
+    """Return the records added, updated or deleted since ?since=<version>.
+
+    The version comes from an earlier /api/data or /api/data/changes
+    response. If the change log no longer reaches back that far (or the
+    server restarted since) every record is returned with "resync" set.
+    """
+    try:
+        fields = requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    since = parse_client_version(request.args.get('since'))
+    candidate_store.get_rows()  # Reloads (and resets the change log) if the storage changed
+    changed, version = change_log.changed_since(since) if since is not None else (None, None)
+    if changed is None:
+        data, version = candidate_store.snapshot()
+        return jsonify({"resync": True, "data": project_rows(data, fields), "is_admin": is_admin(), "version": client_version(version)})
+
+    # The rows may already be newer than version; clients just get those records again next time
+    rows = candidate_store.get_rows()
+    records = []
+    deleted = []
+    for record_id in sorted(changed):
+        index = candidate_store.position_of(record_id, rows)
+        if index is None:
+            deleted.append(record_id)
+        else:
+            records.append(rows[index])
+    return jsonify({
+        "resync": False,
+        "changes": project_rows(records, fields),
+        "deleted": deleted,
+        "is_admin": is_admin(),
+        "version": client_version(version)
+    })
+
+@app.route('/api/search', methods=['GET'])
+@login_required
+def search_data():
+    """Return the candidates matching ?q=, best match first.
+
+    Every word of the query has to match the start of a word in the name,
+    email, contact number, organization, certifications, comments or
+    interview remarks. At most ?limit= (default 20, up to 100) are returned.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"status": "error", "message": "Enter something to search for"}), 400
+    limit = min(max(request.args.get('limit', DEFAULT_SEARCH_RESULTS, type=int) or DEFAULT_SEARCH_RESULTS, 1), MAX_SEARCH_RESULTS)
+
+    rows = candidate_store.get_rows()  # Reloads (and rebuilds the index) if the storage changed
+    matches, total = search_index.search(query, limit)
+    results = []
+    for record_id, score in matches:
+        index = candidate_store.position_of(record_id, rows)
+        if index is not None:
+            results.append({**rows[index], "_score": round(score, 4)})
+    return jsonify({"query": query, "total": total, "results": results, "is_admin": is_admin()})
+
+@app.route('/api/facets', methods=['GET'])
+@login_required
+@conditional_get(dataset_version)
+def get_facets():
+    """Return the values present in each filterable column and their counts.
+
+    Takes the same filters as /api/data (position, status, location,
+    experience, notice_period). Each column is counted under all the other
+    filters, so picking a value does not hide its alternatives.
+    """
+    _, version = candidate_store.snapshot()  # Reloads (and rebuilds the index) if the storage changed
+    facets, total = facet_index.facets(parse_filters(request.args))
+    return jsonify({"facets": facets, "total": total, "version": client_version(version)})
+
+@app.route('/api/events', methods=['GET'])
+@login_required
+def stream_events():
+    """Stream live updates as Server-Sent Events.
+
+    Events: 'hello' (the current version), 'changes' (same shape as
+    /api/data/changes), 'analytics' (the /api/analytics counters) and
+    'resync' (reload through /api/data/changes).
+    """
+    if not event_broadcaster.accepting():
+        return jsonify({"status": "error", "message": "Too many live connections"}), 503
+    stream = event_broadcaster.stream(
+        lambda: {"version": client_version(dataset_version())},
+        poll=candidate_store.get_rows  # Reloads when another server process has written
+    )
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Keep reverse proxies from buffering the stream
+    })
 
 @app.route('/api/data', methods=['POST'])
 @login_required
 def add_data():
     try:
         new_data = request.json
-        data = load_data()
-        data.append(new_data)
-        save_data(data)
-        return jsonify({"status": "success", "message": "Data added successfully"})
+        record = append_row(new_data)
+        return jsonify({"status": "success", "message": "Data added successfully", "record": record})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/api/data/<int:index>', methods=['PUT'])
-@login_required
-def update_data(index):
+@app.route('/api/data/import', methods=['POST'])
+@admin_required
+def import_data():
+    """Import candidates from an uploaded .xlsx or .csv file (admin only).
+
+    Headers are matched to the candidate sheet case-insensitively. Valid
+    rows are saved in a single write; invalid rows are skipped and reported
+    with their spreadsheet row number. Pass ?dry_run=1 to only validate.
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({"status": "error", "message": "No file uploaded"}), 400
     try:
-        update_data = request.json
-        data = load_data()
-        
-        # Check if index is valid
-        if 0 <= index < len(data):
-            # Update the data at the specified index
-            for key, value in update_data.items():
-                # Convert specific fields to appropriate types if necessary
-                if key in ['Current CTC per Annum', 'Expected CTC per Annum', 'Offered CTC']:
-                    try:
-                        data[index][key] = int(value) if value else ''
-                    except (ValueError, TypeError):
-                        data[index][key] = value  # Keep original if conversion fails
-                else:
-                    # Ensure all values are strings or None
-                    data[index][key] = str(value) if value is not None else ''
-            
-            save_data(data)
-            return jsonify({"status": "success", "message": "Data updated successfully"})
+        headers, rows = read_upload(upload.filename, upload.stream, SHEET_NAME)
+        existing_emails = {row.get('Email ID', '').strip().lower() for row in candidate_store.get_rows() if row.get('Email ID')}
+        records, errors, ignored = build_records(headers, rows, existing_emails)
+    except UploadError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    dry_run = request.args.get('dry_run') in ('1', 'true', 'yes')
+    try:
+        if records and not dry_run:
+            append_rows(records)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({
+        "status": "success",
+        "message": f"{'Validated' if dry_run else 'Imported'} {len(records)} records, {len(errors)} rows rejected",
+        "imported": 0 if dry_run else len(records),
+        "valid": len(records),
+        "errors": errors,
+        "ignored_columns": ignored
+    })
+
+# Convert submitted field values to the types stored in the sheet
+def clean_changes(update_data):
+    changes = {}
+    for key, value in update_data.items():
+        # Record IDs, versions and _originalIndex are not sheet fields
+        if key.startswith('_'):
+            continue
+        # Convert specific fields to appropriate types if necessary
+        if key in ['Current CTC per Annum', 'Expected CTC per Annum', 'Offered CTC']:
+            try:
+                changes[key] = int(value) if value else ''
+            except (ValueError, TypeError):
+                changes[key] = value  # Keep original if conversion fails
         else:
-            return jsonify({"status": "error", "message": f"No record found at index {index}"}), 404
+            # Ensure all values are strings or None
+            changes[key] = str(value) if value is not None else ''
+    return changes
+
+# Parse the record version a write expects, None meaning "don't check"
+def expected_version(value):
+    if value is None or value == '':
+        return None
+    version = record_number(value)
+    if version is None:
+        raise ValueError(f"Invalid record version: {value}")
+    return version
+
+# Response for a write that lost a race with another write
+def conflict_response(e):
+    return jsonify({"status": "error", "message": str(e), "record": e.record}), 409
+
+@app.route('/api/data/batch', methods=['POST'])
+@login_required
+def update_data_batch():
+    """Apply a list of {"id": id, "version": n, "changes": {...}} operations in one write"""
+    payload = request.get_json(silent=True) or {}
+    operations = payload.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"status": "error", "message": "operations must be a non-empty list"}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({"status": "error", "message": f"A batch is limited to {MAX_BATCH_OPERATIONS} operations"}), 400
+
+    updates = []
+    for position, operation in enumerate(operations):
+        record_id = operation.get('id') if isinstance(operation, dict) else None
+        changes = operation.get('changes') if isinstance(operation, dict) else None
+        if not isinstance(record_id, int) or isinstance(record_id, bool) or not isinstance(changes, dict):
+            return jsonify({
+                "status": "error",
+                "message": f"Operation {position} must look like {{\"id\": <id>, \"changes\": {{...}}}}"
+            }), 400
+        try:
+            version = expected_version(operation.get('version'))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": f"Operation {position}: {e}"}), 400
+        updates.append((record_id, clean_changes(changes), version))
+
+    try:
+        records = update_rows(updates)
+    except IndexError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except VersionConflict as e:
+        return conflict_response(e)
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
         print(f"Error updating data: {error_trace}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/api/data/<int:index>', methods=['DELETE'])
+    return jsonify({
+        "status": "success",
+        "message": f"{len(records)} records updated",
+        "updated": len(records),
+        "records": records
+    })
+
+@app.route('/api/data/<int:record_id>', methods=['GET'])
 @login_required
-def delete_data(index):
+@conditional_get(dataset_version)
+def get_record(record_id):
+    """Return one candidate with every field (or just ?fields=)"""
     try:
-        data = load_data()
-        
-        # Check if index is valid
-        if 0 <= index < len(data):
-            # Delete the data at the specified index
-            del data[index]
-            save_data(data)
-            return jsonify({"status": "success", "message": "Data deleted successfully"})
-        else:
-            return jsonify({"status": "error", "message": f"No record found at index {index}"}), 404
+        fields = requested_fields(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    rows = candidate_store.get_rows()
+    index = candidate_store.position_of(record_id, rows)
+    if index is None:
+        return jsonify({"status": "error", "message": f"No record found with id {record_id}"}), 404
+    record = rows[index] if fields is None else project_rows([rows[index]], fields)[0]
+    return jsonify({"record": record, "is_admin": is_admin()})
+
+@app.route('/api/data/<int:record_id>', methods=['PUT'])
+@login_required
+def update_data(record_id):
+    """Update a record; a "_version" in the body makes the write conditional on it"""
+    try:
+        update_data = request.json or {}
+        version = expected_version(update_data.get(VERSION_FIELD))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        # Collect the changed fields of the record with the given ID
+        record = update_row(record_id, clean_changes(update_data), version)
+        return jsonify({"status": "success", "message": "Data updated successfully", "record": record})
+    except IndexError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except VersionConflict as e:
+        return conflict_response(e)
     except Exception as e:
+        import traceback
+        error_trace = traceback.format_exc()
+        print(f"Error updating data: {error_trace}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/data/<int:record_id>', methods=['DELETE'])
+@login_required
+def delete_data(record_id):
+    """Delete a record; ?version=n makes the delete conditional on it"""
+    try:
+        version = expected_version(request.args.get('version'))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    try:
+        delete_row(record_id, version)
+        return jsonify({"status": "success", "message": "Data deleted successfully"})
+    except IndexError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except VersionConflict as e:
+        return conflict_response(e)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/export', methods=['GET'])
+@login_required
+def export_data():
+    """Stream the candidates matching the table filters as CSV or XLSX.
+
+    Accepts the same filter and sort parameters as GET /api/data, plus
+    format=csv (default) or format=xlsx.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({"status": "error", "message": "format must be csv or xlsx"}), 400
+
+    data = candidate_store.get_rows()
+    headers = [h for h in (data[0].keys() if data else CANDIDATE_HEADERS) if h and h not in RECORD_FIELDS]
+    rows = (row for index, row in iter_candidates(data, request.args))
+    filename = f"candidates-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+
+    if export_format == 'csv':
+        chunks = csv_chunks(rows, headers)
+        mimetype = 'text/csv'
+    else:
+        chunks = xlsx_chunks(rows, headers, SHEET_NAME)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
 @app.route('/analytics')
 @login_required
 def analytics():
@@ -460,192 +961,169 @@ def analytics():
 
 @app.route('/api/analytics', methods=['GET'])
 @login_required
+@conditional_get(dataset_version)
 def get_analytics():
+    """Return the analytics of every candidate, or of those who applied
+    between ?from= and ?to= (YYYY-MM-DD, both inclusive).
+
+    Without a range the response comes from the maintained aggregates, so
+    it costs nothing after a write; ?sections=weekly,funnel,conversion,ctc
+    (or all) adds those sections from the columnar engine, which is rebuilt
+    once per dataset version. A range is always served by the engine, with
+    every section. With ?verify=1 the counters are also recomputed from
+    scratch and any drift between the two is reported.
+    """
     try:
-        data = load_data()
-        
-        total_applicant = len(data)
-        total_rejected = sum(1 for item in data if item.get('Application Status') == 'Rejected')
-        no_response = sum(1 for item in data if item.get('Application Status') == 'No Resp Call/Email')
-        not_interviewed = sum(1 for item in data if item.get('Interview Status') == 'Applied') # Assuming 'Applied' means not yet interviewed
-        
-        total_round_2_completed = sum(1 for item in data if item.get('Interview Status') == 'Tech Inter Comp') # Assuming Tech Inter Comp is Round 2
-        did_not_join = sum(1 for item in data if item.get('Application Status') == 'Did Not Join')
-        on_hold = sum(1 for item in data if item.get('Application Status') == 'On Hold')
-        accepted_waiting_reference = sum(1 for item in data if item.get('Application Status') == 'Accepted')
-        total_in_notice_yet_to_join = sum(1 for item in data if item.get('Application Status') == 'In Notice')
-        total_joined = sum(1 for item in data if item.get('Application Status') == 'Joined')
-        intern = sum(1 for item in data if item.get('Interested Position') == 'Intern') # Assuming 'Intern' is a position
-
-        # Monthly Statistics
-        monthly_stats = defaultdict(lambda: {"applicants": 0, "accepted": 0, "rejected": 0, "in_notice": 0, "joined": 0})
-        for item in data:
-            date_str = item.get('Date of Application')
-            if date_str:
-                try:
-                    # Assuming date format is 'YYYY-MM-DD' or similar
-                    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                    month_year = date_obj.strftime('%b %Y') # e.g., 'Nov 2025'
-                    monthly_stats[month_year]["applicants"] += 1
-                    if item.get('Application Status') == 'Accepted':
-                        monthly_stats[month_year]["accepted"] += 1
-                    elif item.get('Application Status') == 'Rejected':
-                        monthly_stats[month_year]["rejected"] += 1
-                    elif item.get('Application Status') == 'In Notice':
-                        monthly_stats[month_year]["in_notice"] += 1
-                    elif item.get('Application Status') == 'Joined':
-                        monthly_stats[month_year]["joined"] += 1
-                except ValueError:
-                    # Handle cases where date_str might be in a different format or invalid
-                    pass
-        
-        # Sort monthly statistics by date
-        sorted_monthly_stats = []
-        for month_year in sorted(monthly_stats.keys(), key=lambda x: datetime.strptime(x, '%b %Y')):
-            stats = monthly_stats[month_year]
-            sorted_monthly_stats.append({
-                "month": month_year,
-                "applicants": stats["applicants"],
-                "accepted": stats["accepted"],
-                "rejected": stats["rejected"],
-                "in_notice": stats["in_notice"],
-                "joined": stats["joined"]
-            })
-
-        # Hiring Funnel Status by Role
-        hiring_funnel_by_role = defaultdict(lambda: {"count": 0})
-        for item in data:
-            role = item.get('Interested Position')
-            if role:
-                hiring_funnel_by_role[role]["count"] += 1
-        
-        sorted_hiring_funnel_by_role = [{"role": role, "count": stats["count"]} for role, stats in hiring_funnel_by_role.items()]
-
-        # Position Statistics
-        position_stats = defaultdict(lambda: {"applied": 0, "joined": 0})
-        for item in data:
-            position = item.get('Interested Position')
-            if position:
-                position_stats[position]["applied"] += 1
-                if item.get('Application Status') == 'Joined':
-                    position_stats[position]["joined"] += 1
-        
-        sorted_position_stats = [{"position": pos, "applied": stats["applied"], "joined": stats["joined"]} for pos, stats in position_stats.items()]
-        
-        return jsonify({
-            'total_applicant': total_applicant,
-            'total_rejected': total_rejected,
-            'no_response': no_response,
-            'not_interviewed': not_interviewed,
-            'total_round_2_completed': total_round_2_completed,
-            'did_not_join': did_not_join,
-            'on_hold': on_hold,
-            'accepted_waiting_reference': accepted_waiting_reference,
-            'total_in_notice_yet_to_join': total_in_notice_yet_to_join,
-            'total_joined': total_joined,
-            'intern': intern,
-            'monthly_statistics': sorted_monthly_stats,
-            'hiring_funnel_by_role': sorted_hiring_funnel_by_role,
-            'position_statistics': sorted_position_stats
-        })
+        start, end = date_range_args(request.args)
+        sections = section_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    try:
+        data = candidate_store.get_rows()  # Reloads (and rebuilds the counters) if the file changed
+        if start or end:
+            result = dict(analytics_engine.report(start, end))
+            result['range'] = {'from': start and start.isoformat(), 'to': end and end.isoformat()}
+            return jsonify(result)
+        result = analytics_aggregates.snapshot()
+        if sections:
+            report = analytics_engine.report()
+            for section in sections:
+                for key in REPORT_SECTIONS[section]:
+                    result[key] = report[key]
+        if request.args.get('verify') in ('1', 'true', 'yes'):
+            drift = analytics_aggregates.verify(data)
+            result['verification'] = {'ok': not drift, 'drift': drift}
+            if drift:
+                print(f"Analytics drift detected, rebuilding counters: {sorted(drift)}")
+                analytics_aggregates.reset(data)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/analytics/trends', methods=['GET'])
+@login_required
+def get_analytics_trends():
+    """Return how the counts of one column changed over time, from the daily snapshots.
+
+    ?dimension= is the column (Application Status by default), ?from= and
+    ?to= the date range (the last DEFAULT_TREND_DAYS days by default) and
+    ?interval= day, week or month.
+    """
+    try:
+        start, end = date_range_args(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    dimension = request.args.get('dimension', 'Application Status')
+    if dimension not in SNAPSHOT_COLUMNS:
+        return jsonify({"status": "error", "message": f"dimension must be one of: {', '.join(SNAPSHOT_COLUMNS)}"}), 400
+    interval = request.args.get('interval', 'day')
+    if interval not in TREND_INTERVALS:
+        return jsonify({"status": "error", "message": f"interval must be one of: {', '.join(TREND_INTERVALS)}"}), 400
+    end = end or datetime.now().date()
+    start = start or end - timedelta(days=DEFAULT_TREND_DAYS - 1)
+    if start > end:
+        return jsonify({"status": "error", "message": "from must not be after to"}), 400
+    try:
+        return jsonify(analytics_snapshots.trend(dimension, start, end, interval))
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/analysis/summary', methods=['GET'])
+@login_required
+@conditional_get(dataset_version)
+def get_analysis_summary():
+    """Return numeric statistics of the CTC columns"""
+    try:
+        return jsonify(group_engine.summary())
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/analysis/group/<column>', methods=['GET'])
+@login_required
+@conditional_get(dataset_version)
+def get_group_analysis(column):
+    """Return record counts per value of a column.
+
+    Pass ?by=<column> (repeatable) to cross-tabulate against other columns.
+    """
+    try:
+        by_columns = request.args.getlist('by')
+        columns = group_engine.columns()
+        unknown = [c for c in [column] + by_columns if c not in columns]
+        if unknown:
+            return jsonify({"status": "error", "message": f"Unknown column: {', '.join(unknown)}"}), 404
+        return jsonify(group_engine.group(column, by_columns))
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/cache-stats', methods=['GET'])
+@login_required
+def get_cache_stats():
+    """Return hit/miss counters of the candidate cache"""
+    return jsonify({
+        **candidate_store.stats(),
+        **({'persistence': candidate_storage.persistence_stats()} if hasattr(candidate_storage, 'persistence_stats') else {}),
+        'group_analysis': group_engine.stats(),
+        'change_log': change_log.stats(),
+        'events': event_broadcaster.stats(),
+        'search_index': search_index.stats(),
+        'facet_index': facet_index.stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Return request and stage timings in the Prometheus text format (no login, for scrapers)"""
+    events = event_broadcaster.stats()
+    body = metrics.render({
+        'ready': ('1 once the candidate data has been loaded', int(warm_up_state['ready'])),
+        'dataset_version': ('Version of the candidate data in this process', candidate_store.version),
+        'event_subscribers': ('Open live-update streams', events['subscribers']),
+        'kept_profiles': ('Request profiles kept for inspection', len(profiler.profiles))
+    })
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profiles', methods=['GET'])
+@admin_required
+def get_profiles():
+    """List the kept request profiles, newest first (admin only)"""
+    return jsonify({"slow_ms": PROFILE_SLOW_MS, "profiles": profiler.summaries()})
+
+@app.route('/api/profiles/<int:profile_id>', methods=['GET'])
+@admin_required
+def get_profile(profile_id):
+    """Return one request profile (admin only).
+
+    The functions with the most samples (?sort=self, the default, or
+    ?sort=total), or every sampled stack with ?format=collapsed.
+    """
+    profile = profiler.get(profile_id)
+    if profile is None:
+        return jsonify({"status": "error", "message": "Profile not found"}), 404
+    if request.args.get('format') == 'collapsed':
+        return Response(collapsed(profile['samples']), mimetype='text/plain')
+    summary = {key: value for key, value in profile.items() if key != 'samples'}
+    return jsonify({**summary, "sample_count": sum(profile['samples'].values()),
+                    "interval_ms": profiler.interval * 1000,
+                    "top_functions": top_functions(profile['samples'], sort=request.args.get('sort', 'self'))})
+
 @app.route('/api/dropdown-options', methods=['GET'])
 @login_required
+@conditional_get(static_version)
 def get_dropdown_options():
     """Return all dropdown options for form fields"""
-    dropdown_options = {
-        'Interested Position': [
-            'Backend Developer', 
-            'Frontend Developer', 
-            'Full Stack Developer', 
-            'DevOps Engineer', 
-            'Data Engineer', 
-            'Data Scientist',
-            'UI/UX Designer',
-            'Product Manager',
-            'QA Engineer'
-        ],
-        'Current Role': [
-            'Software Engineer',
-            'Senior Software Engineer',
-            'Lead Engineer',
-            'Engineering Manager',
-            'Architect',
-            'QA Engineer',
-            'DevOps Engineer',
-            'Data Engineer',
-            'Data Scientist',
-            'Product Manager',
-            'UI/UX Designer'
-        ],
-        'Current Location': [
-            'Bangalore', 
-            'Chennai', 
-            'Hyderabad', 
-            'Mumbai', 
-            'Delhi', 
-            'Pune', 
-            'Kolkata',
-            'Remote'
-        ],
-        'Location Preference': [
-            'Bangalore', 
-            'Chennai', 
-            'Hyderabad', 
-            'Mumbai', 
-            'Delhi', 
-            'Pune', 
-            'Kolkata',
-            'Remote'
-        ],
-        'Total Years of Experience': [
-            '0-1 years',
-            '1-2 years',
-            '2-3 years',
-        ],
-        'Notice Period': [
-            'Immediate',
-            '15 days',
-            '30 days',
-            '60 days',
-            '90 days'
-        ],
-        'In Notice': ['Yes', 'No'],
-        'Immediate Joiner': ['Yes', 'No'],
-        'Offers in Hand': ['Yes', 'No'],
-        'Interview Status': [
-            'Applied',
-            'Profile Screening Comp',
-            'Voice Screening Comp',
-            'Tech Inter Sched',
-            'Tech Inter Comp',
-            'Code Inter Sched',
-            'Code Inter Comp',
-            'HR Inter Sched',
-            'HR Inter Comp',
-            'Offer',
-            'Pending Final Noti',
-            'References',
-            'All Completed'
-        ],
-        'Application Status': [
-            'Proceed Further',
-            'On Hold',
-            'No Resp Call/Email',
-            'Did Not Join',
-            'Sent',
-            'Recieved',
-            'In Notice',
-            'Accepted',
-            'Rejected',
-            'Joined'
-        ],
-        'Reject Mail Sent': ['Yes', 'No']
-    }
-    
-    return jsonify(dropdown_options)
+    return jsonify(DROPDOWN_OPTIONS)
+
+@app.route('/api/storage/export', methods=['POST'])
+@admin_required
+def export_storage():
+    """Write the SQLite candidates back to data.xlsx (admin only)"""
+    if candidate_storage.name != 'sqlite':
+        return jsonify({"status": "error", "message": "Candidates are already stored in Excel"}), 400
+    try:
+        count = candidate_storage.export_to_excel(EXCEL_FILE, SHEET_NAME)
+        return jsonify({"status": "success", "message": f"Exported {count} records to {EXCEL_FILE}"})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
 # User Management Routes (Admin Only)
 @app.route('/users')
@@ -750,12 +1228,65 @@ def delete_user(user_id):
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
-if __name__ == '__main__':
-    init_user_db()
-    # Apply header ordering to existing Excel data on startup
+# Progress of the startup warm-up, reported by /api/ready ('started': ID of the process that started it)
+warm_up_state = {'started': None, 'ready': False, 'migrated': False, 'error': None, 'seconds': None}
+warm_up_lock = threading.Lock()
+
+# Bring the stored candidates up to the current layout, rewriting them only if needed
+def prepare_storage():
+    """Return whether anything had to be migrated"""
+    if candidate_storage.name == 'sqlite':
+        # One-shot import of the existing workbook into an empty database
+        with candidate_storage.write_lock():
+            if candidate_storage.count() == 0 and os.path.exists(EXCEL_FILE):
+                candidate_storage.migrate_from_excel(EXCEL_FILE, SHEET_NAME)
+                return True
+        return False
+    # Only the header row is read to decide; the sheet is rewritten just once
+    # to reorder the headers or rename 'Initial Remarks'
+    if candidate_storage.needs_header_migration():
+        save_data(load_data())
+        return True
+    return False
+
+# Migrate if needed, then load the candidates and build the indexes ahead of the first request
+def warm_up():
+    started = time.perf_counter()
     try:
-        data = load_data()
-        save_data(data)
+        warm_up_state['migrated'] = prepare_storage()
+        candidate_store.get_rows()
+        warm_up_state['ready'] = True
+        if ANALYTICS_SNAPSHOT_INTERVAL > 0:
+            snapshot_recorder.start()
     except Exception as e:
-        print(f"Error applying header ordering on startup: {e}")
+        warm_up_state['error'] = str(e)
+        print(f"Error warming up candidate data: {e}")
+    warm_up_state['seconds'] = round(time.perf_counter() - started, 3)
+    print(f"Candidate data warm-up finished in {warm_up_state['seconds']}s")
+
+# Run the warm-up once per process, in the background so the server starts right away.
+# Also run before every request, so each worker process warms up on its first one
+@app.before_request
+def start_warm_up():
+    with warm_up_lock:
+        # Threads do not survive a fork, so a forked worker starts its own
+        if warm_up_state['started'] == os.getpid():
+            return
+        warm_up_state.update(started=os.getpid(), ready=False, migrated=False, error=None, seconds=None)
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    """Return 200 once the candidate data is loaded, 503 while it is still warming up"""
+    if warm_up_state['ready']:
+        return jsonify({"status": "ready", "migrated": warm_up_state['migrated'], "seconds": warm_up_state['seconds']})
+    if warm_up_state['error']:
+        return jsonify({"status": "error", "message": warm_up_state['error']}), 503
+    return jsonify({"status": "starting"}), 503
+
+if __name__ == '__main__':
+    init_user_db()
+    # The debug reloader runs this block in a watcher process too; warm up only the server
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warm_up()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,230 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from dropdown_options import DROPDOWN_OPTIONS
+from generate_dataset import generate_candidate, generate_candidates, write_workbook
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory the results of each run are written to, one JSON file per run
+RESULTS_DIR = 'benchmarks'
+
+
+# Latency percentiles and throughput of one operation
+def summarize(timings, errors):
+    """Return the summary of a list of request durations in seconds"""
+    ordered = sorted(timings)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))] * 1000, 2)
+
+    total = sum(ordered)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'mean_ms': round(total / len(ordered) * 1000, 2),
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'max_ms': round(ordered[-1] * 1000, 2),
+        'throughput_rps': round(len(ordered) / total, 1) if total else None
+    }
+
+
+# Peak resident memory of this process so far, or None where it cannot be read
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+# One dataset size, in a fresh process so its peak memory is its own
+def run_size(work_dir, rows, backend, requests, seed, results):
+    os.chdir(work_dir)
+    # Keep the app's per-request log lines out of the report
+    sys.stdout = open(os.devnull, 'w')
+    os.environ['CANDIDATE_STORAGE'] = backend
+    sys.path.insert(0, APP_DIR)
+    import app as hr_app
+    hr_app.init_user_db()
+
+    started = time.perf_counter()
+    hr_app.prepare_storage()
+    prepare_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    hr_app.candidate_store.get_rows()
+    load_seconds = time.perf_counter() - started
+    load_peak = peak_rss_mb()
+
+    client = hr_app.app.test_client()
+    rng = random.Random(seed)
+    now = datetime.now()
+    operations = {}
+
+    def measure(name, call, expected=200):
+        timings = []
+        errors = 0
+        for i in range(requests):
+            started = time.perf_counter()
+            response = call(i)
+            timings.append(time.perf_counter() - started)
+            if response.status_code != expected:
+                errors += 1
+        operations[name] = summarize(timings, errors)
+
+    # Logging in leaves the client with a session for the calls below
+    measure('login', lambda i: client.post('/login', data={'username': hr_app.ADMIN_USERNAME, 'password': hr_app.ADMIN_PASSWORD}), 302)
+    measure('list', lambda i: client.get('/api/data'))
+    measure('list_page', lambda i: client.get('/api/data', query_string={'page': i % 10 + 1, 'limit': 50, 'sort': 'Name'}))
+    measure('filter', lambda i: client.get('/api/data', query_string={
+        'position': rng.choice(DROPDOWN_OPTIONS['Interested Position']),
+        'status': rng.choice(DROPDOWN_OPTIONS['Application Status']),
+        'limit': 50
+    }))
+    measure('analytics', lambda i: client.get('/api/analytics'))
+
+    added = []
+
+    def add(i):
+        response = client.post('/api/data', json=generate_candidate(rng, rows + i, now, 30))
+        if response.status_code == 200:
+            added.append(response.get_json()['record']['_id'])
+        return response
+
+    measure('add', add)
+    ids = [row['_id'] for row in hr_app.candidate_store.get_rows()]
+    measure('update', lambda i: client.put(f'/api/data/{rng.choice(ids)}', json={'Comments': f'benchmark update {i}'}))
+    measure('delete', lambda i: client.delete(f'/api/data/{added.pop() if added else 0}'))
+
+    # What save_data() costs: one rewrite of every record
+    started = time.perf_counter()
+    hr_app.save_data(hr_app.load_data())
+    rewrite_seconds = time.perf_counter() - started
+
+    if hasattr(hr_app.candidate_storage, 'close'):
+        hr_app.candidate_storage.close()
+    results.put({
+        'rows': rows,
+        'prepare_seconds': round(prepare_seconds, 3),
+        'load_seconds': round(load_seconds, 3),
+        'rewrite_seconds': round(rewrite_seconds, 3),
+        'load_peak_rss_mb': load_peak,
+        'peak_rss_mb': peak_rss_mb(),
+        'operations': operations
+    })
+
+
+# Print the results of one dataset size
+def print_result(result):
+    print(f"{result['rows']} rows: migrate {result['prepare_seconds']}s, load {result['load_seconds']}s, rewrite {result['rewrite_seconds']}s, "
+          f"peak RSS {result['load_peak_rss_mb']} MB after load, {result['peak_rss_mb']} MB overall")
+    for name, summary in result['operations'].items():
+        print(f"  {name:<10} p50 {summary['p50_ms']:>9.2f} ms  p95 {summary['p95_ms']:>9.2f} ms  "
+              f"p99 {summary['p99_ms']:>9.2f} ms  {summary['throughput_rps'] or 0:>8.1f} req/s"
+              + (f"  {summary['errors']} errors" if summary['errors'] else ''))
+
+
+# Print how the p50 latencies changed against an earlier results file
+def print_comparison(previous, current):
+    print(f"Compared with {previous['started']} ({previous.get('commit') or 'unknown commit'}):")
+    earlier = {result['rows']: result for result in previous['results']}
+    for result in current['results']:
+        before = earlier.get(result['rows'])
+        if before is None:
+            continue
+        changes = []
+        for name, summary in result['operations'].items():
+            old = before['operations'].get(name)
+            if old and old['p50_ms']:
+                changes.append(f"{name} {(summary['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100:+.0f}%")
+        print(f"  {result['rows']} rows p50: " + ', '.join(changes))
+
+
+# The commit being measured, if the code is in a git checkout
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the API on synthetic datasets of several sizes')
+    parser.add_argument('--sizes', default='1000,10000', help='comma-separated candidate counts')
+    parser.add_argument('--requests', type=int, default=50, help='requests per operation and size')
+    parser.add_argument('--storage', choices=['excel', 'sqlite'], default='excel')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help=f'results file (default: {RESULTS_DIR}/<time>-<storage>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare with')
+    args = parser.parse_args()
+
+    started = datetime.now()
+    output = args.output or os.path.join(RESULTS_DIR, f"{started.strftime('%Y%m%d-%H%M%S')}-{args.storage}.json")
+    run = {
+        'started': started.isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'storage': args.storage,
+        'requests': args.requests,
+        'seed': args.seed,
+        'results': []
+    }
+
+    context = multiprocessing.get_context('spawn')
+    for rows in [int(size) for size in args.sizes.split(',')]:
+        # Every size runs on a fresh workbook in a scratch directory, never on the real data
+        work_dir = tempfile.mkdtemp(prefix='hr-bench-')
+        try:
+            write_workbook(os.path.join(work_dir, 'data.xlsx'), 'Candidates', generate_candidates(rows, args.seed))
+            results = context.Queue()
+            process = context.Process(target=run_size, args=(work_dir, rows, args.storage, args.requests, args.seed, results))
+            process.start()
+            while True:
+                try:
+                    result = results.get(timeout=1)
+                    break
+                except queue.Empty:
+                    if not process.is_alive():
+                        print(f"Benchmark of {rows} rows failed (exit code {process.exitcode})")
+                        return 1
+            process.join()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        print_result(result)
+        run['results'].append(result)
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(json.load(f), run)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import csv
+import io
+import re
+from datetime import datetime
+
+import openpyxl
+
+from excel_storage import CANDIDATE_HEADERS, cell_text
+from group_analysis import CTC_FIELDS, parse_number
+
+# Largest batch accepted by a single import
+MAX_IMPORT_ROWS = 5000
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Header spellings seen in job portal exports -> candidate sheet header
+HEADER_ALIASES = {
+    'initial remarks': 'Initial Screening',
+    'email': 'Email ID',
+    'email address': 'Email ID',
+    'phone': 'Contact Number',
+    'phone number': 'Contact Number',
+    'mobile': 'Contact Number',
+    'position': 'Interested Position',
+    'location': 'Current Location',
+    'experience': 'Total Years of Experience',
+    'linkedin': 'LinkedIn Profile'
+}
+
+
+class UploadError(Exception):
+    """Raised when an uploaded file cannot be read at all"""
+
+
+# Normalize a header for case- and whitespace-insensitive matching
+def header_key(header):
+    return re.sub(r'\s+', ' ', str(header or '')).strip().lower()
+
+
+# Map the headers of an uploaded file onto the candidate sheet headers
+def map_headers(headers):
+    """Return (column mapping, ignored headers); the mapping is a list of sheet headers or None"""
+    known = {header_key(header): header for header in CANDIDATE_HEADERS}
+    mapping = []
+    ignored = []
+    for header in headers:
+        key = header_key(header)
+        target = known.get(key) or HEADER_ALIASES.get(key)
+        if target in mapping:
+            target = None
+        mapping.append(target)
+        if target is None and key:
+            ignored.append(str(header))
+    return mapping, ignored
+
+
+# Iterate the rows of a read-only workbook and close it afterwards
+def iter_and_close(wb, rows):
+    try:
+        yield from rows
+    finally:
+        wb.close()
+
+
+# Read the rows of an uploaded xlsx or CSV file
+def read_upload(filename, stream, sheet_name):
+    """Return (headers, row iterator); xlsx files are parsed in read-only mode"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension in ('xlsx', 'xlsm'):
+        try:
+            wb = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        except Exception as e:
+            raise UploadError(f"Could not read workbook: {e}")
+        sheet = wb[sheet_name] if sheet_name in wb.sheetnames else wb.active
+        rows = iter_and_close(wb, sheet.iter_rows(values_only=True))
+    elif extension == 'csv':
+        rows = csv.reader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    else:
+        raise UploadError('Upload an .xlsx or .csv file')
+
+    headers = next(rows, None)
+    if not headers:
+        raise UploadError('The file has no header row')
+    return list(headers), rows
+
+
+# Validate the uploaded rows and turn them into candidate records
+def build_records(headers, rows, existing_emails):
+    """Return (records, errors, ignored headers).
+
+    Errors are reported per row using the row number as shown in the
+    spreadsheet. Rows with errors are left out of the returned records.
+    """
+    mapping, ignored = map_headers(headers)
+    if not any(mapping):
+        raise UploadError('None of the columns match the candidate sheet headers')
+
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    seen_emails = set(existing_emails)
+    records = []
+    errors = []
+    for row_number, row in enumerate(rows, 2):
+        values = {target: cell_text(value).strip() for target, value in zip(mapping, row) if target}
+        if not any(values.values()):
+            continue  # Skip blank rows
+        if len(records) + len(errors) >= MAX_IMPORT_ROWS:
+            errors.append({'row': row_number, 'errors': [f'Import is limited to {MAX_IMPORT_ROWS} rows']})
+            break
+
+        row_errors = []
+        email = values.get('Email ID', '')
+        if not values.get('Name') and not email:
+            row_errors.append('Name or Email ID is required')
+        if email:
+            if not EMAIL_PATTERN.match(email):
+                row_errors.append(f'Invalid Email ID: {email}')
+            elif email.lower() in seen_emails:
+                row_errors.append(f'Duplicate Email ID: {email}')
+        for field in CTC_FIELDS:
+            if values.get(field) and parse_number(values[field]) is None:
+                row_errors.append(f'{field} must be a number')
+
+        if row_errors:
+            errors.append({'row': row_number, 'errors': row_errors})
+            continue
+
+        if email:
+            seen_emails.add(email.lower())
+        record = {header: values.get(header, '') for header in CANDIDATE_HEADERS}
+        record['Date'] = record['Date'] or now
+        records.append(record)
+
+    return records, errors, ignored
@@ -0,0 +1,141 @@
+import re
+
+from row_store import record_dict
+
+# Query parameter -> candidate column for the table view filters
+FILTER_COLUMNS = {
+    'position': 'Interested Position',
+    'status': 'Application Status',
+    'location': 'Location Preference',
+    'experience': 'Total Years of Experience',
+    'notice_period': 'Notice Period'
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+# Read the leading number of a value like '2-3 years', like parseFloat() does
+def leading_number(value):
+    match = re.match(r'\s*([-+]?\d*\.?\d+)', value or '')
+    return float(match.group(1)) if match else 0.0
+
+
+# Normalize a notice period so '30 days', '30days' and '30' compare equal
+def normalize_notice_period(value):
+    return re.sub(r'\s*days?$', '', (value or '').strip().lower())
+
+
+# Sort key that orders numbers numerically and everything else case-insensitively
+def sort_value(value):
+    value = '' if value is None else str(value).strip()
+    try:
+        return (0, float(value), '')
+    except ValueError:
+        return (1, 0.0, value.lower())
+
+
+# Collect the filter values present in the request arguments
+def parse_filters(args):
+    """Return {param: value} for every non-empty table filter in args"""
+    return {param: args.get(param, '').strip() for param in FILTER_COLUMNS if args.get(param, '').strip()}
+
+
+# Check a single candidate against the table view filters
+def matches_filters(row, filters):
+    """Apply the same rules the table view used to apply in the browser"""
+    position = filters.get('position')
+    if position and row.get('Interested Position', '').strip().lower() != position.lower():
+        return False
+
+    status = filters.get('status')
+    if status:
+        application_status = row.get('Application Status', '')
+        if status == 'EMPTY':
+            if application_status:
+                return False
+        elif application_status != status:
+            return False
+
+    location = filters.get('location')
+    if location and row.get('Location Preference', '') != location:
+        return False
+
+    experience = filters.get('experience')
+    if experience:
+        years = leading_number(row.get('Total Years of Experience', ''))
+        if experience.endswith('+'):
+            if years < leading_number(experience):
+                return False
+        else:
+            bounds = experience.split('-')
+            try:
+                min_exp = float(bounds[0])
+                max_exp = float(bounds[-1])
+            except ValueError:
+                return False
+            if not min_exp <= years <= max_exp:
+                return False
+
+    notice_period = filters.get('notice_period')
+    if notice_period and normalize_notice_period(row.get('Notice Period', '')) != normalize_notice_period(notice_period):
+        return False
+
+    return True
+
+
+# Read the requested page number and page size
+def page_args(args):
+    """Return (page, limit), or (None, None) when no pagination was asked for"""
+    if 'page' not in args and 'limit' not in args:
+        return None, None
+    page = max(args.get('page', 1, type=int) or 1, 1)
+    limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE
+    return page, min(max(limit, 1), MAX_PAGE_SIZE)
+
+
+# Read the requested column projection
+def field_args(args):
+    """Return the columns listed in ?fields= (comma separated), or None for every column"""
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()]
+    return list(dict.fromkeys(fields)) or None
+
+
+# Keep only the given columns of each row, plus the record bookkeeping fields
+def project_rows(rows, fields):
+    """Return copies of the rows holding just fields and the '_' fields, or the rows themselves if fields is None"""
+    if fields is None:
+        return rows
+    keys = fields + [key for key in ('_id', '_version', '_originalIndex') if key not in fields]
+    return [{key: row[key] for key in keys if key in row} for row in rows]
+
+
+# Yield (index, row) for the candidates matching the filters, in the requested order
+def iter_candidates(rows, args):
+    """Lazily filter the rows; only a requested sort materializes the matches"""
+    filters = parse_filters(args)
+    matched = ((index, row) for index, row in enumerate(rows) if not filters or matches_filters(row, filters))
+
+    sort_key = args.get('sort', '').strip()
+    if sort_key:
+        descending = args.get('order', 'asc').lower() == 'desc'
+        matched = sorted(matched, key=lambda item: sort_value(item[1].get(sort_key)), reverse=descending)
+    return matched
+
+
+# Filter, sort and paginate the candidate rows for GET /api/data
+def query_candidates(rows, args):
+    """Return (page_rows, total) for the filters, sort and page in args.
+
+    Every returned row is a copy carrying its position in the full list as
+    '_originalIndex'; the record endpoints are addressed by its '_id'.
+    Without page/limit arguments all matching rows are returned.
+    """
+    matched = list(iter_candidates(rows, args))
+    total = len(matched)
+    page, limit = page_args(args)
+    if page is not None:
+        start = (page - 1) * limit
+        matched = matched[start:start + limit]
+
+    return [{**record_dict(row), '_originalIndex': index} for index, row in matched], total
@@ -0,0 +1,184 @@
+import threading
+
+from excel_storage import ID_FIELD, VERSION_FIELD
+from metrics import stage
+from row_store import CompactRow, RowSchema
+
+
+class VersionConflict(Exception):
+    """Raised when a write expects a record version that is no longer current"""
+
+    def __init__(self, record):
+        super().__init__(
+            f"Record {record[ID_FIELD]} was changed by someone else (now at version {record[VERSION_FIELD]})"
+        )
+        self.record = record
+
+
+class CandidateStore:
+    """Shared in-memory copy of the candidate records.
+
+    The storage backend is read once and every read is served from memory.
+    The cached rows are dropped when the backend's signature changes (for
+    the workbook: someone edited data.xlsx by hand, or another process saved
+    it), and patched in place when a write goes through mutate().
+
+    Cached rows are CompactRows sharing one RowSchema per load: field names
+    are stored once and repeated values are pooled. They read like dicts
+    and are turned into dicts only when a response is serialized; the
+    records a write returns and hands to listeners are plain dicts.
+
+    A storage backend provides load(build), signature(), write_lock() and the
+    row-level write methods update_row(), update_rows(), append_row(),
+    append_rows(), delete_row() and replace_all(), which persist the change
+    and apply it to the row list they are given. The signature changes with
+    every write made by any process sharing the storage, and write_lock()
+    is an inter-process lock, so several server processes can share it. Every record carries a stable '_id' and
+    a '_version' that the backend bumps on each update.
+
+    Every load and every successful write bumps the dataset version, which
+    derived results (group-bys, ETags, change feeds) are keyed on.
+
+    Listeners (objects with reset(rows) and apply(old, new) methods) are
+    kept in step with the cached rows: reset() after every load and apply()
+    for every record a write adds (old is None), changes or removes (new is
+    None). Listeners that also define committed(version) are told the new
+    dataset version once a load or write has taken effect.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._rows = None
+        self._signature = None
+        self.schema = RowSchema()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.version = 0
+        self.listeners = []
+        self._positions = {}
+
+    def get_rows(self):
+        """Return the cached rows, reloading them if the backend has changed.
+
+        The returned list is shared between requests and must be treated as
+        read-only; use load_data() to get a copy that can be modified.
+        """
+        with self._lock:
+            signature = self.storage.signature()
+            if self._rows is not None and signature is not None and signature == self._signature:
+                self.hits += 1
+                return self._rows
+
+            self.misses += 1
+            if self._rows is not None:
+                self.reloads += 1
+            # A fresh schema per load keeps the fields in the storage's column order
+            schema = RowSchema()
+            rows = self.storage.load(schema.compact)
+            self.schema = schema
+            self._rows = rows
+            # Loading may have created the file, so take the signature afterwards
+            self._signature = self.storage.signature()
+            self.version += 1
+            self.notify_reset(rows)
+            self.notify_committed()
+            return rows
+
+    def snapshot(self):
+        """Return (rows, version) for the same state of the data"""
+        with self._lock:
+            rows = self.get_rows()
+            return rows, self.version
+
+    def position_of(self, record_id, rows=None):
+        """Return the position of the record with the given ID, or None.
+
+        The ID -> position map is checked against the row it points at and
+        rebuilt when that row moved (after a delete) or is missing (after an
+        append), so lookups are O(1) between writes that shift rows.
+        """
+        with self._lock:
+            if rows is None:
+                rows = self.get_rows()
+            position = self._positions.get(record_id)
+            if position is not None and position < len(rows) and rows[position][ID_FIELD] == record_id:
+                return position
+            self._positions = {row[ID_FIELD]: position for position, row in enumerate(rows)}
+            return self._positions.get(record_id)
+
+    def mutate(self, mutation):
+        """Run mutation(rows, storage) under the store lock.
+
+        The mutation persists the change through the storage backend and
+        applies it to a copy of the cached row list. Readers keep seeing the
+        old list until the mutation succeeds. If it fails the cache is
+        dropped, since memory and storage may no longer agree; a
+        VersionConflict is raised before anything is written and keeps it.
+        Holding the lock (and the storage's inter-process write lock) for the
+        whole mutation serializes writers, and the rows are checked against
+        the storage first, so a version check inside the mutation cannot
+        race another write, in this process or another one.
+        """
+        with self._lock, self.storage.write_lock():
+            self.get_rows()
+            rows = list(self._rows)
+            try:
+                with stage('mutate'):
+                    result = mutation(rows, self.storage)
+            except VersionConflict:
+                raise
+            except Exception:
+                self.invalidate()
+                raise
+            # The backend puts plain dicts into the list for the records it wrote
+            self._rows = [row if type(row) is CompactRow else self.schema.compact(row) for row in rows]
+            self._signature = self.storage.signature()
+            self.version += 1
+            self.notify_committed()
+            return result
+
+    def add_listener(self, listener):
+        """Register a listener and bring it up to date with the cached rows"""
+        with self._lock:
+            self.listeners.append(listener)
+            if self._rows is not None:
+                listener.reset(self._rows)
+
+    def notify(self, old, new):
+        """Tell listeners that one record changed (called inside a mutation)"""
+        for listener in self.listeners:
+            listener.apply(old, new)
+
+    def notify_reset(self, rows):
+        """Tell listeners to rebuild from the given rows"""
+        for listener in self.listeners:
+            listener.reset(rows)
+
+    def notify_committed(self):
+        """Tell listeners which dataset version the changes so far belong to"""
+        for listener in self.listeners:
+            if hasattr(listener, 'committed'):
+                listener.committed(self.version)
+
+    def invalidate(self):
+        """Forget the cached rows so the next read loads them again"""
+        with self._lock:
+            self._rows = None
+            self._signature = None
+
+    def stats(self):
+        """Return cache counters for inspection"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.storage.name,
+                'version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'cached_rows': len(self._rows) if self._rows is not None else 0,
+                'loaded': self._rows is not None
+            }
@@ -0,0 +1,71 @@
+from collections import deque
+import threading
+
+from excel_storage import ID_FIELD
+
+# Record changes remembered for /api/data/changes
+MAX_CHANGES = 5000
+
+
+class ChangeLog:
+    """Bounded log of which records changed at which dataset version.
+
+    Registered as a CandidateStore listener. Every added, updated or deleted
+    record is logged with the version its write produced, so a client that
+    has seen version N can be sent just the records touched since. A reload
+    of the data, or trimming entries past MAX_CHANGES, raises the oldest
+    version the log can still answer for; older clients have to resync.
+    """
+
+    def __init__(self, max_changes=MAX_CHANGES):
+        self._lock = threading.Lock()
+        self._entries = deque()
+        self._pending = set()
+        self._cleared = False
+        self.max_changes = max_changes
+        self.version = 0
+        self.oldest = 0
+
+    def reset(self, rows):
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self._cleared = True
+
+    def apply(self, old, new):
+        with self._lock:
+            self._pending.add((new or old)[ID_FIELD])
+
+    def committed(self, version):
+        with self._lock:
+            if self._cleared:
+                self.oldest = version
+                self._cleared = False
+            for record_id in self._pending:
+                self._entries.append((version, record_id))
+            self._pending.clear()
+            while len(self._entries) > self.max_changes:
+                dropped_version, _ = self._entries.popleft()
+                self.oldest = max(self.oldest, dropped_version)
+            self.version = version
+
+    def changed_since(self, since):
+        """Return (record IDs changed after version since, current version).
+
+        The IDs are None when the log no longer reaches back to since (or
+        since is from before a restart) and the client has to resync.
+        """
+        with self._lock:
+            if since < self.oldest or since > self.version:
+                return None, self.version
+            changed = set()
+            for version, record_id in reversed(self._entries):
+                if version <= since:
+                    break
+                changed.add(record_id)
+            return changed, self.version
+
+    def stats(self):
+        """Return the size and reach of the log"""
+        with self._lock:
+            return {'entries': len(self._entries), 'oldest': self.oldest, 'version': self.version}
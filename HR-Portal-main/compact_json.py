@@ -0,0 +1,41 @@
+# Columns with at most this many distinct values may be dictionary-encoded
+DICTIONARY_MAX_VALUES = 255
+
+
+# Columns of the rows in first-seen order (records normally share one header row)
+def row_columns(rows):
+    columns = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+# Encode rows as one header list plus a list of values per row
+def encode_columnar(rows, dictionary=False):
+    """Return {"columns", "rows"[, "dictionaries"]} for a list of record dicts.
+
+    Missing values come out as null. With dictionary=True every column with
+    few distinct values (statuses, locations, positions) is sent as indexes
+    into "dictionaries"[column], as long as that actually saves space, i.e.
+    the column repeats values more than it holds distinct ones.
+    """
+    columns = row_columns(rows)
+    encoded = {'columns': columns, 'rows': [[row.get(column) for column in columns] for row in rows]}
+    if not dictionary or not rows:
+        return encoded
+
+    dictionaries = {}
+    for position, column in enumerate(columns):
+        values = {}
+        for row in encoded['rows']:
+            values.setdefault(row[position], len(values))
+            if len(values) > DICTIONARY_MAX_VALUES:
+                break
+        if len(values) > DICTIONARY_MAX_VALUES or len(values) * 2 > len(rows):
+            continue
+        for row in encoded['rows']:
+            row[position] = values[row[position]]
+        dictionaries[column] = list(values)
+    encoded['dictionaries'] = dictionaries
+    return encoded
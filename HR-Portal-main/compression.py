@@ -0,0 +1,52 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # Optional: responses fall back to gzip without it
+    brotli = None
+
+# Smaller bodies are sent as they are; compressing them saves nothing worth the time
+MIN_COMPRESS_BYTES = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript'}
+
+
+# Pick the best encoding the client accepts
+def choose_encoding(accept_encodings):
+    """Return 'br', 'gzip' or None for the request's Accept-Encoding"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+# Compress a finished response in place when it is worth it
+def compress_response(response, accept_encodings):
+    """Compress a buffered text/JSON body with brotli or gzip.
+
+    Streamed and file responses (exports, the event stream, static files)
+    and bodies under MIN_COMPRESS_BYTES are left alone. The ETags set by the
+    API are weak, so they stay valid for the compressed body.
+    """
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(accept_encodings)
+    body = response.get_data()
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return response
+
+    if encoding == 'br':
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+
+# Register the markers used by the tests
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: starts several server processes (deselect with -m "not slow")')
+
+
+# The app module working on a fresh data.xlsx and user database in a temporary directory
+@pytest.fixture
+def hr_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import app
+    # Tests load the data themselves; no background warm-up
+    monkeypatch.setitem(app.warm_up_state, 'started', os.getpid())
+    app.candidate_store.invalidate()
+    app.init_user_db()
+    yield app
+    if hasattr(app.candidate_storage, 'close'):
+        app.candidate_storage.close()
+    app.candidate_store.invalidate()
+
+
+# A test client of the app, logged in as an admin
+@pytest.fixture
+def client(hr_app):
+    client = hr_app.app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['username'] = 'admin'
+        session['is_admin'] = True
+    return client
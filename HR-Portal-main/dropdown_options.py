@@ -0,0 +1,90 @@
+# Values offered by the form dropdowns, also used to generate synthetic candidates
+DROPDOWN_OPTIONS = {
+    'Interested Position': [
+        'Backend Developer',
+        'Frontend Developer',
+        'Full Stack Developer',
+        'DevOps Engineer',
+        'Data Engineer',
+        'Data Scientist',
+        'UI/UX Designer',
+        'Product Manager',
+        'QA Engineer'
+    ],
+    'Current Role': [
+        'Software Engineer',
+        'Senior Software Engineer',
+        'Lead Engineer',
+        'Engineering Manager',
+        'Architect',
+        'QA Engineer',
+        'DevOps Engineer',
+        'Data Engineer',
+        'Data Scientist',
+        'Product Manager',
+        'UI/UX Designer'
+    ],
+    'Current Location': [
+        'Bangalore',
+        'Chennai',
+        'Hyderabad',
+        'Mumbai',
+        'Delhi',
+        'Pune',
+        'Kolkata',
+        'Remote'
+    ],
+    'Location Preference': [
+        'Bangalore',
+        'Chennai',
+        'Hyderabad',
+        'Mumbai',
+        'Delhi',
+        'Pune',
+        'Kolkata',
+        'Remote'
+    ],
+    'Total Years of Experience': [
+        '0-1 years',
+        '1-2 years',
+        '2-3 years',
+    ],
+    'Notice Period': [
+        'Immediate',
+        '15 days',
+        '30 days',
+        '60 days',
+        '90 days'
+    ],
+    'In Notice': ['Yes', 'No'],
+    'Immediate Joiner': ['Yes', 'No'],
+    'Offers in Hand': ['Yes', 'No'],
+    'Interview Status': [
+        'Applied',
+        'Profile Screening Comp',
+        'Voice Screening Comp',
+        'Tech Inter Sched',
+        'Tech Inter Comp',
+        'Code Inter Sched',
+        'Code Inter Comp',
+        'HR Inter Sched',
+        'HR Inter Comp',
+        'Offer',
+        'Pending Final Noti',
+        'References',
+        'All Completed'
+    ],
+    'Application Status': [
+        'Proceed Further',
+        'On Hold',
+        'No Resp Call/Email',
+        'Did Not Join',
+        'Sent',
+        'Recieved',
+        'In Notice',
+        'Accepted',
+        'Rejected',
+        'Joined'
+    ],
+    'Reject Mail Sent': ['Yes', 'No']
+}
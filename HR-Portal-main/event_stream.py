@@ -0,0 +1,153 @@
+import json
+import queue
+import threading
+
+from excel_storage import ID_FIELD
+
+# Events buffered per client; a client that falls further behind is told to resync
+MAX_QUEUED_EVENTS = 100
+
+# Seconds between heartbeat comments on an idle stream
+HEARTBEAT_SECONDS = 15
+
+# Seconds between checks for writes made by other server processes
+POLL_SECONDS = 2
+
+# Live connections served at once
+MAX_SUBSCRIBERS = 50
+
+# Writes touching more records than this are announced as a resync instead
+MAX_EVENT_RECORDS = 200
+
+
+# Format one Server-Sent Events message
+def sse_message(event, data):
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class Subscriber:
+    """One connected browser and the events waiting to be sent to it"""
+
+    def __init__(self):
+        self.events = queue.Queue(maxsize=MAX_QUEUED_EVENTS)
+        self.overflows = 0
+
+    def push(self, event, data):
+        try:
+            self.events.put_nowait((event, data))
+        except queue.Full:
+            # Too slow to keep up: drop what it missed and have it resync instead
+            self.overflows += 1
+            while True:
+                try:
+                    self.events.get_nowait()
+                except queue.Empty:
+                    break
+            self.events.put_nowait(('resync', '{}'))
+
+
+class EventBroadcaster:
+    """Pushes candidate changes and analytics counters to connected browsers.
+
+    Registered as a CandidateStore listener (after the analytics aggregates,
+    so their counters are current). Every write is published as one
+    'changes' event in the shape of /api/data/changes followed by an
+    'analytics' event with the counters; loads and very large writes are
+    published as 'resync'. Publishing never blocks the writer: each client
+    has a bounded queue, and a client whose queue is full gets a single
+    'resync' instead of an ever-growing backlog.
+    """
+
+    def __init__(self, analytics, client_version):
+        self.analytics = analytics
+        self.client_version = client_version
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._changes = {}
+        self._reset = False
+        self.published = 0
+
+    def reset(self, rows):
+        self._changes.clear()
+        self._reset = True
+
+    def apply(self, old, new):
+        self._changes[(new or old)[ID_FIELD]] = new
+
+    def committed(self, version):
+        changes, self._changes = self._changes, {}
+        reset, self._reset = self._reset, False
+        if not self._subscribers or not (changes or reset):
+            return
+
+        version = self.client_version(version)
+        if reset or len(changes) > MAX_EVENT_RECORDS:
+            self.publish('resync', {'version': version})
+        else:
+            self.publish('changes', {
+                'version': version,
+                'changes': [record for record in changes.values() if record is not None],
+                'deleted': [record_id for record_id, record in changes.items() if record is None]
+            })
+        self.publish('analytics', self.analytics.snapshot())
+
+    def publish(self, event, payload):
+        """Queue an event for every connected client"""
+        data = json.dumps(payload)
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscriber in subscribers:
+            subscriber.push(event, data)
+
+    def accepting(self):
+        """Return whether another client may connect"""
+        with self._lock:
+            return len(self._subscribers) < MAX_SUBSCRIBERS
+
+    def stream(self, hello, poll=None):
+        """Yield the event stream of one client, starting with a 'hello' event.
+
+        hello() is called once the client is subscribed and returns the
+        payload of the first event (the current version), so nothing that
+        happens after it can be missed. While the stream is idle poll() is
+        called every POLL_SECONDS, so writes made by other server processes
+        (which reach this one as a reload) are published too. The client is
+        unsubscribed when the connection closes, which the heartbeats make
+        sure is noticed.
+        """
+        subscriber = Subscriber()
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            yield 'retry: 5000\n\n' + sse_message('hello', json.dumps(hello()))
+            idle = 0.0
+            wait = min(POLL_SECONDS, HEARTBEAT_SECONDS) if poll else HEARTBEAT_SECONDS
+            while True:
+                try:
+                    event, data = subscriber.events.get(timeout=wait)
+                except queue.Empty:
+                    if poll:
+                        poll()
+                    idle += wait
+                    if idle >= HEARTBEAT_SECONDS:
+                        idle = 0.0
+                        yield ': heartbeat\n\n'
+                    continue
+                idle = 0.0
+                yield sse_message(event, data)
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def stats(self):
+        """Return connection and queue counters"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            published = self.published
+        return {
+            'subscribers': len(subscribers),
+            'published': published,
+            'queued': sum(subscriber.events.qsize() for subscriber in subscribers),
+            'overflows': sum(subscriber.overflows for subscriber in subscribers)
+        }
@@ -0,0 +1,638 @@
+import os
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from xml.etree import ElementTree
+
+import openpyxl
+from openpyxl.cell.cell import MergedCell
+from openpyxl.packaging.custom import IntProperty
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+
+from metrics import stage
+from process_sync import InterProcessLock, SharedState
+from write_journal import SAVE_INTERVAL, BackgroundSaver, Journal, save_atomically
+
+# Desired field order of the candidate sheet (keep 'Date' at the beginning)
+DESIRED_FIELDS = [
+    'Name', 'Email ID', 'Contact Number', 'Interested Position', 'Current Role',
+    'Current Organization', 'Current Location', 'Current CTC per Annum',
+    'Expected CTC per Annum', 'Total Years of Experience', 'Notice Period',
+    'Interview Status', 'Application Status', 'Referred By', 'Comments',
+    'In Notice', 'Immediate Joiner', 'Offers in Hand', 'Offered CTC',
+    'Location Preference', 'Certifications', 'Resume', 'LinkedIn Profile',
+    # Stage-specific remarks that should be persisted
+    'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks',
+    # General/legacy remarks
+    'Remarks', 'Reject Mail Sent', 'Final Remarks'
+]
+
+# Full column layout of a freshly written candidate sheet
+CANDIDATE_HEADERS = ['Date'] + DESIRED_FIELDS
+
+# Bookkeeping columns kept after the candidate fields: a stable record ID
+# and a version number that goes up with every update of the record
+ID_FIELD = '_id'
+VERSION_FIELD = '_version'
+RECORD_FIELDS = [ID_FIELD, VERSION_FIELD]
+
+# Workbook property holding the next record ID, so deleted IDs are never reused
+NEXT_ID_PROPERTY = 'next_candidate_id'
+
+# XML namespaces of the workbook package parts read by read_header_row()
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIP_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+PACKAGE_RELATIONSHIP = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+
+
+# Convert a record value to the string stored in the sheet
+def excel_value(row_data, header):
+    # Migrate old "Initial Remarks" to "Initial Screening"
+    if header == 'Initial Screening':
+        value = row_data.get('Initial Screening') or row_data.get('Initial Remarks', '')
+    else:
+        value = row_data.get(header, '')
+    # Convert value to string, handle None
+    if value is None:
+        return ''
+    return str(value)
+
+
+# Convert a value read from a cell to the string served by the API
+def cell_text(value):
+    # Convert datetime objects to string
+    if isinstance(value, datetime):
+        value = value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value) if value is not None else ''
+
+
+# Parse a stored record ID or version, returning None if it is not a positive integer
+def record_number(value):
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+# Replace missing and repeated record IDs with new ones
+def assign_ids(ids, next_id):
+    """Return (ids, next ID); new IDs start above every ID kept and next_id"""
+    kept = []
+    seen = set()
+    for record_id in ids:
+        if record_id is None or record_id in seen:
+            kept.append(None)
+        else:
+            seen.add(record_id)
+            kept.append(record_id)
+    next_id = max([next_id] + [record_id + 1 for record_id in seen])
+    assigned = []
+    for record_id in kept:
+        if record_id is None:
+            record_id = next_id
+            next_id += 1
+        assigned.append(record_id)
+    return assigned, next_id
+
+
+# Put existing headers into the desired order
+def order_headers(headers):
+    """Return Date + every desired field + any remaining headers + record fields.
+
+    Desired fields missing from headers are created in their place, so the
+    result is unchanged when ordered again and a migrated sheet stays put.
+    """
+    ordered_headers = []
+    if 'Date' in headers:
+        ordered_headers.append('Date')
+    ordered_headers.extend(DESIRED_FIELDS)
+    # Include any headers not in desired list (e.g., 'Reference')
+    ordered_headers.extend([h for h in headers if h not in ordered_headers and h not in RECORD_FIELDS])
+    ordered_headers.extend(RECORD_FIELDS)
+    return ordered_headers
+
+
+# Read the first row of a sheet, parsing the package XML only up to the end of that row
+def read_header_row(path, sheet_name):
+    """Return the header values as strings (None for empty cells).
+
+    openpyxl's read-only mode scans the whole sheet to size it when the
+    sheet has no <dimension> element, as in write-only exports; this stops
+    after the first row and the shared strings it uses.
+    """
+    with zipfile.ZipFile(path) as archive:
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        sheet_ids = {sheet.get('name'): sheet.get(RELATIONSHIP_ID) for sheet in workbook.iter(SHEET_NS + 'sheet')}
+        if sheet_name not in sheet_ids:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+        relationships = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        target = next(rel.get('Target') for rel in relationships.iter(PACKAGE_RELATIONSHIP)
+                      if rel.get('Id') == sheet_ids[sheet_name])
+        sheet_path = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+
+        # (column, type, text) of each cell in the first row
+        cells = []
+        with archive.open(sheet_path) as source:
+            for _, element in ElementTree.iterparse(source):
+                if element.tag == SHEET_NS + 'c':
+                    reference = element.get('r')
+                    column = column_index_from_string(coordinate_from_string(reference)[0]) if reference else len(cells) + 1
+                    if element.get('t') == 'inlineStr':
+                        text = ''.join(t.text or '' for t in element.iter(SHEET_NS + 't'))
+                    else:
+                        value = element.find(SHEET_NS + 'v')
+                        text = value.text if value is not None else None
+                    cells.append((column, element.get('t'), text))
+                elif element.tag == SHEET_NS + 'row':
+                    if element.get('r') not in (None, '1'):
+                        cells = []
+                    break
+
+        # Resolve shared strings, reading the table no further than needed
+        shared = [int(text) for _, kind, text in cells if kind == 's' and text is not None]
+        strings = []
+        if shared:
+            with archive.open('xl/sharedStrings.xml') as source:
+                for _, element in ElementTree.iterparse(source):
+                    if element.tag == SHEET_NS + 'si':
+                        strings.append(''.join(t.text or '' for t in element.iter(SHEET_NS + 't')))
+                        element.clear()
+                        if len(strings) > max(shared):
+                            break
+
+    headers = [None] * max([column for column, _, _ in cells], default=0)
+    for column, kind, text in cells:
+        headers[column - 1] = strings[int(text)] if kind == 's' and text is not None else text
+    return headers
+
+
+# Whether a header row has to be rewritten to match the desired layout
+def headers_need_migration(headers):
+    """Return True for legacy 'Initial Remarks' headers or headers out of the desired order"""
+    headers = [h for h in headers if h]
+    if 'Initial Remarks' in headers:
+        return True
+    # Record fields missing from the header row are added on load, not by a rewrite
+    present = headers + [h for h in RECORD_FIELDS if h not in headers]
+    return order_headers(headers) != present
+
+
+# Map each header of the candidate sheet to its column number
+def header_columns(sheet, rows):
+    """Return {header: column}, appending any desired fields missing from the sheet"""
+    columns = {}
+    for col_num, cell in enumerate(sheet[1], 1):
+        if cell.value:
+            header = 'Initial Screening' if cell.value == 'Initial Remarks' else cell.value
+            columns.setdefault(header, col_num)
+
+    missing = [h for h in DESIRED_FIELDS if h not in columns]
+    next_col = sheet.max_column + 1
+    for header in missing:
+        sheet.cell(row=1, column=next_col).value = header
+        columns[header] = next_col
+        next_col += 1
+    # Keep cached rows in the same shape as a fresh load
+    if missing:
+        for i, row in enumerate(rows):
+            rows[i] = {**{h: '' for h in missing}, **row}
+    return columns
+
+
+# Write the given fields of one record into a sheet row
+def write_row_cells(sheet, row_num, columns, row_data, fields):
+    """Write the cells and return the values as they were stored"""
+    written = {}
+    for header in fields:
+        if header == 'Initial Remarks':
+            header = 'Initial Screening'
+        if header not in columns or header in RECORD_FIELDS:
+            continue
+        value = excel_value(row_data, header)
+        cell = sheet.cell(row=row_num, column=columns[header])
+        if not isinstance(cell, MergedCell):
+            cell.value = value
+        written[header] = value
+    return written
+
+
+# The (mtime, size) of the workbook as recorded after its last save
+def saved_stat(state):
+    return tuple(state['saved']) if state['saved'] else None
+
+
+# Write the record ID and version cells of a sheet row
+def write_record_fields(sheet, row_num, columns, record_id, version):
+    sheet.cell(row=row_num, column=columns[ID_FIELD]).value = record_id
+    sheet.cell(row=row_num, column=columns[VERSION_FIELD]).value = version
+
+
+class ExcelCandidateStorage:
+    """Candidate storage backed directly by the Excel workbook.
+
+    The workbook opened by load() is kept so row-level writes can patch it
+    without parsing the file again. Every write saves the workbook.
+
+    Record IDs and versions live in the _id and _version columns. Rows
+    without a valid ID (new sheets, rows added by hand in Excel, copies of
+    another row) are numbered when the workbook is loaded.
+
+    With write_behind, a write patches the open workbook and is appended to
+    an fsync'd journal next to the file (<path>.journal) instead of saving.
+    A background thread saves the workbook every save_interval seconds
+    while writes are pending, coalescing them, and then clears the journal.
+    load() replays whatever the journal still holds, so a crash loses no
+    acknowledged write. Replaying is idempotent: entries carry the resulting
+    IDs, values and versions rather than instructions to bump them.
+
+    Several processes (WSGI workers) may share one workbook. Loads, writes
+    and saves hold an inter-process lock (<path>.lock), and every write
+    bumps a version kept in <path>.state together with the stat of the last
+    save. signature() includes that version, so each worker notices the
+    others' writes and reloads (saved workbook + journal) before its next
+    read or write. Only a worker whose copy is current saves the workbook.
+    """
+
+    name = 'excel'
+
+    def __init__(self, path, sheet_name, create_file, write_behind=False, save_interval=SAVE_INTERVAL):
+        self.path = path
+        self.sheet_name = sheet_name
+        self.create_file = create_file
+        self._workbook = None
+        self._next_id = 1
+        self._lock = InterProcessLock(path + '.lock')
+        self.state = SharedState(path + '.state', {'version': 0, 'saved': None})
+        self.journal = Journal(path + '.journal') if write_behind else None
+        self.saver = BackgroundSaver(self.flush, save_interval) if write_behind else None
+        self._version = None
+        self._pending = 0
+        self.saves = 0
+        self.replayed = 0
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def write_lock(self):
+        """Return the inter-process lock that serializes writes to the workbook"""
+        return self._lock
+
+    def signature(self):
+        """Return (shared write version, file state), or None if the workbook is missing.
+
+        The file state is 'saved' while the file is as the last save by any
+        process left it, and its (mtime, size) once someone has changed it
+        by hand, so both writes through the app and edits in Excel are seen.
+        """
+        stat = self._stat()
+        state = self.state.read()
+        if stat != saved_stat(state):
+            # Either the file was edited by hand or a save is just finishing
+            with self._lock:
+                stat = self._stat()
+                state = self.state.read()
+        if stat is None:
+            return None
+        return (state['version'], 'saved' if stat == saved_stat(state) else stat)
+
+    def read_headers(self):
+        """Return the header row without loading the sheet, or None if the workbook is missing"""
+        if not os.path.exists(self.path):
+            return None
+        return read_header_row(self.path, self.sheet_name)
+
+    def needs_header_migration(self):
+        """Return whether the header row is out of order or still has legacy names"""
+        headers = self.read_headers()
+        return headers is not None and headers_need_migration(headers)
+
+    # Read every candidate row straight from the Excel file
+    def load(self, build=None):
+        """Return the records; build, if given, turns each one into the row that is returned"""
+        with self._lock:
+            data = self._load()
+        if build is None:
+            return data
+        # Numbering and journal replay need the plain records, so they are converted last
+        data.reverse()
+        rows = []
+        while data:
+            rows.append(build(data.pop()))
+        return rows
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            self.create_file()
+        state = self.state.read()
+        edited = self._stat() != saved_stat(state)
+
+        with stage('load'):
+            wb = openpyxl.load_workbook(self.path)
+        sheet = wb[self.sheet_name]
+
+        # Get headers from the first row
+        headers = [cell.value for cell in sheet[1] if cell is not None]
+
+        # Get data from the remaining rows
+        data = []
+        with stage('parse'):
+            for row in sheet.iter_rows(min_row=2, values_only=True):
+                row_data = {}
+                for i, value in enumerate(row):
+                    header = headers[i]
+                    # Migrate old "Initial Remarks" to "Initial Screening"
+                    if header == 'Initial Remarks':
+                        header = 'Initial Screening'
+                    row_data[header] = cell_text(value)
+                data.append(row_data)
+
+        self._workbook = wb
+        self._version = state['version']
+        changed = self._number_records(sheet, data)
+        replayed = self._replay(data) if self.journal is not None else 0
+        if changed:
+            self._save_now()
+            self._publish(wrote=True, saved=True)
+        elif edited:
+            # New file or edited by hand: adopt it and have the other processes reload it too
+            self._publish(wrote=True, saved=True)
+        if replayed and not changed:
+            self._pending = replayed
+            self.saver.start()
+        return data
+    # Give every loaded row a unique record ID and a version
+    def _number_records(self, sheet, data):
+        """Return whether the workbook changed and has to be saved"""
+        columns = {}
+        for col_num, cell in enumerate(sheet[1], 1):
+            if cell.value in RECORD_FIELDS:
+                columns.setdefault(cell.value, col_num)
+        changed = False
+        for header in RECORD_FIELDS:
+            if header not in columns:
+                columns[header] = sheet.max_column + 1
+                sheet.cell(row=1, column=columns[header]).value = header
+                changed = True
+
+        stored_ids = [record_number(row_data.get(ID_FIELD)) for row_data in data]
+        properties = self._workbook.custom_doc_props
+        stored_next = properties[NEXT_ID_PROPERTY].value if NEXT_ID_PROPERTY in properties.names else 1
+        ids, self._next_id = assign_ids(stored_ids, stored_next)
+
+        numbered = 0
+        for row_num, (row_data, record_id, stored_id) in enumerate(zip(data, ids, stored_ids), 2):
+            version = record_number(row_data.get(VERSION_FIELD))
+            if record_id != stored_id or version is None:
+                numbered += record_id != stored_id
+                version = version or 1
+                write_record_fields(sheet, row_num, columns, record_id, version)
+                changed = True
+            row_data[ID_FIELD] = record_id
+            row_data[VERSION_FIELD] = version
+
+        if numbered:
+            print(f"Assigned record IDs to {numbered} candidates in {self.path}")
+        if changed or stored_next != self._next_id:
+            self._store_next_id()
+            return True
+        return False
+
+    # Apply the journal entries the saved workbook does not hold yet
+    def _replay(self, data):
+        """Return the number of entries replayed"""
+        entries = self.journal.entries()
+        if not entries:
+            return 0
+        sheet = self._workbook[self.sheet_name]
+        columns = header_columns(sheet, data)
+        for entry in entries:
+            positions = {row_data[ID_FIELD]: index for index, row_data in enumerate(data)}
+            if entry['op'] == 'update':
+                for record in entry['records']:
+                    index = positions.get(record[ID_FIELD])
+                    if index is None:
+                        continue
+                    written = write_row_cells(sheet, index + 2, columns, record['changes'], record['changes'].keys())
+                    write_record_fields(sheet, index + 2, columns, record[ID_FIELD], record[VERSION_FIELD])
+                    data[index] = {**data[index], **written, VERSION_FIELD: record[VERSION_FIELD]}
+            elif entry['op'] == 'append':
+                for record in entry['records']:
+                    if record[ID_FIELD] in positions:
+                        continue
+                    row_num = len(data) + 2
+                    written = write_row_cells(sheet, row_num, columns, record, columns.keys())
+                    write_record_fields(sheet, row_num, columns, record[ID_FIELD], record[VERSION_FIELD])
+                    data.append({**written, ID_FIELD: record[ID_FIELD], VERSION_FIELD: record[VERSION_FIELD]})
+                    positions[record[ID_FIELD]] = len(data) - 1
+                    self._next_id = max(self._next_id, record[ID_FIELD] + 1)
+            elif entry['op'] == 'delete':
+                index = positions.get(entry[ID_FIELD])
+                if index is not None:
+                    sheet.delete_rows(index + 2)
+                    data.pop(index)
+        self._store_next_id()
+        self.replayed += len(entries)
+        print(f"Replayed {len(entries)} journaled writes into {self.path}")
+        return len(entries)
+
+    # Hold the write lock while the open workbook is changed
+    @contextmanager
+    def _changing(self):
+        """Yield the candidate sheet; if the write fails, drop the half-changed workbook.
+
+        A write that was not journaled or saved must never reach data.xlsx
+        with a later save, so the workbook is forgotten and the next load
+        reads the file and replays the journal again.
+        """
+        with self._lock:
+            try:
+                yield self._workbook[self.sheet_name]
+            except Exception:
+                self._workbook = None
+                raise
+
+    # Persist a write: save now, or journal it and leave the save to the background thread
+    def _commit(self, entry):
+        if self.journal is None:
+            self._save_now()
+            self._publish(wrote=True, saved=True)
+            return
+        with stage('journal'):
+            self.journal.append(entry)
+        self._pending += 1
+        self._publish(wrote=True, saved=False)
+        self.saver.start()
+
+    # Save the workbook and forget the journal entries it now holds
+    def _save_now(self):
+        with stage('save'):
+            if self.journal is None:
+                self._workbook.save(self.path)
+            else:
+                save_atomically(self._workbook, self.path)
+                self.journal.clear()
+                self._pending = 0
+        self.saves += 1
+
+    # Tell the other processes that the data changed and/or what the saved file looks like
+    def _publish(self, wrote, saved):
+        values = {}
+        if wrote:
+            values['version'] = self.state.read()['version'] + 1
+        if saved:
+            values['saved'] = self._stat()
+        self._version = self.state.update(**values)['version']
+
+    def flush(self):
+        """Save the workbook if journaled writes are pending"""
+        if not self._pending:
+            return
+        with self._lock:
+            # Without a workbook (dropped by a failed write) the pending writes
+            # stay in the journal and are replayed by the next load
+            if not self._pending or self._workbook is None:
+                return
+            if self.state.read()['version'] != self._version:
+                # Another process has written since; it replayed these writes
+                # from the journal before doing so and saves them with its own
+                self._pending = 0
+                return
+            self._save_now()
+            self._publish(wrote=False, saved=True)
+
+    def close(self):
+        """Stop the background saver and save what is pending"""
+        if self.saver is not None:
+            self.saver.stop()
+            self.flush()
+
+    def persistence_stats(self):
+        """Return write-behind and locking counters"""
+        with self._lock:
+            return {
+                'write_behind': self.journal is not None,
+                'version': self._version,
+                'pending_writes': self._pending,
+                'saves': self.saves,
+                'replayed_writes': self.replayed,
+                'lock': self._lock.stats()
+            }
+
+    def _store_next_id(self):
+        properties = self._workbook.custom_doc_props
+        if NEXT_ID_PROPERTY in properties.names:
+            properties[NEXT_ID_PROPERTY].value = self._next_id
+        else:
+            properties.append(IntProperty(name=NEXT_ID_PROPERTY, value=self._next_id))
+
+    def update_row(self, rows, index, changes):
+        """Write only the changed cells of the record at index and save"""
+        return self.update_rows(rows, [(index, changes)])[0]
+
+    def update_rows(self, rows, updates):
+        """Write the changed cells of several records, bump their versions and save once"""
+        with self._changing() as sheet:
+            columns = header_columns(sheet, rows)
+            records = []
+            journaled = []
+            for index, changes in updates:
+                written = write_row_cells(sheet, index + 2, columns, changes, changes.keys())
+                version = rows[index][VERSION_FIELD] + 1
+                write_record_fields(sheet, index + 2, columns, rows[index][ID_FIELD], version)
+                rows[index] = {**rows[index], **written, VERSION_FIELD: version}
+                records.append(rows[index])
+                journaled.append({ID_FIELD: rows[index][ID_FIELD], VERSION_FIELD: version, 'changes': written})
+            self._commit({'op': 'update', 'records': journaled})
+            return records
+
+    def append_row(self, rows, row_data):
+        """Write one new row after the last record and save"""
+        return self.append_rows(rows, [row_data])[0]
+
+    def append_rows(self, rows, data):
+        """Write new rows after the last record and save once"""
+        with self._changing() as sheet:
+            columns = header_columns(sheet, rows)
+            records = []
+            for row_num, row_data in enumerate(data, len(rows) + 2):
+                record = write_row_cells(sheet, row_num, columns, row_data, columns.keys())
+                record[ID_FIELD] = self._next_id
+                record[VERSION_FIELD] = 1
+                write_record_fields(sheet, row_num, columns, self._next_id, 1)
+                self._next_id += 1
+                records.append(record)
+            self._store_next_id()
+            self._commit({'op': 'append', 'records': records})
+            rows.extend(records)
+            return records
+
+    def delete_row(self, rows, index):
+        """Delete the sheet row of the record at index and save"""
+        with self._changing() as sheet:
+            sheet.delete_rows(index + 2)
+            self._commit({'op': 'delete', ID_FIELD: rows[index][ID_FIELD]})
+            return rows.pop(index)
+
+    def replace_all(self, rows, data):
+        """Rewrite the whole sheet with the given records in the desired header order.
+
+        Always saved right away: the rewritten sheet supersedes the journal.
+        """
+        with self._changing():
+            self._replace_all(rows, data)
+
+    def _replace_all(self, rows, data):
+        sheet = self._workbook[self.sheet_name]
+
+        # Get current headers, renaming the legacy 'Initial Remarks' column
+        headers = []
+        for cell in sheet[1]:
+            header = 'Initial Screening' if cell is not None and cell.value == 'Initial Remarks' else cell.value
+            if header and header not in headers:
+                headers.append(header)
+        ordered_headers = order_headers(headers)
+
+        # Rewrite headers in desired order
+        for col_num, header in enumerate(ordered_headers, 1):
+            cell = sheet.cell(row=1, column=col_num)
+            if cell is not None and not isinstance(cell, MergedCell):
+                cell.value = header
+
+        # Clear existing data (except headers) in a single shift
+        if sheet.max_row > 1:
+            sheet.delete_rows(2, sheet.max_row - 1)
+        # Drop header cells left over from merged duplicate columns
+        if sheet.max_column > len(ordered_headers):
+            sheet.delete_cols(len(ordered_headers) + 1, sheet.max_column - len(ordered_headers))
+
+        # Keep the IDs of the given records, numbering any that lack one
+        ids, self._next_id = assign_ids([record_number(row_data.get(ID_FIELD)) for row_data in data], self._next_id)
+
+        # Add updated data, keeping the normalized rows for the cache
+        saved_rows = []
+        for row_num, (row_data, record_id) in enumerate(zip(data, ids), 2):
+            version = record_number(row_data.get(VERSION_FIELD)) or 1
+            saved_row = {}
+            for col_num, header in enumerate(ordered_headers, 1):
+                if header == ID_FIELD:
+                    value = record_id
+                elif header == VERSION_FIELD:
+                    value = version
+                else:
+                    value = excel_value(row_data, header)
+                saved_row[header] = value
+                cell = sheet.cell(row=row_num, column=col_num)
+                if cell is not None and not isinstance(cell, MergedCell):
+                    cell.value = value
+            saved_rows.append(saved_row)
+
+        # Save the workbook
+        self._store_next_id()
+        self._save_now()
+        self._publish(wrote=True, saved=True)
+        rows[:] = saved_rows
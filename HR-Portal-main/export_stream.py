@@ -0,0 +1,117 @@
+import csv
+import io
+import queue
+import threading
+
+import openpyxl
+
+# Rows written between two yielded CSV chunks
+CSV_CHUNK_ROWS = 500
+
+# Bytes collected before an XLSX chunk is yielded
+XLSX_CHUNK_BYTES = 64 * 1024
+
+# XLSX chunks buffered between the builder thread and the response
+XLSX_QUEUE_CHUNKS = 16
+
+
+# Stream rows as CSV, one chunk per CSV_CHUNK_ROWS rows
+def csv_chunks(rows, headers):
+    """Yield UTF-8 encoded CSV chunks (with a BOM so Excel detects the encoding)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(headers)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([row.get(header, '') for header in headers])
+        if count % CSV_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class ExportCancelled(Exception):
+    """Raised in the builder thread when the client went away"""
+
+
+class _ChunkPipe(io.RawIOBase):
+    """Unseekable file object that hands written bytes to a bounded queue"""
+
+    def __init__(self):
+        self.chunks = queue.Queue(maxsize=XLSX_QUEUE_CHUNKS)
+        self.cancelled = threading.Event()
+        self._pending = bytearray()
+
+    def writable(self):
+        return True
+
+    def _put(self, item):
+        # Block while the client is slow, but give up once it has gone away
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise ExportCancelled()
+
+    def write(self, data):
+        if self.cancelled.is_set():
+            # The archive may still try to write its end record; drop it
+            return len(data)
+        self._pending.extend(data)
+        if len(self._pending) >= XLSX_CHUNK_BYTES:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+        return len(data)
+
+    def finish(self, error=None):
+        if self._pending:
+            self._put(bytes(self._pending))
+            self._pending.clear()
+        self._put(error)
+
+
+# Stream rows as an XLSX workbook built in write-only mode
+def xlsx_chunks(rows, headers, sheet_name):
+    """Yield the bytes of the workbook while a builder thread is still writing it.
+
+    The write-only workbook keeps only the current row in memory, and the
+    zip archive is streamed through a bounded queue, so neither the
+    workbook nor the finished file is ever held in memory as a whole.
+    """
+    pipe = _ChunkPipe()
+
+    def build():
+        try:
+            wb = openpyxl.Workbook(write_only=True)
+            sheet = wb.create_sheet(sheet_name)
+            sheet.append(headers)
+            for row in rows:
+                if pipe.cancelled.is_set():
+                    return
+                sheet.append([row.get(header, '') for header in headers])
+            wb.save(pipe)
+            pipe.finish()
+        except ExportCancelled:
+            pass
+        except Exception as e:
+            print(f"Error building XLSX export: {e}")
+            try:
+                pipe.finish(e)
+            except ExportCancelled:
+                pass
+
+    builder = threading.Thread(target=build, name='xlsx-export', daemon=True)
+    builder.start()
+    try:
+        while True:
+            chunk = pipe.chunks.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        pipe.cancelled.set()
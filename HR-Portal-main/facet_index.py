@@ -0,0 +1,122 @@
+from collections import defaultdict
+import threading
+
+from candidate_query import FILTER_COLUMNS, matches_filters
+from excel_storage import ID_FIELD
+
+# Columns whose distinct values and counts /api/facets reports
+FACET_COLUMNS = [
+    'Interested Position',
+    'Application Status',
+    'Interview Status',
+    'Current Location',
+    'Location Preference',
+    'Total Years of Experience',
+    'Notice Period'
+]
+
+# Every column the index has to cover: the facets and the table filters
+INDEXED_COLUMNS = list(dict.fromkeys(FACET_COLUMNS + list(FILTER_COLUMNS.values())))
+
+
+# Value of a column as the index keys it (unstripped, so filters see what they would on the record)
+def facet_value(record, column):
+    return str(record.get(column) or '')
+
+
+class FacetIndex:
+    """Per-column value index: column -> value -> IDs of the records holding it.
+
+    Registered as a CandidateStore listener, so it is built once per load
+    and patched for every written record. A table filter is resolved by
+    testing it against each distinct value of its column (not each record)
+    and taking the union of the matching ID sets. Counts for one facet are
+    taken under every filter except the one on that facet's own column, so
+    the dropdown still shows what else could be picked.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {column: defaultdict(set) for column in INDEXED_COLUMNS}
+        self.record_ids = set()
+
+    def _add(self, record):
+        record_id = record[ID_FIELD]
+        self.record_ids.add(record_id)
+        for column, index in self.values.items():
+            index[facet_value(record, column)].add(record_id)
+
+    def _remove(self, record):
+        record_id = record[ID_FIELD]
+        self.record_ids.discard(record_id)
+        for column, index in self.values.items():
+            value = facet_value(record, column)
+            ids = index.get(value)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del index[value]
+
+    def reset(self, rows):
+        with self._lock:
+            self.values = {column: defaultdict(set) for column in INDEXED_COLUMNS}
+            self.record_ids = set()
+            for record in rows:
+                self._add(record)
+
+    def apply(self, old, new):
+        with self._lock:
+            if old is not None:
+                self._remove(old)
+            if new is not None:
+                self._add(new)
+
+    def _filter_ids(self, param, value):
+        """Return the IDs of the records passing one table filter"""
+        column = FILTER_COLUMNS[param]
+        matched = set()
+        for candidate, ids in self.values[column].items():
+            if matches_filters({column: candidate}, {param: value}):
+                matched |= ids
+        return matched
+
+    def facets(self, filters):
+        """Return ({column: [{value, count}]}, records matching every filter).
+
+        Values are ordered by count, then alphabetically; values no record
+        under the other filters holds are left out.
+        """
+        with self._lock:
+            matched = {param: self._filter_ids(param, value) for param, value in filters.items()}
+
+            # IDs passing every filter but the one on the given column (None: no filter applies)
+            def allowed(skip_column):
+                result = None
+                for param, ids in matched.items():
+                    if FILTER_COLUMNS[param] == skip_column:
+                        continue
+                    result = ids if result is None else result & ids
+                return result
+
+            facets = {}
+            for column in FACET_COLUMNS:
+                ids_allowed = allowed(column)
+                counts = []
+                for value, ids in self.values[column].items():
+                    count = len(ids) if ids_allowed is None else len(ids & ids_allowed)
+                    if count:
+                        counts.append({'value': value, 'count': count})
+                counts.sort(key=lambda item: (-item['count'], item['value'].lower()))
+                facets[column] = counts
+
+            total_ids = allowed(None)
+            total = len(self.record_ids) if total_ids is None else len(total_ids)
+            return facets, total
+
+    def stats(self):
+        """Return the number of distinct values per column"""
+        with self._lock:
+            return {
+                'records': len(self.record_ids),
+                'values': {column: len(index) for column, index in self.values.items()}
+            }
@@ -0,0 +1,144 @@
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import openpyxl
+from openpyxl.packaging.custom import IntProperty
+
+from dropdown_options import DROPDOWN_OPTIONS
+from excel_storage import CANDIDATE_HEADERS, RECORD_FIELDS, NEXT_ID_PROPERTY
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Akash', 'Ananya', 'Arjun', 'Deepa', 'Divya', 'Farhan', 'Gaurav', 'Isha',
+    'Karan', 'Kavya', 'Meera', 'Nikhil', 'Neha', 'Pooja', 'Priya', 'Rahul', 'Riya', 'Rohan',
+    'Sanjay', 'Shreya', 'Sneha', 'Suresh', 'Tanvi', 'Varun', 'Vikram', 'Zoya'
+]
+LAST_NAMES = [
+    'Agarwal', 'Bose', 'Chopra', 'Das', 'Gupta', 'Iyer', 'Jain', 'Kapoor', 'Khan', 'Kumar',
+    'Menon', 'Mehta', 'Nair', 'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma'
+]
+ORGANIZATIONS = [
+    'Tech Solutions Inc.', 'Data Insights Ltd.', 'Creative Designs', 'CloudNine Systems',
+    'Infinite Loop Labs', 'BlueOrbit Software', 'Quantum Analytics', 'NextGen Retail Tech'
+]
+CERTIFICATIONS = [
+    '', '', 'AWS Certified Developer', 'Google Data Analytics', 'Azure Fundamentals',
+    'Certified Kubernetes Administrator', 'PMP', 'ISTQB Foundation'
+]
+REFERRED_BY = ['Employee Referral', 'Job Portal', 'Campus Recruitment', 'LinkedIn', 'Consultant']
+COMMENTS = [
+    '', 'Good communication skills', 'Strong analytical skills', 'Creative portfolio',
+    'Needs relocation support', 'Looking for remote role', 'Prefers product companies'
+]
+REMARKS = [
+    'Candidate performed well.', 'Strong fundamentals, average problem solving.',
+    'Good culture fit.', 'Needs improvement in system design.', 'Clear communicator.'
+]
+
+# Relative frequency of each interview stage (in dropdown order): most candidates drop out early
+STAGE_WEIGHTS = [30, 18, 14, 10, 8, 6, 5, 3, 2, 1.5, 1, 1, 1.5]
+
+# Relative frequency of each application status (in dropdown order)
+STATUS_WEIGHTS = [25, 12, 10, 3, 4, 3, 4, 5, 30, 4]
+
+# Interview stages after which each stage-specific remark is filled in
+REMARK_STAGES = {
+    'Initial Screening': 'Profile Screening Comp',
+    'Round 1 Remarks': 'Tech Inter Comp',
+    'Round 2 Remarks': 'Code Inter Comp'
+}
+
+
+# Build one plausible candidate from the dropdown values
+def generate_candidate(rng, index, now, days):
+    """Return the candidate as {header: string value}, like a row loaded from the sheet"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    experience = rng.choice(DROPDOWN_OPTIONS['Total Years of Experience'])
+    years = int(experience.split('-')[0])
+    current_ctc = int(rng.gauss(400000 + years * 250000, 80000)) // 1000 * 1000
+    notice_period = rng.choice(DROPDOWN_OPTIONS['Notice Period'])
+    offers = 'Yes' if rng.random() < 0.2 else 'No'
+    stage_options = DROPDOWN_OPTIONS['Interview Status']
+    stage = rng.choices(stage_options, STAGE_WEIGHTS)[0]
+    status = rng.choices(DROPDOWN_OPTIONS['Application Status'], STATUS_WEIGHTS)[0]
+    location = rng.choice(DROPDOWN_OPTIONS['Current Location'])
+    applied = now - timedelta(days=rng.random() * days)
+
+    candidate = {
+        'Date': applied.strftime('%Y-%m-%d %H:%M:%S'),
+        'Name': f'{first} {last}',
+        'Email ID': f'{first.lower()}.{last.lower()}{index}@example.com',
+        'Contact Number': str(rng.randint(6000000000, 9999999999)),
+        'Interested Position': rng.choice(DROPDOWN_OPTIONS['Interested Position']),
+        'Current Role': rng.choice(DROPDOWN_OPTIONS['Current Role']),
+        'Current Organization': rng.choice(ORGANIZATIONS),
+        'Current Location': location,
+        'Current CTC per Annum': str(max(current_ctc, 200000)),
+        'Expected CTC per Annum': str(int(max(current_ctc, 200000) * rng.uniform(1.15, 1.6)) // 1000 * 1000),
+        'Total Years of Experience': experience,
+        'Notice Period': notice_period,
+        'Interview Status': stage,
+        'Application Status': status,
+        'Referred By': rng.choice(REFERRED_BY),
+        'Comments': rng.choice(COMMENTS),
+        'In Notice': 'Yes' if rng.random() < 0.3 else 'No',
+        'Immediate Joiner': 'Yes' if notice_period == 'Immediate' else 'No',
+        'Offers in Hand': offers,
+        'Offered CTC': str(int(current_ctc * rng.uniform(1.2, 1.5)) // 1000 * 1000) if offers == 'Yes' else '',
+        'Location Preference': location if rng.random() < 0.7 else rng.choice(DROPDOWN_OPTIONS['Location Preference']),
+        'Certifications': rng.choice(CERTIFICATIONS),
+        'Resume': f'https://example.com/resume/{first.lower()}{last.lower()}{index}',
+        'LinkedIn Profile': f'https://linkedin.com/in/{first.lower()}{last.lower()}{index}',
+        'Remarks': rng.choice(REMARKS) if rng.random() < 0.3 else '',
+        'Reject Mail Sent': 'Yes' if status == 'Rejected' and rng.random() < 0.8 else 'No',
+        'Final Remarks': rng.choice(REMARKS) if stage == 'All Completed' else ''
+    }
+    stage_number = stage_options.index(stage)
+    for header, after in REMARK_STAGES.items():
+        candidate[header] = rng.choice(REMARKS) if stage_number >= stage_options.index(after) else ''
+    return candidate
+
+
+# Generate a repeatable list of candidates applied for over the last days days
+def generate_candidates(count, seed=0, days=365, now=None):
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    candidates = [generate_candidate(rng, index, now, days) for index in range(count)]
+    # Oldest application first, as rows are appended to the sheet
+    candidates.sort(key=lambda candidate: candidate['Date'])
+    return candidates
+
+
+# Write candidates to a new workbook in the current sheet layout, numbered from 1
+def write_workbook(path, sheet_name, candidates):
+    wb = openpyxl.Workbook(write_only=True)
+    wb.custom_doc_props.append(IntProperty(name=NEXT_ID_PROPERTY, value=len(candidates) + 1))
+    sheet = wb.create_sheet(sheet_name)
+    sheet.append(CANDIDATE_HEADERS + RECORD_FIELDS)
+    for record_id, candidate in enumerate(candidates, 1):
+        sheet.append([candidate.get(header, '') for header in CANDIDATE_HEADERS] + [record_id, 1])
+    wb.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a workbook of synthetic candidates for load testing')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--output', default='data.xlsx')
+    parser.add_argument('--sheet', default='Candidates')
+    parser.add_argument('--seed', type=int, default=0, help='same seed, same candidates (dates relative to today)')
+    parser.add_argument('--days', type=int, default=365, help='spread application dates over this many days')
+    parser.add_argument('--force', action='store_true', help='overwrite an existing file')
+    args = parser.parse_args()
+
+    if os.path.exists(args.output) and not args.force:
+        print(f"{args.output} already exists; use --force to overwrite it")
+        return 1
+    write_workbook(args.output, args.sheet, generate_candidates(args.rows, args.seed, args.days))
+    print(f"Wrote {args.rows} synthetic candidates to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+from collections import Counter, OrderedDict, defaultdict
+import statistics
+import threading
+
+# Numeric columns summarized by /api/analysis/summary
+CTC_FIELDS = ['Current CTC per Annum', 'Expected CTC per Annum', 'Offered CTC']
+
+# Number of memoized results kept per dataset version
+MAX_CACHED_RESULTS = 256
+
+
+# Parse a numeric cell, returning None for blanks and text
+def parse_number(value):
+    try:
+        return float(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+# Descriptive statistics of the numeric values of one column
+def numeric_stats(rows, field):
+    """Return count, mean, std, min, median and max of the numeric values"""
+    values = [number for number in (parse_number(row.get(field)) for row in rows) if number is not None]
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': statistics.fmean(values),
+        'std': statistics.stdev(values) if len(values) > 1 else 0.0,
+        'min': min(values),
+        'median': statistics.median(values),
+        'max': max(values)
+    }
+
+
+# Record count and CTC averages for every distinct value of a column
+def group_counts(rows, column):
+    """Return [{column: value, 'count': n, 'ctc_mean': {...}}] ordered by count"""
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row.get(column) or ''].append(row)
+
+    result = []
+    for value, members in groups.items():
+        ctc_mean = {}
+        for field in CTC_FIELDS:
+            stats = numeric_stats(members, field)
+            if stats['count']:
+                ctc_mean[field] = stats['mean']
+        result.append({column: value, 'count': len(members), 'ctc_mean': ctc_mean})
+    result.sort(key=lambda entry: (-entry['count'], entry[column]))
+    return result
+
+
+# Cross-tabulate one column against one or more others
+def crosstab(rows, column, by_columns):
+    """Return [{column: value, 'count': n, 'by': {'A | B': n}}] ordered by count"""
+    totals = Counter()
+    cells = defaultdict(Counter)
+    for row in rows:
+        value = row.get(column) or ''
+        key = ' | '.join(row.get(by) or '' for by in by_columns)
+        totals[value] += 1
+        cells[value][key] += 1
+    return [
+        {column: value, 'count': count, 'by': dict(cells[value].most_common())}
+        for value, count in sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+class GroupByEngine:
+    """Group-by and aggregation results memoized per dataset version.
+
+    Results are computed from the CandidateStore rows on first request and
+    served from memory until the store's version changes, so repeated
+    dashboard loads cost nothing until the data does.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._version = None
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key, compute):
+        rows, version = self.store.snapshot()
+        with self._lock:
+            if version != self._version:
+                self._results.clear()
+                self._version = version
+            if key in self._results:
+                self.hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            self.misses += 1
+
+        result = compute(rows)
+        with self._lock:
+            if version == self._version:
+                self._results[key] = result
+                if len(self._results) > MAX_CACHED_RESULTS:
+                    self._results.popitem(last=False)
+        return result
+
+    def columns(self):
+        """Return the columns present in the data, without the record bookkeeping fields"""
+        return self._cached(('columns',), lambda rows: [key for key in rows[0] if not key.startswith('_')] if rows else [])
+
+    def summary(self):
+        """Return {field: numeric stats} for the CTC columns"""
+        return self._cached(('summary',), lambda rows: {field: numeric_stats(rows, field) for field in CTC_FIELDS})
+
+    def group(self, column, by_columns=None):
+        """Return counts per value of column, cross-tabulated by by_columns if given"""
+        by_columns = tuple(by_columns or ())
+        if by_columns:
+            return self._cached(('crosstab', column, by_columns), lambda rows: crosstab(rows, column, by_columns))
+        return self._cached(('group', column), lambda rows: group_counts(rows, column))
+
+    def stats(self):
+        """Return memoization counters"""
+        with self._lock:
+            return {'version': self._version, 'cached_results': len(self._results), 'hits': self.hits, 'misses': self.misses}
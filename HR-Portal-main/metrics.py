@@ -0,0 +1,140 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = 'hr_portal'
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+
+    def lines(self, name, labels):
+        """Return the exposition lines of the _bucket, _sum and _count series"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{format_labels({**labels, "le": repr(bound)})} {cumulative}')
+        lines.append(f'{name}_bucket{format_labels({**labels, "le": "+Inf"})} {self.count}')
+        lines.append(f'{name}_sum{format_labels(labels)} {self.sum:.6f}')
+        lines.append(f'{name}_count{format_labels(labels)} {self.count}')
+        return lines
+
+
+# Render a label set as {name="value",...}
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+class Metrics:
+    """Request and stage timings of this process, exported in Prometheus text format.
+
+    Requests are counted per method, route template and status, and timed
+    per method and route. Stages (workbook load, row parsing, mutation,
+    save, JSON serialization, ...) are timed wherever they run, including
+    the background saver. While a request is being handled, the stages it
+    runs are also totalled for that request, so the response can carry a
+    Server-Timing header. Stages can nest: 'mutate' includes the 'save' or
+    'journal' of the write it makes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started = time.time()
+        self.requests = {}
+        self.request_latency = {}
+        self.stage_latency = {}
+
+    def begin_request(self):
+        self._local.stages = {}
+
+    def end_request(self, method, route, status, seconds):
+        """Record a finished request and return {stage: seconds} of the stages it ran"""
+        stages = getattr(self._local, 'stages', None) or {}
+        self._local.stages = None
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.request_latency.setdefault((method, route), Histogram()).observe(seconds)
+        return stages
+
+    def observe_stage(self, name, seconds):
+        with self._lock:
+            self.stage_latency.setdefault(name, Histogram()).observe(seconds)
+        stages = getattr(self._local, 'stages', None)
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        """Time the body of a with block as one run of the named stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - started)
+
+    def render(self, gauges=None):
+        """Return every metric in the Prometheus text exposition format.
+
+        gauges is an optional {name: (help, value)} of point-in-time values
+        added by the caller.
+        """
+        with self._lock:
+            requests = dict(self.requests)
+            request_lines = [line for (method, route), histogram in sorted(self.request_latency.items())
+                             for line in histogram.lines(f'{METRIC_PREFIX}_request_duration_seconds',
+                                                         {'method': method, 'route': route})]
+            stage_lines = [line for name, histogram in sorted(self.stage_latency.items())
+                           for line in histogram.lines(f'{METRIC_PREFIX}_stage_duration_seconds', {'stage': name})]
+
+        lines = [
+            f'# HELP {METRIC_PREFIX}_requests_total HTTP requests handled, by method, route and status',
+            f'# TYPE {METRIC_PREFIX}_requests_total counter'
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f'{METRIC_PREFIX}_requests_total'
+                         f'{format_labels({"method": method, "route": route, "status": status})} {count}')
+        lines += [
+            f'# HELP {METRIC_PREFIX}_request_duration_seconds Time to produce a response, by method and route',
+            f'# TYPE {METRIC_PREFIX}_request_duration_seconds histogram'
+        ] + request_lines
+        lines += [
+            f'# HELP {METRIC_PREFIX}_stage_duration_seconds Time spent in each stage of loading, writing and serializing data',
+            f'# TYPE {METRIC_PREFIX}_stage_duration_seconds histogram'
+        ] + stage_lines
+        gauges = {'process_start_time_seconds': ('Unix time the process started', self.started), **(gauges or {})}
+        for name, (help_text, value) in gauges.items():
+            lines += [
+                f'# HELP {METRIC_PREFIX}_{name} {help_text}',
+                f'# TYPE {METRIC_PREFIX}_{name} gauge',
+                f'{METRIC_PREFIX}_{name} {value}'
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+# Timings of this process, shared by the app and the storage backends
+metrics = Metrics()
+stage = metrics.stage
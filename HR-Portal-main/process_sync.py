@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class InterProcessLock:
+    """Exclusive lock shared by every process that opens the same lock file.
+
+    Re-entrant within a thread and exclusive between the threads of one
+    process, so one instance can guard both the request threads and the
+    background saver. The lock file is (re)opened in each process, so
+    workers forked from a parent that already used it still exclude each
+    other.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+        self._pid = None
+        self.acquired = 0
+        self.wait_seconds = 0.0
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_file()
+        self._thread_lock.release()
+
+    def _lock_file(self):
+        if self._file is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a+b')
+            self._pid = os.getpid()
+        started = time.perf_counter()
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ten seconds; keep waiting
+                    continue
+        self.wait_seconds += time.perf_counter() - started
+        self.acquired += 1
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def stats(self):
+        """Return how often the lock was taken and how long that waited"""
+        return {'acquired': self.acquired, 'wait_seconds': round(self.wait_seconds, 4)}
+
+
+class SharedState:
+    """Small JSON file of values every process reads (the write version and the
+    stat of the last save). Replaced atomically, so readers need no lock;
+    update() must be called while holding the matching InterProcessLock."""
+
+    def __init__(self, path, defaults):
+        self.path = path
+        self.defaults = defaults
+
+    def read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return {**self.defaults, **json.load(f)}
+        except (FileNotFoundError, ValueError):
+            return dict(self.defaults)
+
+    def update(self, **values):
+        state = {**self.read(), **values}
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+        return state
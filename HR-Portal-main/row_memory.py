@@ -0,0 +1,75 @@
+import argparse
+import gc
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+from candidate_store import CandidateStore
+from generate_dataset import generate_candidates
+from sqlite_storage import SQLiteCandidateStorage
+
+# How each representation holds the loaded candidates
+REPRESENTATIONS = ('dicts', 'compact')
+
+
+# Resident memory of this process right now, in MB (Linux), or None where it cannot be read
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Load the candidates one way in a fresh process and report the memory they take
+def measure(db_path, representation, results):
+    storage = SQLiteCandidateStorage(db_path)
+    storage.signature()  # Opens the database and creates the schema
+    gc.collect()
+    before = current_rss_mb()
+    if representation == 'dicts':
+        rows = storage.load()
+    else:
+        rows = CandidateStore(storage).get_rows()
+    gc.collect()
+    after = current_rss_mb()
+    results.put((representation, len(rows), before, after))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the resident memory of the candidate rows held as dicts and as compact rows')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if current_rss_mb() is None:
+        print("Resident memory can only be read on Linux (/proc/self/statm)")
+        return 1
+
+    work_dir = tempfile.mkdtemp(prefix='hr-memory-')
+    try:
+        db_path = os.path.join(work_dir, 'candidates.db')
+        SQLiteCandidateStorage(db_path).append_rows([], generate_candidates(args.rows, args.seed))
+
+        context = multiprocessing.get_context('spawn')
+        measured = {}
+        for representation in REPRESENTATIONS:
+            results = context.Queue()
+            process = context.Process(target=measure, args=(db_path, representation, results))
+            process.start()
+            name, count, before, after = results.get()
+            process.join()
+            measured[name] = after - before
+            print(f"{name:<8} {count} rows: {after - before:7.1f} MB resident ({(after - before) * 1024 * 1024 / count:,.0f} bytes per row)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    saved = measured['dicts'] - measured['compact']
+    print(f"Compact rows save {saved:.1f} MB ({saved / measured['dicts'] * 100:.0f}%)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+from collections.abc import Mapping
+import operator
+
+# Distinct values pooled per field; a field with more (names, emails, links) is left alone
+MAX_POOLED_VALUES = 1000
+
+# Marks a field the schema knows but a row does not have
+MISSING = object()
+
+
+class RowSchema:
+    """Field names shared by a set of compact rows, plus per-field value pools.
+
+    Every row built from the same load shares one schema, so a field name is
+    stored once rather than once per row, and a row only holds a tuple of
+    values in field order. String values of low-cardinality fields (statuses,
+    locations, Yes/No) are pooled, so every row that says 'Rejected' points
+    at the same string. Fields seen for the first time are appended; rows
+    built before that simply do not have them.
+    """
+
+    def __init__(self, fields=()):
+        self.fields = []
+        self.positions = {}
+        self.pools = []
+        # Whether any row lacks a field that was known when it was built
+        self.sparse = False
+        for field in fields:
+            self._add_field(field)
+
+    def _add_field(self, field):
+        self.positions[field] = len(self.fields)
+        self.fields.append(field)
+        self.pools.append({})
+        return self.positions[field]
+
+    def _pooled(self, position, value):
+        pool = self.pools[position]
+        if pool is None or type(value) is not str:
+            return value
+        pooled = pool.setdefault(value, value)
+        if pooled is value and len(pool) > MAX_POOLED_VALUES:
+            self.pools[position] = None
+        return pooled
+
+    def compact(self, record):
+        """Return record (any mapping) as a CompactRow of this schema"""
+        if type(record) is CompactRow and record._schema is self:
+            return record
+        if len(record) != len(self.fields) or not all(map(operator.eq, record, self.fields)):
+            return self._compact_fields(record)
+        # Same fields in schema order, as for every row of one load: pool inline
+        values = []
+        overflow = False
+        for pool, value in zip(self.pools, record.values()):
+            if pool is not None and type(value) is str:
+                pooled = pool.setdefault(value, value)
+                if pooled is value and len(pool) > MAX_POOLED_VALUES:
+                    overflow = True
+                value = pooled
+            values.append(value)
+        if overflow:
+            # Mostly unique values: pooling them would only cost memory
+            self.pools = [None if pool is None or len(pool) > MAX_POOLED_VALUES else pool for pool in self.pools]
+        return CompactRow(self, tuple(values))
+
+    def _compact_fields(self, record):
+        values = [MISSING] * len(self.fields)
+        for field, value in record.items():
+            position = self.positions.get(field)
+            if position is None:
+                position = self._add_field(field)
+                values.append(MISSING)
+            values[position] = self._pooled(position, value)
+        if not self.sparse and MISSING in values:
+            self.sparse = True
+        return CompactRow(self, tuple(values))
+
+
+class CompactRow(Mapping):
+    """Read-only record backed by a tuple of values and a shared RowSchema.
+
+    Behaves like the dict it was built from for reading (row[field],
+    row.get(field), iteration, ** unpacking, comparison); to_dict() returns
+    a plain dict, which is what is sent as JSON.
+    """
+
+    __slots__ = ('_schema', '_values')
+
+    def __init__(self, schema, values):
+        self._schema = schema
+        self._values = values
+
+    def __getitem__(self, field):
+        position = self._schema.positions.get(field)
+        if position is not None and position < len(self._values):
+            value = self._values[position]
+            if value is not MISSING:
+                return value
+        raise KeyError(field)
+
+    def get(self, field, default=None):
+        position = self._schema.positions.get(field)
+        if position is not None and position < len(self._values):
+            value = self._values[position]
+            if value is not MISSING:
+                return value
+        return default
+
+    def __contains__(self, field):
+        return self.get(field, MISSING) is not MISSING
+
+    def __iter__(self):
+        return (field for field, value in zip(self._schema.fields, self._values) if value is not MISSING)
+
+    def __len__(self):
+        if self._schema.sparse:
+            return sum(1 for value in self._values if value is not MISSING)
+        return len(self._values)
+
+    def items(self):
+        return self.to_dict().items()
+
+    def to_dict(self):
+        """Return the record as a new plain dict"""
+        schema = self._schema
+        if schema.sparse:
+            return {field: value for field, value in zip(schema.fields, self._values) if value is not MISSING}
+        return dict(zip(schema.fields, self._values))
+
+    def __repr__(self):
+        return f"CompactRow({self.to_dict()!r})"
+
+
+# Plain dict of a record, whichever representation it is held in
+def record_dict(row):
+    return row.to_dict() if type(row) is CompactRow else dict(row)
@@ -0,0 +1,120 @@
+import collections
+import itertools
+import os
+import sys
+import threading
+import time
+
+# Seconds between two stack samples of a profiled request
+SAMPLE_INTERVAL = 0.005
+
+# Finished profiles kept for inspection; the oldest are dropped first
+MAX_PROFILES = 20
+
+
+# The call stack of a frame, outermost call first, one entry per function
+def stack_of(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        # Directory and file name, so flask/app.py and the portal's app.py stay apart
+        location = os.path.join(os.path.basename(os.path.dirname(code.co_filename)), os.path.basename(code.co_filename))
+        stack.append(f"{code.co_name} ({location}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+# Render sampled stacks in the collapsed format read by flame graph tools
+def collapsed(samples):
+    return '\n'.join(f"{';'.join(stack)} {count}" for stack, count in samples.most_common()) + '\n'
+
+
+# The functions that appear in the most samples
+def top_functions(samples, limit=25, sort='self'):
+    """Return [{'function', 'self', 'total'}] sorted by self or total samples.
+
+    self counts the samples in which the function was running, total the
+    samples in which it was anywhere on the stack.
+    """
+    own = collections.Counter()
+    total = collections.Counter()
+    for stack, count in samples.items():
+        own[stack[-1]] += count
+        for function in set(stack):
+            total[function] += count
+    ranked = sorted(total, key=lambda function: (own[function], total[function]) if sort == 'self'
+                    else (total[function], own[function]), reverse=True)
+    return [{'function': function, 'self': own[function], 'total': total[function]} for function in ranked[:limit]]
+
+
+class SamplingProfiler:
+    """Statistical profiler for individual requests.
+
+    start() and stop() bracket the work of one thread. While any thread is
+    being profiled, a daemon thread wakes every interval seconds and records
+    the current stack of each profiled thread from sys._current_frames(), so
+    the profiled code itself runs unmodified. record() keeps a finished
+    profile for later inspection.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, keep=MAX_PROFILES):
+        self.interval = interval
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._active = {}
+        self._thread = None
+        self._pid = None
+        self._ids = itertools.count(1)
+        self.profiles = collections.OrderedDict()
+
+    def start(self):
+        """Start sampling the calling thread"""
+        with self._lock:
+            self._active[threading.get_ident()] = collections.Counter()
+            # Threads do not survive a fork, so a forked worker starts its own
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+
+    def stop(self):
+        """Stop sampling the calling thread and return its samples (a Counter of stacks)"""
+        with self._lock:
+            return self._active.pop(threading.get_ident(), collections.Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._active:
+                    self._wakeup.wait()
+                thread_ids = list(self._active)
+            frames = sys._current_frames()
+            stacks = {thread_id: stack_of(frames[thread_id]) for thread_id in thread_ids if thread_id in frames}
+            del frames
+            with self._lock:
+                for thread_id, stack in stacks.items():
+                    if thread_id in self._active:
+                        self._active[thread_id][stack] += 1
+            time.sleep(self.interval)
+
+    def record(self, samples, **info):
+        """Keep a finished profile with some details of the request; return its ID"""
+        with self._lock:
+            profile_id = next(self._ids)
+            self.profiles[profile_id] = {'id': profile_id, 'samples': samples, **info}
+            while len(self.profiles) > self.keep:
+                self.profiles.popitem(last=False)
+            return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self.profiles.get(profile_id)
+
+    def summaries(self):
+        """Return the kept profiles without their samples, newest first"""
+        with self._lock:
+            return [{**{k: v for k, v in profile.items() if k != 'samples'}, 'sample_count': sum(profile['samples'].values())}
+                    for profile in reversed(self.profiles.values())]
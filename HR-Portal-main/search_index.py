@@ -0,0 +1,140 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+import math
+import re
+import threading
+
+from excel_storage import ID_FIELD
+
+# Searchable fields and how much a match in each counts towards the rank
+SEARCH_FIELDS = {
+    'Name': 3.0,
+    'Email ID': 3.0,
+    'Contact Number': 2.0,
+    'Current Organization': 2.0,
+    'Certifications': 1.0,
+    'Comments': 1.0,
+    'Initial Screening': 1.0,
+    'Round 1 Remarks': 1.0,
+    'Round 2 Remarks': 1.0,
+    'Final Remarks': 1.0
+}
+
+# A term that only matches the start of a word counts this much of a whole-word match
+PREFIX_WEIGHT = 0.5
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+# Split text into lowercase word tokens
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text or '').lower())
+
+
+# Weighted token counts of one record
+def record_terms(record):
+    terms = defaultdict(float)
+    for field, weight in SEARCH_FIELDS.items():
+        for token in tokenize(record.get(field)):
+            terms[token] += weight
+    return terms
+
+
+class SearchIndex:
+    """Inverted index over the searchable candidate fields.
+
+    Registered as a CandidateStore listener: built once per load, then
+    patched for every added, updated or deleted record. Tokens are kept in
+    a sorted list as well, so every word starting with a query term is found
+    with a binary search. All terms of a query must match; records are
+    ranked by field weight, term frequency and how rare each term is, with
+    prefix matches counting less than whole words.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.postings = defaultdict(dict)
+        self.tokens = []
+        self.record_terms = {}
+
+    def _add(self, record):
+        terms = record_terms(record)
+        record_id = record[ID_FIELD]
+        self.record_terms[record_id] = terms
+        for token, weight in terms.items():
+            if token not in self.postings:
+                insort(self.tokens, token)
+            self.postings[token][record_id] = weight
+
+    def _remove(self, record_id):
+        for token in self.record_terms.pop(record_id, {}):
+            posting = self.postings[token]
+            posting.pop(record_id, None)
+            if not posting:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def reset(self, rows):
+        with self._lock:
+            self._clear()
+            for record in rows:
+                self._add(record)
+
+    def apply(self, old, new):
+        with self._lock:
+            if old is not None:
+                self._remove(old[ID_FIELD])
+            if new is not None:
+                self._add(new)
+
+    def _expand(self, term):
+        """Return the indexed tokens starting with term"""
+        start = bisect_left(self.tokens, term)
+        matches = []
+        for token in self.tokens[start:]:
+            if not token.startswith(term):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, query, limit=20):
+        """Return ([(record_id, score)] best first, total matches) for a query"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], 0
+
+        with self._lock:
+            record_count = max(len(self.record_terms), 1)
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token in self._expand(term):
+                    posting = self.postings[token]
+                    idf = math.log(1 + record_count / len(posting))
+                    factor = idf * (1.0 if token == term else PREFIX_WEIGHT)
+                    for record_id, weight in posting.items():
+                        score = weight * factor
+                        if score > term_scores.get(record_id, 0.0):
+                            term_scores[record_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {record_id: scores[record_id] + score
+                              for record_id, score in term_scores.items() if record_id in scores}
+                if not scores:
+                    return [], 0
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit], len(ranked)
+
+    def stats(self):
+        """Return the size of the index"""
+        with self._lock:
+            return {
+                'records': len(self.record_terms),
+                'tokens': len(self.tokens),
+                'postings': sum(len(posting) for posting in self.postings.values())
+            }
@@ -0,0 +1,434 @@
+import argparse
+import json
+import os
+import sqlite3
+
+import openpyxl
+from openpyxl.packaging.custom import IntProperty
+
+from candidate_query import leading_number, normalize_notice_period
+from metrics import stage
+from process_sync import InterProcessLock
+from excel_storage import (
+    CANDIDATE_HEADERS, ID_FIELD, NEXT_ID_PROPERTY, RECORD_FIELDS, VERSION_FIELD,
+    assign_ids, cell_text, excel_value, record_number
+)
+
+# Columns that get their own index for filters, point lookups and group-bys
+INDEXED_COLUMNS = [
+    'Email ID', 'Interested Position', 'Application Status', 'Interview Status',
+    'Current Location', 'Location Preference', 'Date'
+]
+
+
+# Quote a header so it can be used as a SQLite column name
+def quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+class SQLiteCandidateStorage:
+    """Candidate storage backed by an indexed SQLite table.
+
+    Every column of the candidate sheet gets its own TEXT column, any other
+    headers found in an imported workbook are kept in a JSON 'extra' column,
+    and the experience and notice period filters are stored pre-normalized
+    so the table view filters run as indexed queries. The database runs in
+    WAL mode so reads are not blocked by a write in progress.
+
+    The table's AUTOINCREMENT id is the record ID, so IDs of deleted
+    candidates are never handed out again. The meta table's version counter
+    goes up with every write from any process, which is what signature()
+    returns; write_lock() serializes writers across processes.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self.extra_headers = []
+        self._initialized = False
+        self._lock = InterProcessLock(path + '.lock')
+
+    def write_lock(self):
+        """Return the inter-process lock that serializes writes to the database"""
+        return self._lock
+
+    def connect(self):
+        """Open a connection, creating the schema on first use"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA synchronous = NORMAL')
+        if not self._initialized:
+            self.init_db(conn)
+            self._initialized = True
+        return conn
+
+    def init_db(self, conn):
+        """Create the candidates table, its indexes and the version counter"""
+        conn.execute('PRAGMA journal_mode = WAL')
+        columns = ', '.join(f'{quote(header)} TEXT DEFAULT \'\'' for header in CANDIDATE_HEADERS)
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS candidates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version INTEGER NOT NULL DEFAULT 1,
+                {columns},
+                experience_years REAL DEFAULT 0,
+                notice_days TEXT DEFAULT '',
+                extra TEXT DEFAULT '{{}}'
+            )
+        ''')
+        # Databases created before record versions were tracked
+        existing = [row[1] for row in conn.execute('PRAGMA table_info(candidates)')]
+        if 'version' not in existing:
+            conn.execute('ALTER TABLE candidates ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+        for column in INDEXED_COLUMNS:
+            index_name = 'idx_candidates_' + column.lower().replace(' ', '_')
+            collate = ' COLLATE NOCASE' if column == 'Interested Position' else ''
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON candidates ({quote(column)}{collate})')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_candidates_experience_years ON candidates (experience_years)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_candidates_notice_days ON candidates (notice_days)')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+        conn.commit()
+
+    def _bump_version(self, conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    # Return the ID the next inserted candidate would get
+    def _next_id(self, conn):
+        fetched = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'candidates'").fetchone()
+        return (fetched[0] if fetched else 0) + 1
+
+    def signature(self):
+        """Return the write counter of the database"""
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        finally:
+            conn.close()
+
+    def count(self):
+        """Return the number of stored candidates"""
+        conn = self.connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM candidates').fetchone()[0]
+        finally:
+            conn.close()
+
+    # Convert a record into the values of one table row
+    def _row_values(self, row_data):
+        values = [excel_value(row_data, header) for header in CANDIDATE_HEADERS]
+        extra = {header: excel_value(row_data, header) for header in self.extra_headers if header in row_data}
+        return values + [
+            leading_number(row_data.get('Total Years of Experience') or ''),
+            normalize_notice_period(row_data.get('Notice Period') or ''),
+            json.dumps(extra)
+        ]
+
+    # Insert records, returning them as stored; ids and versions are new unless given
+    def _insert(self, conn, rows_data, ids=None, versions=None):
+        placeholders = ', '.join('?' for _ in range(len(CANDIDATE_HEADERS) + 5))
+        columns = ', '.join(quote(header) for header in CANDIDATE_HEADERS)
+        sql = f'INSERT INTO candidates (id, version, {columns}, experience_years, notice_days, extra) VALUES ({placeholders})'
+        records = []
+        for position, row_data in enumerate(rows_data):
+            record_id = ids[position] if ids else None
+            version = versions[position] if versions else 1
+            record_id = conn.execute(sql, [record_id, version] + self._row_values(row_data)).lastrowid
+            record = {header: excel_value(row_data, header) for header in CANDIDATE_HEADERS}
+            for header in self.extra_headers:
+                record[header] = excel_value(row_data, header)
+            record[ID_FIELD] = record_id
+            record[VERSION_FIELD] = version
+            records.append(record)
+        return records
+
+    # Build the API record from a table row
+    def _record(self, row):
+        record = dict(zip(CANDIDATE_HEADERS, row[2:len(CANDIDATE_HEADERS) + 2]))
+        record = {header: value or '' for header, value in record.items()}
+        extra = json.loads(row[-1] or '{}')
+        for header in self.extra_headers:
+            record[header] = extra.get(header, '')
+        record[ID_FIELD] = row[0]
+        record[VERSION_FIELD] = row[1]
+        return record
+
+    def _select_columns(self):
+        return 'id, version, ' + ', '.join(quote(header) for header in CANDIDATE_HEADERS) + ', extra'
+
+    def load(self, build=None):
+        """Read every candidate in insertion order.
+
+        build, if given, turns each record into the row that is returned, one
+        record at a time as they are read, so the plain records never all
+        exist at once.
+        """
+        conn = self.connect()
+        try:
+            with stage('load'):
+                extra_headers = []
+                for (extra,) in conn.execute("SELECT extra FROM candidates WHERE extra NOT IN ('', '{}')"):
+                    for header in json.loads(extra):
+                        if header not in extra_headers:
+                            extra_headers.append(header)
+                self.extra_headers = extra_headers
+                cursor = conn.execute(f'SELECT {self._select_columns()} FROM candidates ORDER BY id')
+            with stage('parse'):
+                if build is None:
+                    return [self._record(row) for row in cursor]
+                return [build(self._record(row)) for row in cursor]
+        finally:
+            conn.close()
+
+    def update_row(self, rows, index, changes):
+        """Update the changed columns of the record at index"""
+        return self.update_rows(rows, [(index, changes)])[0]
+
+    def update_rows(self, rows, updates):
+        """Update the changed columns of several records in a single transaction"""
+        records = {}
+        for index, changes in updates:
+            record = dict(records.get(index, rows[index]))
+            for key, value in changes.items():
+                header = 'Initial Screening' if key == 'Initial Remarks' else key
+                if header in CANDIDATE_HEADERS or header in self.extra_headers:
+                    record[header] = excel_value(changes, key)
+            record[VERSION_FIELD] += 1
+            records[index] = record
+
+        assignments = ', '.join(f'{quote(header)} = ?' for header in CANDIDATE_HEADERS)
+        sql = (
+            f'UPDATE candidates SET {assignments}, experience_years = ?, notice_days = ?, extra = ?, '
+            'version = ? WHERE id = ?'
+        )
+        conn = self.connect()
+        try:
+            conn.executemany(sql, [
+                self._row_values(record) + [record[VERSION_FIELD], record[ID_FIELD]]
+                for record in records.values()
+            ])
+            self._bump_version(conn)
+            with stage('save'):
+                conn.commit()
+        finally:
+            conn.close()
+        for index, record in records.items():
+            rows[index] = record
+        return [records[index] for index, _ in updates]
+
+    def append_row(self, rows, row_data):
+        """Insert one new record after the last one"""
+        return self.append_rows(rows, [row_data])[0]
+
+    def append_rows(self, rows, data):
+        """Insert new records after the last one in a single transaction"""
+        conn = self.connect()
+        try:
+            records = self._insert(conn, data)
+            self._bump_version(conn)
+            with stage('save'):
+                conn.commit()
+        finally:
+            conn.close()
+        rows.extend(records)
+        return records
+
+    def delete_row(self, rows, index):
+        """Delete the record at index"""
+        conn = self.connect()
+        try:
+            conn.execute('DELETE FROM candidates WHERE id = ?', (rows[index][ID_FIELD],))
+            self._bump_version(conn)
+            with stage('save'):
+                conn.commit()
+        finally:
+            conn.close()
+        return rows.pop(index)
+
+    def replace_all(self, rows, data):
+        """Replace every stored candidate with the given records in one transaction"""
+        extra_headers = []
+        for row_data in data:
+            for header in row_data:
+                if (header not in CANDIDATE_HEADERS and header not in RECORD_FIELDS
+                        and header != 'Initial Remarks' and header not in extra_headers):
+                    extra_headers.append(header)
+        self.extra_headers = [header for header in extra_headers if header]
+
+        # Keep the IDs of the given records, numbering any that lack one
+        conn = self.connect()
+        try:
+            ids, _ = assign_ids([record_number(row_data.get(ID_FIELD)) for row_data in data], self._next_id(conn))
+            versions = [record_number(row_data.get(VERSION_FIELD)) or 1 for row_data in data]
+            conn.execute('DELETE FROM candidates')
+            rows[:] = self._insert(conn, data, ids, versions)
+            self._bump_version(conn)
+            with stage('save'):
+                conn.commit()
+        finally:
+            conn.close()
+
+    # Translate the table view filters into a WHERE clause
+    def _where(self, filters):
+        clauses = []
+        params = []
+        if filters.get('position'):
+            clauses.append('"Interested Position" = ? COLLATE NOCASE')
+            params.append(filters['position'])
+        if filters.get('status'):
+            if filters['status'] == 'EMPTY':
+                clauses.append('("Application Status" IS NULL OR "Application Status" = \'\')')
+            else:
+                clauses.append('"Application Status" = ?')
+                params.append(filters['status'])
+        if filters.get('location'):
+            clauses.append('"Location Preference" = ?')
+            params.append(filters['location'])
+        experience = filters.get('experience')
+        if experience:
+            if experience.endswith('+'):
+                clauses.append('experience_years >= ?')
+                params.append(leading_number(experience))
+            else:
+                bounds = experience.split('-')
+                try:
+                    params.extend([float(bounds[0]), float(bounds[-1])])
+                    clauses.append('experience_years BETWEEN ? AND ?')
+                except ValueError:
+                    clauses.append('0')
+        if filters.get('notice_period'):
+            clauses.append('notice_days = ?')
+            params.append(normalize_notice_period(filters['notice_period']))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    # SQL text value of a sort key, or None for a key no record has (every row ties)
+    def _sort_column(self, sort_key):
+        if sort_key in CANDIDATE_HEADERS:
+            return f'trim({quote(sort_key)})'
+        if sort_key == ID_FIELD:
+            return 'trim(id)'
+        if sort_key == VERSION_FIELD:
+            return 'trim(version)'
+        if sort_key in self.extra_headers:
+            # Extra headers are kept in the JSON column
+            path = ('$.' + json.dumps(sort_key)).replace("'", "''")
+            return f"trim(coalesce(json_extract(extra, '{path}'), ''))"
+        return None
+
+    def query(self, filters, sort_key=None, descending=False, limit=None, offset=0):
+        """Return (rows, total) for the table view filters using indexed queries.
+
+        Each row carries its position in the full list as '_originalIndex'.
+        Any field sorts, as on the in-memory path: numbers numerically and
+        everything else case-insensitively, ties in record order.
+        """
+        where, params = self._where(filters)
+        order = 'id'
+        column = self._sort_column(sort_key)
+        if column is not None:
+            direction = ' DESC' if descending else ''
+            order = (
+                f"CASE WHEN {column} <> '' AND {column} NOT GLOB '*[^0-9.]*' THEN 0 ELSE 1 END{direction}, "
+                f'CAST({column} AS REAL){direction}, lower({column}){direction}, id'
+            )
+        page = f' LIMIT {int(limit)} OFFSET {int(offset)}' if limit is not None else ''
+
+        conn = self.connect()
+        try:
+            total = conn.execute(f'SELECT COUNT(*) FROM candidates{where}', params).fetchone()[0]
+            fetched = conn.execute(f'''
+                SELECT position, {self._select_columns()} FROM (
+                    SELECT ROW_NUMBER() OVER (ORDER BY id) - 1 AS position, * FROM candidates
+                ) AS candidates{where}
+                ORDER BY {order}{page}
+            ''', params).fetchall()
+        finally:
+            conn.close()
+        return [{**self._record(row[1:]), '_originalIndex': row[0]} for row in fetched], total
+
+    def count_by(self, column):
+        """Return {value: count} for one column using a GROUP BY"""
+        if column not in CANDIDATE_HEADERS:
+            raise KeyError(column)
+        conn = self.connect()
+        try:
+            fetched = conn.execute(
+                f'SELECT {quote(column)}, COUNT(*) FROM candidates GROUP BY {quote(column)}'
+            ).fetchall()
+        finally:
+            conn.close()
+        return {value or '': count for value, count in fetched}
+
+    def find_by_email(self, email):
+        """Return the first record with the given Email ID, or None"""
+        conn = self.connect()
+        try:
+            row = conn.execute(
+                f'SELECT {self._select_columns()} FROM candidates WHERE "Email ID" = ? ORDER BY id LIMIT 1',
+                (email,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return self._record(row) if row else None
+
+    def migrate_from_excel(self, xlsx_path, sheet_name, force=False):
+        """Import every row of the workbook in one transaction.
+
+        This is a one-shot migration: it refuses to run against a database
+        that already holds candidates unless force is set.
+        """
+        if not force and self.count() > 0:
+            raise RuntimeError(f'{self.path} already contains candidates; use force to re-import')
+
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+        try:
+            sheet = wb[sheet_name]
+            rows_iter = sheet.iter_rows(values_only=True)
+            headers = ['Initial Screening' if h == 'Initial Remarks' else h for h in next(rows_iter, [])]
+            data = []
+            for row in rows_iter:
+                data.append({header: cell_text(value) for header, value in zip(headers, row) if header})
+        finally:
+            wb.close()
+
+        self.replace_all([], data)
+        print(f"Migrated {len(data)} candidates from {xlsx_path} to {self.path}")
+        return len(data)
+
+    def export_to_excel(self, xlsx_path, sheet_name):
+        """Write every candidate to a workbook in the current sheet layout, keeping the record IDs"""
+        rows = self.load()
+        conn = self.connect()
+        try:
+            next_id = self._next_id(conn)
+        finally:
+            conn.close()
+        headers = CANDIDATE_HEADERS + self.extra_headers + RECORD_FIELDS
+        wb = openpyxl.Workbook(write_only=True)
+        wb.custom_doc_props.append(IntProperty(name=NEXT_ID_PROPERTY, value=next_id))
+        sheet = wb.create_sheet(sheet_name)
+        sheet.append(headers)
+        for row in rows:
+            sheet.append([row.get(header, '') for header in headers])
+        wb.save(xlsx_path)
+        print(f"Exported {len(rows)} candidates from {self.path} to {xlsx_path}")
+        return len(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move candidates between data.xlsx and the SQLite store')
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('xlsx', nargs='?', default='data.xlsx')
+    parser.add_argument('--db', default='instance/candidates.db')
+    parser.add_argument('--sheet', default='Candidates')
+    parser.add_argument('--force', action='store_true', help='re-import into a non-empty database')
+    args = parser.parse_args()
+
+    storage = SQLiteCandidateStorage(args.db)
+    if args.command == 'import':
+        storage.migrate_from_excel(args.xlsx, args.sheet, force=args.force)
+    else:
+        storage.export_to_excel(args.xlsx, args.sheet)
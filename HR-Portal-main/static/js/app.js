@@ -1,17 +1,24 @@
 // Global variables
 let tableData = [];
 let originalTableData = []; // Store original unfiltered data
+let recordsById = new Map(); // _id -> record in originalTableData
+let dataVersion = null; // Dataset version of originalTableData, for /api/data/changes
 let tableColumns = [];
 let groupChart = null;
 let distributionChart = null;
 let dropdownOptions = {};
 let currentIsAdmin = false; // Store admin status for filtering
+let dataFields = null; // Columns loaded into originalTableData (null: every column)
 
 function updateAdminControls(isAdmin) {
     const addCandidateBtn = document.getElementById('addCandidateBtn');
     if (addCandidateBtn) {
         addCandidateBtn.style.display = isAdmin ? 'inline-block' : 'none';
     }
+    const importCandidatesBtn = document.getElementById('importCandidatesBtn');
+    if (importCandidatesBtn) {
+        importCandidatesBtn.style.display = isAdmin ? 'inline-block' : 'none';
+    }
 }
 
 // Desired field order for candidate management UI
@@ -28,6 +35,9 @@ const FIELD_ORDER = [
     'Remarks', 'Reject Mail Sent'
 ];
 
+// Columns of the table for non-admin users; their list loads only these
+const USER_TABLE_COLUMNS = ['Date', 'Name', 'Email ID', 'Interested Position', 'Current Role', 'Current Organization', 'Current Location', 'Total Years of Experience', 'Resume', 'Referred By', 'Interview Status', 'Application Status', 'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks'];
+
 // Predefined dropdown options
 const PREDEFINED_DROPDOWNS = {
     'Interview Status': [
@@ -71,6 +81,7 @@ document.addEventListener('DOMContentLoaded', function () {
         populateStatusFilterOptions();
         // Then load data
         fetchData();
+        connectLiveUpdates();
     });
 
     // Set up event listeners
@@ -90,6 +101,15 @@ document.addEventListener('DOMContentLoaded', function () {
     if (experienceFilter) experienceFilter.addEventListener('change', applyTableFilters);
     if (noticePeriodFilter) noticePeriodFilter.addEventListener('change', applyTableFilters);
 
+    const candidateSearch = document.getElementById('candidateSearch');
+    if (candidateSearch) {
+        let searchTimeout;
+        candidateSearch.addEventListener('input', function () {
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(searchCandidates, 250);
+        });
+    }
+
     const toggleFiltersBtn = document.getElementById('toggleFiltersBtn');
     if (toggleFiltersBtn) {
         toggleFiltersBtn.style.display = 'inline-block'; // Make the button visible
@@ -416,7 +436,7 @@ function showCandidateDetails(candidate) {
     });
 
     // Display any remaining fields not in FIELD_ORDER
-    const remainingFields = Object.keys(candidate).filter(field => !FIELD_ORDER.includes(field));
+    const remainingFields = Object.keys(candidate).filter(field => !FIELD_ORDER.includes(field) && !isRecordField(field));
     remainingFields.forEach(field => {
         if (candidate.hasOwnProperty(field) && candidate[field] !== null && candidate[field] !== '') {
             const detailItem = document.createElement('div');
@@ -523,14 +543,20 @@ function populateStatusFilterOptions() {
 
 // Fetch data from the API
 function fetchData() {
-    fetch('/api/data')
+    // Admins see every column; everyone else only loads the ones their table shows
+    const fields = document.body.dataset.isAdmin === 'false' ? USER_TABLE_COLUMNS : null;
+    fetch(`/api/data?format=compact&dictionary=1${fieldsQuery(fields, '&')}`)
         .then(response => response.json())
         .then(responseData => {
-            const { data, is_admin } = responseData;
+            const data = decodeRows(responseData.data);
+            const { is_admin } = responseData;
             console.log('API Data:', data);
             console.log('Is Admin:', is_admin);
             // Store original data when fetched from API
             originalTableData = JSON.parse(JSON.stringify(data)); // Deep copy
+            dataFields = fields;
+            indexRecords();
+            dataVersion = responseData.version;
             currentIsAdmin = is_admin;
             updateAdminControls(is_admin);
             // Apply current filter if any
@@ -543,6 +569,7 @@ function fetchData() {
             } else {
                 populateTable(data, is_admin);
             }
+            refreshFilterFacets();
         })
         .catch(error => {
             console.error('Error fetching data:', error);
@@ -550,25 +577,106 @@ function fetchData() {
         });
 }
 
-// Helper function to get the correct record index for API calls
-function getRecordIndex(row) {
-    // If row has _originalIndex (from filtering), use it
-    if (row._originalIndex !== undefined) {
-        return row._originalIndex;
-    }
-    // Otherwise, find the record in originalTableData
-    const index = originalTableData.findIndex(originalRow => {
-        // Use Email ID as unique identifier if available
-        if (row['Email ID'] && originalRow['Email ID']) {
-            return originalRow['Email ID'] === row['Email ID'];
+// Turn a ?format=compact row list (headers once, dictionary-coded columns) back into records
+function decodeRows(data) {
+    if (Array.isArray(data)) {
+        return data;
+    }
+    const dictionaries = data.dictionaries || {};
+    const lookups = data.columns.map(column => dictionaries[column] || null);
+    return data.rows.map(values => {
+        const record = {};
+        data.columns.forEach((column, position) => {
+            const value = values[position];
+            record[column] = lookups[position] ? lookups[position][value] : value;
+        });
+        return record;
+    });
+}
+
+// The ?fields= projection for a list of columns (empty for every column)
+function fieldsQuery(fields, separator) {
+    return fields ? `${separator}fields=${encodeURIComponent(fields.join(','))}` : '';
+}
+
+// Resolve to the record with every field, fetching it if the list only has some
+function loadFullRecord(record) {
+    if (!dataFields) {
+        return Promise.resolve(record);
+    }
+    return fetch(`/api/data/${record._id}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.record) {
+                return record;
+            }
+            const loaded = findRecord(record._id);
+            if (loaded) {
+                Object.assign(loaded, data.record);
+            }
+            return { ...record, ...data.record };
+        })
+        .catch(error => {
+            console.error('Error loading candidate:', error);
+            return record;
+        });
+}
+
+// Helper function to get the stable record ID used by the API
+function getRecordId(row) {
+    return row._id;
+}
+
+// Rebuild the _id lookup after originalTableData has been replaced
+function indexRecords() {
+    recordsById = new Map(originalTableData.map(record => [record._id, record]));
+}
+
+// Merge a /api/data/changes response into originalTableData
+function applyChanges(changes, deleted) {
+    changes.forEach(record => {
+        const existing = recordsById.get(record._id);
+        if (existing) {
+            Object.assign(existing, record);
+        } else {
+            originalTableData.push(record);
         }
-        // Fallback: compare all fields (excluding _originalIndex)
-        const rowCopy = { ...row };
-        delete rowCopy._originalIndex;
-        return JSON.stringify(originalRow) === JSON.stringify(rowCopy);
     });
-    // If found, return index; otherwise return -1
-    return index !== -1 ? index : tableData.findIndex(r => r === row);
+    if (deleted.length) {
+        const deletedIds = new Set(deleted);
+        originalTableData = originalTableData.filter(record => !deletedIds.has(record._id));
+    }
+    indexRecords();
+}
+
+// Find a loaded record by its ID
+function findRecord(recordId) {
+    return recordsById.get(Number(recordId));
+}
+
+// Record bookkeeping fields (_id, _version, _originalIndex) are not shown
+function isRecordField(field) {
+    return field.startsWith('_');
+}
+
+// Save changes to a record, expecting the version that was loaded.
+// The local copy takes the server's record: the new version on success,
+// or the current one when someone else changed it first (409).
+function putRecord(record, changes) {
+    return fetch(`/api/data/${record._id}`, {
+        method: 'PUT',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ ...changes, _version: record._version }),
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.record) {
+                Object.assign(record, data.record);
+            }
+            return data;
+        });
 }
 
 // Function to filter table by Interested Position
@@ -576,71 +684,181 @@ function filterTableByPosition() {
     applyTableFilters();
 }
 
-function applyTableFilters() {
-    const positionFilter = document.getElementById('positionFilter');
-    const statusFilter = document.getElementById('statusFilter');
-    const locationFilter = document.getElementById('locationFilter');
-    const experienceFilter = document.getElementById('experienceFilter');
-    const noticePeriodFilter = document.getElementById('noticePeriodFilter');
+// Build the query parameters for the table filters that are currently selected
+function getTableFilterParams() {
+    const filterFields = {
+        position: 'positionFilter',
+        status: 'statusFilter',
+        location: 'locationFilter',
+        experience: 'experienceFilter',
+        notice_period: 'noticePeriodFilter'
+    };
 
-    const selectedPosition = positionFilter ? positionFilter.value : '';
-    const selectedStatus = statusFilter ? statusFilter.value : '';
-    const selectedLocation = locationFilter ? locationFilter.value : '';
-    const selectedExperience = experienceFilter ? experienceFilter.value : '';
-    const selectedNoticePeriod = noticePeriodFilter ? noticePeriodFilter.value : '';
+    const params = new URLSearchParams();
+    for (const [param, elementId] of Object.entries(filterFields)) {
+        const element = document.getElementById(elementId);
+        if (element && element.value !== '') {
+            params.set(param, element.value);
+        }
+    }
+    return params;
+}
 
-    const hasPositionFilter = selectedPosition !== '';
-    const hasStatusFilter = selectedStatus !== '';
-    const hasLocationFilter = selectedLocation !== '';
-    const hasExperienceFilter = selectedExperience !== '';
-    const hasNoticePeriodFilter = selectedNoticePeriod !== '';
+// Current text of the candidate search box
+function getSearchQuery() {
+    const candidateSearch = document.getElementById('candidateSearch');
+    return candidateSearch ? candidateSearch.value.trim() : '';
+}
 
-    if (!hasPositionFilter && !hasStatusFilter && !hasLocationFilter && !hasExperienceFilter && !hasNoticePeriodFilter) {
-        populateTable(originalTableData, currentIsAdmin);
+// Show the best matches for the search box, or the filtered table once it is cleared
+function searchCandidates() {
+    const query = getSearchQuery();
+    if (query === '') {
+        applyTableFilters();
         return;
     }
 
-    const filteredData = originalTableData
-        .map((row, originalIndex) => ({
-            ...row,
-            _originalIndex: originalIndex
-        }))
-        .filter(row => {
-            const interestedPosition = row['Interested Position'] || '';
-            const applicationStatus = row['Application Status'] || '';
-            const candidateLocation = row['Location Preference'] || '';
-            const totalYearsExperience = parseFloat(row['Total Years of Experience']) || 0;
-            const candidateNoticePeriod = row['Notice Period'] || '';
+    fetch(`/api/search?${new URLSearchParams({ q: query, limit: 100 }).toString()}`)
+        .then(response => response.json())
+        .then(responseData => {
+            // Ignore answers to a query the user has typed past
+            if (query !== getSearchQuery()) return;
+            populateTable(responseData.results || [], currentIsAdmin);
+        })
+        .catch(error => {
+            console.error('Error searching candidates:', error);
+            showNotification('Failed to search candidates. Please try again later.', 'error');
+        });
+}
 
-            const matchesPosition = !hasPositionFilter || (interestedPosition.trim().toLowerCase() === selectedPosition.trim().toLowerCase());
+// Option labels for the filter dropdowns that list values present in the data
+const FACET_FILTERS = {
+    positionFilter: { column: 'Interested Position', allLabel: 'All Positions' },
+    locationFilter: { column: 'Location Preference', allLabel: 'All Locations' },
+    statusFilter: { column: 'Application Status', allLabel: 'All Application Statuses', emptyValue: 'EMPTY' }
+};
 
-            let matchesStatus = true;
-            if (hasStatusFilter) {
-                if (selectedStatus === 'EMPTY') {
-                    matchesStatus = !applicationStatus || applicationStatus === '';
-                } else {
-                    matchesStatus = applicationStatus === selectedStatus;
+// Rebuild the filter dropdowns from /api/facets: the values in use, with
+// how many candidates each would match alongside the other filters
+function refreshFilterFacets() {
+    if (!document.getElementById('filterContainer')) {
+        return;
+    }
+
+    fetch(`/api/facets?${getTableFilterParams().toString()}`)
+        .then(response => response.json())
+        .then(responseData => {
+            for (const [elementId, facet] of Object.entries(FACET_FILTERS)) {
+                const select = document.getElementById(elementId);
+                if (select && responseData.facets) {
+                    fillFacetOptions(select, facet, responseData.facets[facet.column] || []);
                 }
             }
+        })
+        .catch(error => {
+            console.error('Error fetching filter counts:', error);
+        });
+}
 
-            const matchesLocation = !hasLocationFilter || candidateLocation === selectedLocation;
+// Replace the options of one filter dropdown, keeping its selection
+function fillFacetOptions(select, facet, counts) {
+    const previousValue = select.value;
+    select.innerHTML = '';
 
-            let matchesExperience = true;
-            if (hasExperienceFilter) {
-                if (selectedExperience === '10+') {
-                    matchesExperience = totalYearsExperience >= 10;
-                } else if (selectedExperience !== '') {
-                    const [minExp, maxExp] = selectedExperience.split('-').map(Number);
-                    matchesExperience = totalYearsExperience >= minExp && totalYearsExperience <= maxExp;
-                }
+    const addOption = (value, label) => {
+        const optionElement = document.createElement('option');
+        optionElement.value = value;
+        optionElement.textContent = label;
+        select.appendChild(optionElement);
+    };
+
+    addOption('', facet.allLabel);
+    const values = new Set(['']);
+    counts.forEach(({ value, count }) => {
+        if (value === '') {
+            if (facet.emptyValue) {
+                addOption(facet.emptyValue, `(Empty) (${count})`);
+                values.add(facet.emptyValue);
             }
+            return;
+        }
+        addOption(value, `${value} (${count})`);
+        values.add(value);
+    });
+
+    // A selected value that no longer matches anything stays selectable
+    if (!values.has(previousValue)) {
+        addOption(previousValue, `${previousValue === facet.emptyValue ? '(Empty)' : previousValue} (0)`);
+    }
+    select.value = previousValue;
+}
+
+function applyTableFilters() {
+    const params = getTableFilterParams();
+    refreshFilterFacets();
+
+    // Filters apply to the whole table, so they end a search
+    const candidateSearch = document.getElementById('candidateSearch');
+    if (candidateSearch) {
+        candidateSearch.value = '';
+    }
+
+    if (params.toString() === '') {
+        populateTable(originalTableData, currentIsAdmin);
+        return;
+    }
+
+    // Let the server filter the candidates; each row comes back with its _originalIndex
+    fetch(`/api/data?${params.toString()}${fieldsQuery(dataFields, '&')}`)
+        .then(response => response.json())
+        .then(responseData => {
+            populateTable(responseData.data, currentIsAdmin);
+        })
+        .catch(error => {
+            console.error('Error filtering data:', error);
+            showNotification('Failed to filter data. Please try again later.', 'error');
+        });
+}
 
-            const matchesNoticePeriod = !hasNoticePeriodFilter || (candidateNoticePeriod.replace(/ days?$/, '') === selectedNoticePeriod.replace(/days?$/, ''));
+// Upload an .xlsx/.csv batch of candidates through the bulk import endpoint
+function importCandidates(input) {
+    const file = input.files[0];
+    if (!file) {
+        return;
+    }
+    const formData = new FormData();
+    formData.append('file', file);
 
-            return matchesPosition && matchesStatus && matchesLocation && matchesExperience && matchesNoticePeriod;
+    fetch('/api/data/import', {
+        method: 'POST',
+        body: formData,
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                showNotification(data.message, data.errors.length ? 'error' : 'success');
+                if (data.errors.length) {
+                    console.warn('Rejected import rows:', data.errors);
+                }
+                fetchData(); // Refresh table
+            } else {
+                showNotification(data.message || 'Failed to import candidates.', 'error');
+            }
+        })
+        .catch(error => {
+            console.error('Error importing candidates:', error);
+            showNotification('Error importing candidates', 'error');
+        })
+        .finally(() => {
+            input.value = '';
         });
+}
 
-    populateTable(filteredData, currentIsAdmin);
+// Download the candidates matching the current filters
+function exportData(format) {
+    const params = getTableFilterParams();
+    params.set('format', format);
+    window.location.href = `/api/export?${params.toString()}`;
 }
 
 // Function to update sticky column positions based on actual column widths
@@ -705,10 +923,10 @@ function populateTable(data, isAdmin) {
     tableBody.innerHTML = '';
     tableHead.innerHTML = '';
 
-    let columnsToShow = isAdmin ? FIELD_ORDER : ['Date', 'Name', 'Email ID', 'Interested Position', 'Current Role', 'Current Organization', 'Current Location', 'Total Years of Experience', 'Resume', 'Referred By', 'Interview Status', 'Application Status', 'Initial Screening', 'Round 1 Remarks', 'Round 2 Remarks'];
+    let columnsToShow = isAdmin ? FIELD_ORDER : USER_TABLE_COLUMNS;
 
     if (data && data.length > 0) {
-        const availableColumns = Object.keys(data[0]).filter(column => column !== '_originalIndex');
+        const availableColumns = Object.keys(data[0]).filter(column => !isRecordField(column));
         const ordered = columnsToShow.filter(c => availableColumns.includes(c));
         const remaining = availableColumns.filter(c => !ordered.includes(c));
 
@@ -764,8 +982,8 @@ function populateTable(data, isAdmin) {
             tr.addEventListener('click', (e) => {
                 // Don't trigger if clicking on action buttons or dropdowns
                 if (!e.target.closest('button') && !e.target.closest('select')) {
-                    const recordIndex = getRecordIndex(row);
-                    showCandidateDetails(row, recordIndex, isAdmin);
+                    const recordId = getRecordId(row);
+                    loadFullRecord(row).then(record => showCandidateDetails(record, recordId, isAdmin));
                 }
             });
 
@@ -891,8 +1109,8 @@ function populateTable(data, isAdmin) {
                         const rowElement = select.closest('tr');
                         const oldStatus = row[column] || '';
 
-                        // Find the correct index to use for update
-                        const recordIndex = getRecordIndex(row);
+                        // Find the record ID to use for update
+                        const recordId = getRecordId(row);
 
                         // Update select element color immediately based on Application Status
                         // Only apply colors for specific statuses, others remain normal
@@ -917,7 +1135,7 @@ function populateTable(data, isAdmin) {
                         }
 
                         // Update status with error handling to revert color if update fails
-                        updateRecordStatus(recordIndex, column, newStatus, rowElement, oldStatus, column);
+                        updateRecordStatus(recordId, column, newStatus, rowElement, oldStatus, column);
                     });
 
                     td.appendChild(select);
@@ -981,8 +1199,8 @@ function populateTable(data, isAdmin) {
             if (isAdmin) {
                 const actionTd = document.createElement('td');
 
-                // Find the correct index to use (handle filtering)
-                const recordIndex = getRecordIndex(row);
+                // Find the record ID to use (handle filtering)
+                const recordId = getRecordId(row);
 
                 const editBtn = document.createElement('button');
                 editBtn.className = 'btn btn-sm btn-primary edit-btn';
@@ -990,7 +1208,7 @@ function populateTable(data, isAdmin) {
                 editBtn.innerHTML = '<i class="bi bi-pencil"></i>';
                 editBtn.onclick = (e) => {
                     e.stopPropagation(); // Prevent row click
-                    openEditModal(recordIndex, isAdmin);
+                    openEditModal(recordId, isAdmin);
                 };
 
                 const deleteBtn = document.createElement('button');
@@ -999,7 +1217,7 @@ function populateTable(data, isAdmin) {
                 deleteBtn.innerHTML = '<i class="bi bi-trash"></i>';
                 deleteBtn.onclick = (e) => {
                     e.stopPropagation(); // Prevent row click
-                    deleteRecord(recordIndex);
+                    deleteRecord(recordId);
                 };
 
                 actionTd.appendChild(editBtn);
@@ -1009,8 +1227,8 @@ function populateTable(data, isAdmin) {
                 // For non-admin users, add Edit button that only shows Initial Screening and Round 1 Remarks
                 const actionTd = document.createElement('td');
 
-                // Find the correct index to use (handle filtering)
-                const recordIndex = getRecordIndex(row);
+                // Find the record ID to use (handle filtering)
+                const recordId = getRecordId(row);
 
                 const editBtn = document.createElement('button');
                 editBtn.className = 'btn btn-sm btn-primary edit-btn';
@@ -1018,7 +1236,7 @@ function populateTable(data, isAdmin) {
                 editBtn.innerHTML = '<i class="bi bi-pencil"></i>';
                 editBtn.onclick = (e) => {
                     e.stopPropagation(); // Prevent row click
-                    openEditModal(recordIndex, isAdmin);
+                    openEditModal(recordId, isAdmin);
                 };
 
                 actionTd.appendChild(editBtn);
@@ -1042,27 +1260,14 @@ function populateTable(data, isAdmin) {
 }
 
 // Function to update record status from the table
-function updateRecordStatus(index, column, newStatus, rowElement = null, oldStatus = null, statusColumn = null) {
-    const record = tableData[index];
-    const updatedRecord = { ...record, [column]: newStatus };
+function updateRecordStatus(recordId, column, newStatus, rowElement = null, oldStatus = null, statusColumn = null) {
+    const record = findRecord(recordId);
 
-    fetch(`/api/data/${index}`, {
-        method: 'PUT',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(updatedRecord),
-    })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('Network response was not ok');
-            }
-            return response.json();
-        })
+    putRecord(record, { [column]: newStatus })
         .then(data => {
             if (data.status === 'success') {
                 showNotification('Status updated successfully!', 'success');
-                tableData[index][column] = newStatus; // Update local data to avoid full refresh
+                // putRecord already updated the local record (and its version), avoiding a full refresh
             } else {
                 showNotification(data.message || 'Failed to update status.', 'error');
                 // Revert cell color if update failed and we have the cell element
@@ -1250,19 +1455,18 @@ function openAddModal() {
 }
 
 // Function to open edit modal
-function openEditModal(index, isAdmin) {
-    // Use originalTableData since index is always from original data
-    const record = originalTableData[index];
+function openEditModal(recordId, isAdmin) {
+    const record = findRecord(recordId);
     if (!record) {
-        console.error('Record not found at index:', index);
+        console.error('Record not found with id:', recordId);
         showNotification('Record not found', 'error');
         return;
     }
 
-    // Set the edit record index in the form
+    // Set the edit record ID in the form
     const editRecordIndexInput = document.getElementById('editRecordIndex');
     if (editRecordIndexInput) {
-        editRecordIndexInput.value = index;
+        editRecordIndexInput.value = recordId;
     }
 
     const modal = new bootstrap.Modal(document.getElementById('editDataModal'));
@@ -1395,7 +1599,7 @@ function saveNewRecord() {
 
 // Function to update record
 function updateRecord() {
-    const index = document.getElementById('editRecordIndex').value;
+    const record = findRecord(document.getElementById('editRecordIndex').value);
     const formData = new FormData(document.getElementById('editDataForm'));
     const updatedRecord = {};
 
@@ -1406,14 +1610,7 @@ function updateRecord() {
         updatedRecord[originalKey] = value;
     }
 
-    fetch(`/api/data/${index}`, {
-        method: 'PUT',
-        headers: {
-            'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(updatedRecord),
-    })
-        .then(response => response.json())
+    putRecord(record, updatedRecord)
         .then(data => {
             if (data.status === 'success') {
                 showNotification('Record updated successfully!', 'success');
@@ -1430,9 +1627,12 @@ function updateRecord() {
 }
 
 // Function to delete record
-function deleteRecord(index) {
+function deleteRecord(recordId) {
     if (confirm('Are you sure you want to delete this record?')) {
-        fetch(`/api/data/${index}`, {
+        // Only delete the version of the record that is on screen
+        const record = findRecord(recordId);
+        const version = record ? `?version=${record._version}` : '';
+        fetch(`/api/data/${recordId}${version}`, {
             method: 'DELETE',
         })
             .then(response => response.json())
@@ -2528,42 +2728,97 @@ document.addEventListener('DOMContentLoaded', () => {
 // Update the existing refreshData function to include analytics updates
 async function refreshData() {
     try {
-        const response = await fetch('/api/data');
+        // Only fetch the candidates changed since the last load; the server
+        // sends everything (resync) when it can no longer tell
+        const url = dataVersion
+            ? `/api/data/changes?since=${encodeURIComponent(dataVersion)}${fieldsQuery(dataFields, '&')}`
+            : `/api/data${fieldsQuery(dataFields, '?')}`;
+        const response = await fetch(url);
         const data = await response.json();
         console.log('Data refreshed:', data); // Add this line to log the refreshed data
 
-        // Store original data when refreshed
-        originalTableData = JSON.parse(JSON.stringify(data.data)); // Deep copy
-        currentIsAdmin = data.is_admin;
-        updateAdminControls(data.is_admin);
-
-        // Apply current filter if any
-        const positionFilterElement = document.getElementById('positionFilter');
-        const statusFilterElement = document.getElementById('statusFilter');
-        const hasPositionFilter = positionFilterElement && positionFilterElement.value;
-        const hasStatusFilter = statusFilterElement && statusFilterElement.value;
-        if (hasPositionFilter || hasStatusFilter) {
-            applyTableFilters();
+        if (data.resync === false) {
+            applyChanges(data.changes, data.deleted);
         } else {
-            // Update table
-            populateTable(data.data, data.is_admin);
-        }
-
-        // Update analytics if on analytics tab
-        if (document.getElementById('analysisTab') && document.getElementById('analysisTab').classList.contains('active')) {
-            updateMonthlyStats(data.data);
-            updateApplicationStatusChart(data.data);
-            // Update remaining analytics charts
-            // updatePositionChart(data.data); // Removed
+            // Store original data when refreshed
+            originalTableData = JSON.parse(JSON.stringify(data.data)); // Deep copy
+            indexRecords();
         }
+        dataVersion = data.version;
+        currentIsAdmin = data.is_admin;
+        updateAdminControls(data.is_admin);
+        renderLoadedData();
     } catch (error) {
         console.error('Error refreshing data:', error);
         showToast('Error refreshing data', 'danger');
     }
 }
 
+// Redraw the table (and the analytics tab) from originalTableData, keeping the current filters
+function renderLoadedData() {
+    const rows = originalTableData.map(record => ({ ...record }));
+
+    // Apply current search or filter if any
+    const positionFilterElement = document.getElementById('positionFilter');
+    const statusFilterElement = document.getElementById('statusFilter');
+    const hasPositionFilter = positionFilterElement && positionFilterElement.value;
+    const hasStatusFilter = statusFilterElement && statusFilterElement.value;
+    if (getSearchQuery() !== '') {
+        searchCandidates();
+    } else if (hasPositionFilter || hasStatusFilter) {
+        applyTableFilters();
+    } else {
+        // Update table
+        populateTable(rows, currentIsAdmin);
+    }
+
+    refreshFilterFacets();
+
+    // Update analytics if on analytics tab
+    if (document.getElementById('analysisTab') && document.getElementById('analysisTab').classList.contains('active')) {
+        updateMonthlyStats(rows);
+        updateApplicationStatusChart(rows);
+        // Update remaining analytics charts
+        // updatePositionChart(rows); // Removed
+    }
+}
+
+// Split a dataset version ("<epoch>.<number>") into its parts
+function parseDataVersion(version) {
+    const [epoch, number] = String(version).split('.');
+    return { epoch, number: Number(number) };
+}
+
+// Apply other recruiters' edits as they happen (Server-Sent Events)
+function connectLiveUpdates() {
+    if (!window.EventSource) return;
+
+    const events = new EventSource('/api/events');
+    // Sent on every (re)connect: catch up on anything missed while disconnected
+    events.addEventListener('hello', event => {
+        const { version } = JSON.parse(event.data);
+        if (dataVersion && version !== dataVersion) {
+            refreshData();
+        }
+    });
+    events.addEventListener('changes', event => {
+        if (!dataVersion) return; // The first load is still in flight and will include this change
+        const data = JSON.parse(event.data);
+        const incoming = parseDataVersion(data.version);
+        const current = parseDataVersion(dataVersion);
+        if (incoming.epoch !== current.epoch || incoming.number > current.number + 1) {
+            refreshData(); // Missed an update; the change feed fills the gap
+        } else if (incoming.number === current.number + 1) {
+            applyChanges(data.changes, data.deleted);
+            dataVersion = data.version;
+            renderLoadedData();
+        }
+    });
+    events.addEventListener('resync', () => refreshData());
+}
+
 // Update the existing showCandidateDetails function to format dates consistently
-function showCandidateDetails(candidate, index, isAdmin) {
+function showCandidateDetails(candidate, recordId, isAdmin) {
     const modal = document.getElementById('candidateDetailModal');
     const content = document.getElementById('candidateDetailContent');
 
@@ -2600,7 +2855,7 @@ function showCandidateDetails(candidate, index, isAdmin) {
                 if (field === 'Resume' && candidate[field] && candidate[field].toString().startsWith('http')) {
                     const isEditable = editableFields === null || editableFields.includes(field);
                     detailsHTML += `
-                        <div class="candidate-detail-item" data-candidate-index="${index}" data-field-name="${field}" data-editable="${isEditable}">
+                        <div class="candidate-detail-item" data-candidate-id="${recordId}" data-field-name="${field}" data-editable="${isEditable}">
                             <span class="candidate-detail-label">${field}:</span>
                             <span class="candidate-detail-value display-mode" id="display-${field.replace(/\s/g, '')}">
                                 <a href="${candidate[field]}" target="_blank" class="btn btn-outline-primary btn-sm">
@@ -2613,7 +2868,7 @@ function showCandidateDetails(candidate, index, isAdmin) {
                 } else if (field === 'LinkedIn Profile' && candidate[field] && candidate[field].toString().startsWith('http')) {
                     const isEditable = editableFields === null || editableFields.includes(field);
                     detailsHTML += `
-                        <div class="candidate-detail-item" data-candidate-index="${index}" data-field-name="${field}" data-editable="${isEditable}">
+                        <div class="candidate-detail-item" data-candidate-id="${recordId}" data-field-name="${field}" data-editable="${isEditable}">
                             <span class="candidate-detail-label">${field}:</span>
                             <span class="candidate-detail-value display-mode" id="display-${field.replace(/\s/g, '')}">
                                 <a href="${candidate[field]}" target="_blank" class="btn btn-outline-primary btn-sm">
@@ -2641,7 +2896,7 @@ function showCandidateDetails(candidate, index, isAdmin) {
                     });
 
                     detailsHTML += `
-                        <div class="candidate-detail-item" data-candidate-index="${index}" data-field-name="${field}" data-editable="${isEditable}">
+                        <div class="candidate-detail-item" data-candidate-id="${recordId}" data-field-name="${field}" data-editable="${isEditable}">
                             <span class="candidate-detail-label">${field}:</span>
                             <select class="form-select" id="input-${field.replace(/\s/g, '')}" ${!isEditable ? 'disabled style="background-color: #e9ecef; cursor: not-allowed;"' : ''}>
                                 ${optionsHTML}
@@ -2662,7 +2917,7 @@ function showCandidateDetails(candidate, index, isAdmin) {
                     const cursorStyle = isEditable ? 'cursor: pointer;' : 'cursor: default;';
 
                     detailsHTML += `
-                        <div class="candidate-detail-item" data-candidate-index="${index}" data-field-name="${field}" data-editable="${isEditable}">
+                        <div class="candidate-detail-item" data-candidate-id="${recordId}" data-field-name="${field}" data-editable="${isEditable}">
                             <span class="candidate-detail-label">${field}:</span>
                             <span class="candidate-detail-value display-mode ${editableClass}" id="display-${field.replace(/\s/g, '')}" style="${cursorStyle}">${displayValue}</span>
                             <input type="${inputType}" class="form-control edit-mode" id="input-${field.replace(/\s/g, '')}" value="${displayValue}" style="display: none;" ${!isEditable ? 'readonly' : ''}>
@@ -2676,14 +2931,14 @@ function showCandidateDetails(candidate, index, isAdmin) {
     // Add remaining fields (if any) for all users
     {
         Object.entries(candidate).forEach(([field, value]) => {
-            if (!FIELD_ORDER.includes(field) && field !== 'Remarks') { // Exclude Remarks as it's handled separately
+            if (!FIELD_ORDER.includes(field) && field !== 'Remarks' && !isRecordField(field)) { // Exclude Remarks as it's handled separately
                 let displayValue = formatFieldValue(field, value);
                 let inputType = 'text';
 
                 if (field === 'Timestamp') {
                     displayValue = new Date(value).toLocaleDateString();
                     detailsHTML += `
-                        <div class="candidate-detail-item" data-candidate-index="${index}">
+                        <div class="candidate-detail-item" data-candidate-id="${recordId}">
                             <span class="candidate-detail-label">${field}:</span>
                             <span class="candidate-detail-value">${displayValue}</span>
                         </div>
@@ -2695,7 +2950,7 @@ function showCandidateDetails(candidate, index, isAdmin) {
                     const cursorStyle = isEditable ? 'cursor: pointer;' : 'cursor: default;';
 
                     detailsHTML += `
-                        <div class="candidate-detail-item" data-candidate-index="${index}" data-field-name="${field}" data-editable="${isEditable}">
+                        <div class="candidate-detail-item" data-candidate-id="${recordId}" data-field-name="${field}" data-editable="${isEditable}">
                             <span class="candidate-detail-label">${field}:</span>
                             <span class="candidate-detail-value display-mode ${editableClass}" id="display-${field.replace(/\s/g, '')}" style="${cursorStyle}">${displayValue}</span>
                             <input type="${inputType}" class="form-control edit-mode" id="input-${field.replace(/\s/g, '')}" value="${displayValue}" style="display: none;" ${!isEditable ? 'readonly' : ''}>
@@ -2723,19 +2978,11 @@ function showCandidateDetails(candidate, index, isAdmin) {
                 // Only allow changes if editable (admin users)
                 statusSelect.addEventListener('change', () => {
                     const newValue = statusSelect.value;
-                    const candidateIndex = item.dataset.candidateIndex ?? index;
 
                     const updatedCandidate = {};
                     updatedCandidate[fieldName] = newValue;
 
-                    fetch(`/api/data/${candidateIndex}`, {
-                        method: 'PUT',
-                        headers: {
-                            'Content-Type': 'application/json',
-                        },
-                        body: JSON.stringify(updatedCandidate),
-                    })
-                        .then(response => response.json())
+                    putRecord(candidate, updatedCandidate)
                         .then(data => {
                             if (data.status === 'success') {
                                 showToast('Candidate updated successfully!', 'success');
@@ -2792,16 +3039,8 @@ function showCandidateDetails(candidate, index, isAdmin) {
                     // Save single-field update on blur
                     const updatedCandidate = {};
                     updatedCandidate[fieldName] = newValue;
-                    const candidateIndex = item.dataset.candidateIndex ?? index; // Retrieve candidate index
-
-                    fetch(`/api/data/${candidateIndex}`, {
-                        method: 'PUT',
-                        headers: {
-                            'Content-Type': 'application/json',
-                        },
-                        body: JSON.stringify(updatedCandidate),
-                    })
-                        .then(response => response.json())
+
+                    putRecord(candidate, updatedCandidate)
                         .then(data => {
                             if (data.status === 'success') {
                                 showToast('Candidate updated successfully!', 'success');
@@ -2929,21 +3168,9 @@ function showCandidateDetails(candidate, index, isAdmin) {
                 updatedCandidate.Remarks = candidateRemarks.value;
             }
 
-            // Assuming the candidate object passed to showCandidateDetails has an 'originalIndex' or similar identifier
-            // For now, we'll use the index from the global candidates array if available, or pass it from the table click event.
-            // Let's assume for now that `candidate` object has an `id` or `index` property that can be used to identify it.
-            // For this implementation, I'll assume the `candidate` object passed to `showCandidateDetails` has an `index` property.
-            const candidateIndex = index; // This needs to be passed correctly from the table row click
-
-            if (candidateIndex !== undefined) {
-                fetch(`/api/data/${candidateIndex}`, {
-                    method: 'PUT',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(updatedCandidate),
-                })
-                    .then(response => response.json())
+            // The candidate carries its record ID and the version shown in the modal
+            if (candidate._id !== undefined) {
+                putRecord(candidate, updatedCandidate)
                     .then(data => {
                         if (data.status === 'success') {
                             showToast('Candidate updated successfully!', 'success');
@@ -2960,8 +3187,8 @@ function showCandidateDetails(candidate, index, isAdmin) {
                         showToast('Error saving candidate.', 'danger');
                     });
             } else {
-                console.error('Candidate index not found for saving.');
-                showToast('Error: Candidate index not found.', 'danger');
+                console.error('Candidate ID not found for saving.');
+                showToast('Error: Candidate ID not found.', 'danger');
             }
         }
     }
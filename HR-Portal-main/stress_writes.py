@@ -0,0 +1,188 @@
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from excel_storage import ExcelCandidateStorage, ID_FIELD, VERSION_FIELD
+from sqlite_storage import SQLiteCandidateStorage
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Field every worker increments on one shared record, using versioned writes
+COUNTER_FIELD = 'Offered CTC'
+
+
+# Open the candidate storage of a work directory the way app.py does
+def open_storage(work_dir, backend):
+    if backend == 'sqlite':
+        return SQLiteCandidateStorage(os.path.join(work_dir, 'instance', 'candidates.db'))
+    return ExcelCandidateStorage(os.path.join(work_dir, 'data.xlsx'), 'Candidates', None, write_behind=True)
+
+
+# One server process: hammer the API with writes and report what it did
+def run_worker(worker, work_dir, backend, writes, start, results):
+    os.chdir(work_dir)
+    os.environ['CANDIDATE_STORAGE'] = backend
+    os.environ['EXCEL_SAVE_INTERVAL'] = '0.2'
+    sys.path.insert(0, APP_DIR)
+    import app as hr_app
+
+    client = hr_app.app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['username'] = f'stress-{worker}'
+        session['is_admin'] = True
+
+    rows = client.get('/api/data').get_json()['data']
+    own_id = next(row[ID_FIELD] for row in rows if row['Name'] == f'owner-{worker}')
+    counter_id = next(row[ID_FIELD] for row in rows if row['Name'] == 'shared-counter')
+    rng = random.Random(worker)
+    report = {'worker': worker, 'increments': 0, 'conflicts': 0, 'appended': [], 'deleted': [], 'last_comment': None, 'errors': 0}
+
+    start.wait()
+    for i in range(writes):
+        action = rng.random()
+        if action < 0.4:
+            # Versioned read-modify-write of the shared record, retried on 409
+            while True:
+                record = client.get(f'/api/data/{counter_id}').get_json()['record']
+                value = int(record[COUNTER_FIELD] or 0) + 1
+                response = client.put(f'/api/data/{counter_id}', json={COUNTER_FIELD: str(value), VERSION_FIELD: record[VERSION_FIELD]})
+                if response.status_code != 409:
+                    break
+                report['conflicts'] += 1
+            if response.status_code == 200:
+                report['increments'] += 1
+            else:
+                report['errors'] += 1
+        elif action < 0.7:
+            comment = f'worker {worker} write {i}'
+            response = client.put(f'/api/data/{own_id}', json={'Comments': comment})
+            if response.status_code == 200:
+                report['last_comment'] = comment
+            else:
+                report['errors'] += 1
+        elif action < 0.9 or not report['appended']:
+            name = f'stress-{worker}-{i}'
+            response = client.post('/api/data', json={'Name': name, 'Email ID': f'{name}@example.com'})
+            if response.status_code == 200:
+                report['appended'].append(response.get_json()['record'][ID_FIELD])
+            else:
+                report['errors'] += 1
+        else:
+            record_id = report['appended'].pop(rng.randrange(len(report['appended'])))
+            response = client.delete(f'/api/data/{record_id}')
+            if response.status_code == 200:
+                report['deleted'].append(record_id)
+            else:
+                report['errors'] += 1
+
+    # Save what this worker still has pending, as a clean shutdown would
+    if hasattr(hr_app.candidate_storage, 'close'):
+        hr_app.candidate_storage.close()
+    results.put(report)
+
+
+# Check the stored data against what the workers reported
+def verify(work_dir, backend, processes, reports):
+    """Return a list of problems (empty when everything adds up)"""
+    rows = open_storage(work_dir, backend).load()
+    problems = []
+    by_id = {row[ID_FIELD]: row for row in rows}
+    if len(by_id) != len(rows):
+        problems.append(f"duplicate record IDs: {len(rows) - len(by_id)}")
+
+    counter = next(row for row in rows if row['Name'] == 'shared-counter')
+    increments = sum(report['increments'] for report in reports)
+    if int(counter[COUNTER_FIELD] or 0) != increments:
+        problems.append(f"shared counter is {counter[COUNTER_FIELD]}, expected {increments} (lost updates)")
+
+    for report in reports:
+        own = next(row for row in rows if row['Name'] == f"owner-{report['worker']}")
+        if report['last_comment'] is not None and own['Comments'] != report['last_comment']:
+            problems.append(f"worker {report['worker']}: last comment {own['Comments']!r}, expected {report['last_comment']!r}")
+        missing = [record_id for record_id in report['appended'] if record_id not in by_id]
+        if missing:
+            problems.append(f"worker {report['worker']}: appended records missing: {missing}")
+        resurrected = [record_id for record_id in report['deleted'] if record_id in by_id]
+        if resurrected:
+            problems.append(f"worker {report['worker']}: deleted records still present: {resurrected}")
+        if report['errors']:
+            problems.append(f"worker {report['worker']}: {report['errors']} failed requests")
+
+    expected_rows = 1 + processes + sum(len(report['appended']) for report in reports)
+    if len(rows) != expected_rows:
+        problems.append(f"{len(rows)} records stored, expected {expected_rows}")
+    return problems
+
+
+# Fill a fresh work directory with one record per worker and the shared counter
+def prepare(work_dir, backend, processes):
+    # The sample workbook is created in the current directory, as app.py does
+    os.chdir(work_dir)
+    sys.path.insert(0, APP_DIR)
+    import app as hr_app
+    hr_app.create_sample_excel()
+    if backend == 'sqlite':
+        open_storage(work_dir, 'sqlite').migrate_from_excel('data.xlsx', 'Candidates')
+    storage = open_storage(work_dir, backend)
+    rows = storage.load()
+    storage.replace_all(rows, [{'Name': f'owner-{worker}'} for worker in range(processes)] +
+                        [{'Name': 'shared-counter', COUNTER_FIELD: '0'}])
+    if hasattr(storage, 'close'):
+        storage.close()
+
+
+# Start the workers, release them at once and return (reports, seconds taken)
+def run_workers(work_dir, backend, processes, writes, timeout=None):
+    context = multiprocessing.get_context('spawn')
+    start = context.Event()
+    results = context.Queue()
+    workers = [context.Process(target=run_worker, args=(worker, work_dir, backend, writes, start, results))
+               for worker in range(processes)]
+    for process in workers:
+        process.start()
+    time.sleep(2)  # Let every worker import the app and load the data
+    started = time.perf_counter()
+    start.set()
+    reports = [results.get(timeout=timeout) for _ in workers]
+    elapsed = time.perf_counter() - started
+    for process in workers:
+        process.join()
+    return reports, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hammer one copy of the candidate data with writes from several processes')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--writes', type=int, default=50, help='writes per process')
+    parser.add_argument('--storage', choices=['excel', 'sqlite'], default='excel')
+    parser.add_argument('--keep', action='store_true', help='keep the work directory for inspection')
+    args = parser.parse_args()
+
+    # Work on a fresh workbook in a scratch directory, never on the real data
+    work_dir = tempfile.mkdtemp(prefix='hr-stress-')
+    prepare(work_dir, args.storage, args.processes)
+    reports, elapsed = run_workers(work_dir, args.storage, args.processes, args.writes)
+
+    problems = verify(work_dir, args.storage, args.processes, reports)
+    writes = args.processes * args.writes
+    print(f"{args.processes} processes x {args.writes} writes on {args.storage}: {elapsed:.2f}s "
+          f"({writes / elapsed:.1f} writes/s), {sum(report['conflicts'] for report in reports)} version conflicts retried")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print("OK: no lost or duplicated writes")
+    if args.keep:
+        print(f"Work directory: {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import pytest
+
+from candidate_query import query_candidates
+from excel_storage import ID_FIELD
+from sqlite_storage import SQLiteCandidateStorage
+
+CANDIDATES = [
+    {'Name': 'ravi', 'Total Years of Experience': '10', 'Reference': 'Campus'},
+    {'Name': 'Asha', 'Total Years of Experience': '2.5', 'Reference': ''},
+    {'Name': 'meera', 'Total Years of Experience': 'Fresher', 'Reference': 'agency'},
+    {'Name': 'Karan', 'Total Years of Experience': '', 'Reference': '12'},
+    {'Name': 'asha', 'Total Years of Experience': '2.5', 'Reference': 'Campus'},
+]
+
+
+# SQLite storage holding the candidates, IDs 1..5 in list order
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteCandidateStorage(str(tmp_path / 'candidates.db'))
+    storage.replace_all([], CANDIDATES)
+    storage.update_row(storage.load(), 2, {'Comments': 'bumps the version'})
+    assert storage.load()[0]['Reference'] == 'Campus'
+    return storage
+
+
+@pytest.mark.parametrize('sort_key', ['Name', 'Total Years of Experience', ID_FIELD, '_version', 'Reference', 'Unknown'])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_sqlite_sorts_like_the_in_memory_path(storage, sort_key, order):
+    in_memory, _ = query_candidates(storage.load(), {'sort': sort_key, 'order': order})
+    in_sqlite, _ = storage.query({}, sort_key=sort_key, descending=order == 'desc')
+
+    assert [row[ID_FIELD] for row in in_sqlite] == [row[ID_FIELD] for row in in_memory]
+    assert [row['_originalIndex'] for row in in_sqlite] == [row['_originalIndex'] for row in in_memory]
@@ -0,0 +1,78 @@
+from change_log import MAX_CHANGES, ChangeLog
+from excel_storage import ID_FIELD
+
+
+# Log one change of the given record at the next version
+def log_change(log, record_id):
+    log.apply(None, {ID_FIELD: record_id})
+    log.committed(log.version + 1)
+
+
+def test_changes_since_a_version():
+    log = ChangeLog()
+    log.reset([])
+    log.committed(1)
+    log_change(log, 10)
+    log_change(log, 11)
+    log_change(log, 10)
+
+    assert log.changed_since(1) == ({10, 11}, 4)
+    assert log.changed_since(3) == ({10}, 4)
+    assert log.changed_since(4) == (set(), 4)
+
+
+def test_log_is_trimmed_at_the_limit():
+    log = ChangeLog()
+    for record_id in range(MAX_CHANGES + 1):
+        log_change(log, record_id)
+
+    assert log.stats() == {'entries': MAX_CHANGES, 'oldest': 1, 'version': MAX_CHANGES + 1}
+    # The change made at version 1 was dropped, so a client at version 0 must resync
+    assert log.changed_since(0) == (None, MAX_CHANGES + 1)
+    changed, _ = log.changed_since(1)
+    assert len(changed) == MAX_CHANGES and 0 not in changed
+
+
+def test_reset_clears_the_log():
+    log = ChangeLog()
+    log_change(log, 1)
+    log_change(log, 2)
+    log.reset([])
+    log.committed(3)
+
+    assert log.stats() == {'entries': 0, 'oldest': 3, 'version': 3}
+    assert log.changed_since(1) == (None, 3)
+    assert log.changed_since(3) == (set(), 3)
+
+
+def test_changes_endpoint(client):
+    response = client.get('/api/data').get_json()
+    version = response['version']
+    record_id = response['data'][0][ID_FIELD]
+    client.put(f'/api/data/{record_id}', json={'Comments': 'called back'})
+    added = client.post('/api/data', json={'Name': 'Meera', 'Email ID': 'meera@example.com'}).get_json()['record']
+
+    changes = client.get(f'/api/data/changes?since={version}').get_json()
+    assert changes['resync'] is False
+    assert [record[ID_FIELD] for record in changes['changes']] == [record_id, added[ID_FIELD]]
+    assert changes['deleted'] == []
+
+    client.delete(f"/api/data/{added[ID_FIELD]}")
+    changes = client.get(f"/api/data/changes?since={changes['version']}").get_json()
+    assert changes['resync'] is False
+    assert changes['changes'] == [] and changes['deleted'] == [added[ID_FIELD]]
+
+
+def test_changes_endpoint_asks_for_a_resync_past_the_log(hr_app, client, monkeypatch):
+    monkeypatch.setattr(hr_app.change_log, 'max_changes', 2)
+    response = client.get('/api/data').get_json()
+    version = response['version']
+    for row in response['data'][:3]:
+        client.put(f"/api/data/{row[ID_FIELD]}", json={'Comments': 'called back'})
+
+    changes = client.get(f'/api/data/changes?since={version}').get_json()
+    assert changes['resync'] is True
+    assert len(changes['data']) == len(response['data'])
+
+    # So does a version from another process or an earlier run
+    assert client.get('/api/data/changes?since=other.1').get_json()['resync'] is True
@@ -0,0 +1,43 @@
+import openpyxl
+
+from excel_storage import (DESIRED_FIELDS, RECORD_FIELDS, ExcelCandidateStorage, headers_need_migration,
+                           order_headers)
+
+# A legacy header row: an extra column, the old remarks name and most desired fields missing
+LEGACY_HEADERS = ['Date', 'Name', 'Reference', 'Email ID', 'Initial Remarks']
+
+
+# Write a one-row workbook with the legacy headers
+def legacy_workbook(path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Candidates'
+    sheet.append(LEGACY_HEADERS)
+    sheet.append(['2024-01-02', 'Asha', 'Campus', 'asha@example.com', 'Good fit'])
+    workbook.save(path)
+
+
+def test_order_headers_is_stable():
+    headers = ['Date', 'Name', 'Reference', 'Email ID']
+    ordered = order_headers(headers)
+    assert ordered == ['Date'] + DESIRED_FIELDS + ['Reference'] + RECORD_FIELDS
+    assert order_headers(ordered) == ordered
+    assert headers_need_migration(headers)
+    assert not headers_need_migration(ordered)
+
+
+def test_migrated_sheet_needs_no_second_migration(tmp_path):
+    path = str(tmp_path / 'data.xlsx')
+    legacy_workbook(path)
+    storage = ExcelCandidateStorage(path, 'Candidates', lambda: None)
+    assert storage.needs_header_migration()
+
+    rows = storage.load()
+    storage.replace_all(rows, [dict(row) for row in rows])
+
+    headers = storage.read_headers()
+    assert not storage.needs_header_migration()
+    assert not headers_need_migration(order_headers(headers))
+    row = storage.load()[0]
+    assert row['Reference'] == 'Campus'
+    assert row['Initial Screening'] == 'Good fit'
@@ -0,0 +1,85 @@
+import openpyxl
+
+from excel_storage import CANDIDATE_HEADERS, ID_FIELD, NEXT_ID_PROPERTY, RECORD_FIELDS, VERSION_FIELD, ExcelCandidateStorage
+
+SHEET_NAME = 'Candidates'
+
+
+# Write a workbook with the given (name, _id, _version) rows
+def write_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = SHEET_NAME
+    sheet.append(CANDIDATE_HEADERS + RECORD_FIELDS)
+    for name, record_id, version in rows:
+        sheet.append(['2024-01-02', name] + [None] * (len(CANDIDATE_HEADERS) - 2) + [record_id, version])
+    workbook.save(path)
+
+
+# Open storage that saves on every write
+def open_storage(path):
+    return ExcelCandidateStorage(path, SHEET_NAME, None)
+
+
+def test_new_rows_get_increasing_ids_that_survive_a_reload(tmp_path):
+    path = str(tmp_path / 'data.xlsx')
+    write_workbook(path, [('Asha', 1, 1), ('Ravi', 2, 1)])
+    storage = open_storage(path)
+    rows = storage.load()
+    added = storage.append_rows(rows, [{'Name': 'Meera'}, {'Name': 'Karan'}])
+    assert [record[ID_FIELD] for record in added] == [3, 4]
+    assert all(record[VERSION_FIELD] == 1 for record in added)
+    storage.delete_row(rows, 3)
+
+    # The next ID is kept in the workbook, so the deleted ID 4 is never reused
+    assert openpyxl.load_workbook(path).custom_doc_props[NEXT_ID_PROPERTY].value == 5
+    reopened = open_storage(path)
+    rows = reopened.load()
+    assert [row[ID_FIELD] for row in rows] == [1, 2, 3]
+    assert reopened.append_row(rows, {'Name': 'Divya'})[ID_FIELD] == 5
+
+
+def test_duplicate_and_missing_ids_are_renumbered(tmp_path):
+    path = str(tmp_path / 'data.xlsx')
+    write_workbook(path, [('Asha', 7, 3), ('Ravi', 7, 1), ('Meera', None, None), ('Karan', 'x', 2)])
+    rows = open_storage(path).load()
+
+    ids = [row[ID_FIELD] for row in rows]
+    assert ids[0] == 7 and rows[0][VERSION_FIELD] == 3
+    assert len(set(ids)) == len(ids)
+    assert all(record_id > 7 for record_id in ids[1:])
+    assert all(row[VERSION_FIELD] >= 1 for row in rows)
+
+    # The new numbers were saved: loading again gives the same IDs
+    assert [row[ID_FIELD] for row in open_storage(path).load()] == ids
+
+
+def test_update_with_a_stale_version_is_rejected(hr_app, client):
+    record = client.get('/api/data').get_json()['data'][0]
+    record_id, version = record[ID_FIELD], record[VERSION_FIELD]
+
+    response = client.put(f'/api/data/{record_id}', json={'Comments': 'first', VERSION_FIELD: version})
+    assert response.status_code == 200
+    assert response.get_json()['record'][VERSION_FIELD] == version + 1
+
+    response = client.put(f'/api/data/{record_id}', json={'Comments': 'stale', VERSION_FIELD: version})
+    assert response.status_code == 409
+    assert response.get_json()['record'][VERSION_FIELD] == version + 1
+
+    # Unchanged both in memory and in the stored data
+    for reload in (False, True):
+        if reload:
+            hr_app.candidate_store.invalidate()
+        current = client.get(f'/api/data/{record_id}').get_json()['record']
+        assert current['Comments'] == 'first'
+        assert current[VERSION_FIELD] == version + 1
+
+
+def test_delete_with_a_stale_version_is_rejected(client):
+    record = client.get('/api/data').get_json()['data'][0]
+    record_id, version = record[ID_FIELD], record[VERSION_FIELD]
+    client.put(f'/api/data/{record_id}', json={'Comments': 'changed'})
+
+    response = client.delete(f'/api/data/{record_id}?version={version}')
+    assert response.status_code == 409
+    assert client.get(f'/api/data/{record_id}').status_code == 200
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from row_store import MAX_POOLED_VALUES, CompactRow, RowSchema, record_dict
+
+RECORD = {'Name': 'Asha', 'Application Status': 'Rejected', 'In Notice': 'No', '_id': 1, '_version': 2}
+
+
+def test_compact_row_reads_like_the_dict():
+    row = RowSchema().compact(RECORD)
+
+    assert type(row) is CompactRow
+    assert list(row.keys()) == list(RECORD.keys())
+    assert list(row.items()) == list(RECORD.items())
+    assert len(row) == len(RECORD)
+    assert row['Name'] == 'Asha'
+    assert row.get('Name') == 'Asha'
+    assert row.get('Comments') is None
+    assert row.get('Comments', '') == ''
+    assert 'Name' in row and 'Comments' not in row
+    assert row == RECORD and RECORD == row
+    assert {**row} == RECORD
+    assert record_dict(row) == RECORD and type(record_dict(row)) is dict
+    assert record_dict(RECORD) == RECORD and record_dict(RECORD) is not RECORD
+
+
+def test_compact_row_serializes_like_the_dict(hr_app):
+    row = RowSchema().compact(RECORD)
+    assert hr_app.app.json.dumps(row) == hr_app.app.json.dumps(RECORD)
+    assert json.loads(hr_app.app.json.dumps([row])) == [RECORD]
+
+
+def test_rows_with_other_fields():
+    schema = RowSchema()
+    first = schema.compact(RECORD)
+    extra = schema.compact({'Name': 'Ravi', 'Reference': 'Campus'})
+
+    # Rows built before a field was seen simply do not have it, and vice versa
+    assert 'Reference' not in first and first == RECORD
+    assert extra == {'Name': 'Ravi', 'Reference': 'Campus'}
+    assert list(extra) == ['Name', 'Reference']
+    assert len(extra) == 2
+    with pytest.raises(KeyError):
+        extra['In Notice']
+
+
+def test_low_cardinality_values_are_pooled():
+    schema = RowSchema()
+    rows = [schema.compact({'Name': f'n{i}', 'Status': ''.join(['Rej', 'ected'])}) for i in range(3)]
+    assert rows[0]['Status'] is rows[1]['Status'] is rows[2]['Status']
+
+
+def test_values_stop_being_pooled_past_the_limit():
+    schema = RowSchema()
+    for i in range(MAX_POOLED_VALUES + 1):
+        schema.compact({'Name': f'name {i}', 'Status': 'Rejected'})
+
+    # Names have more distinct values than the limit; statuses are still pooled
+    assert schema.pools[schema.positions['Name']] is None
+    assert schema.pools[schema.positions['Status']] == {'Rejected': 'Rejected'}
+    first = schema.compact({'Name': ''.join(['name ', '0']), 'Status': 'Rejected'})
+    second = schema.compact({'Name': ''.join(['name ', '0']), 'Status': 'Rejected'})
+    assert first['Name'] == second['Name'] and first['Name'] is not second['Name']
@@ -0,0 +1,18 @@
+import pytest
+
+from stress_writes import prepare, run_workers, verify
+
+PROCESSES = 3
+WRITES = 10
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('backend', ['excel', 'sqlite'])
+def test_concurrent_writes_are_neither_lost_nor_duplicated(backend, tmp_path, monkeypatch):
+    # prepare() works in the data directory; chdir through monkeypatch so it is undone
+    monkeypatch.chdir(tmp_path)
+    prepare(str(tmp_path), backend, PROCESSES)
+    reports, _ = run_workers(str(tmp_path), backend, PROCESSES, WRITES, timeout=120)
+
+    assert len(reports) == PROCESSES
+    assert verify(str(tmp_path), backend, PROCESSES, reports) == []
@@ -0,0 +1,117 @@
+import json
+import os
+
+import openpyxl
+
+from excel_storage import CANDIDATE_HEADERS, ID_FIELD, VERSION_FIELD, ExcelCandidateStorage
+from write_journal import Journal, save_atomically
+
+SHEET_NAME = 'Candidates'
+
+
+# Write a workbook with two candidates and no record IDs yet
+def new_workbook(path):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = SHEET_NAME
+    sheet.append(CANDIDATE_HEADERS)
+    sheet.append(['2024-01-02', 'Asha', 'asha@example.com'])
+    sheet.append(['2024-01-03', 'Ravi', 'ravi@example.com'])
+    workbook.save(path)
+
+
+# Open write-behind storage whose background saver never gets to run during a test
+def open_storage(path):
+    return ExcelCandidateStorage(path, SHEET_NAME, lambda: new_workbook(path), write_behind=True, save_interval=3600)
+
+
+# Stop a storage without saving, as a crash would
+def crash(storage):
+    storage.saver.stop()
+
+
+# Make one update, one append and one delete through the storage
+def make_writes(storage):
+    rows = storage.load()
+    storage.update_row(rows, 0, {'Comments': 'called back'})
+    storage.append_row(rows, {'Name': 'Meera', 'Email ID': 'meera@example.com'})
+    storage.delete_row(rows, 1)
+    return rows
+
+
+# The rows as plain (name, id, version, comments) tuples, for comparing two loads
+def summary(rows):
+    return [(row['Name'], row[ID_FIELD], row[VERSION_FIELD], row['Comments']) for row in rows]
+
+
+def test_journal_ignores_a_truncated_last_line(tmp_path):
+    journal = Journal(str(tmp_path / 'data.xlsx.journal'))
+    journal.append({'op': 'delete', ID_FIELD: 1})
+    journal.append({'op': 'delete', ID_FIELD: 2})
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'delete', ID_FIELD: 3})[:10])
+
+    assert journal.entries() == [{'op': 'delete', ID_FIELD: 1}, {'op': 'delete', ID_FIELD: 2}]
+
+
+def test_journal_left_by_a_crash_is_replayed_on_open(tmp_path):
+    path = str(tmp_path / 'data.xlsx')
+    storage = open_storage(path)
+    expected = summary(make_writes(storage))
+    crash(storage)
+    assert len(Journal(path + '.journal').entries()) == 3
+
+    reopened = open_storage(path)
+    assert summary(reopened.load()) == expected
+    assert reopened.replayed == 3
+    crash(reopened)
+
+
+def test_truncated_last_entry_is_not_replayed(tmp_path):
+    path = str(tmp_path / 'data.xlsx')
+    storage = open_storage(path)
+    rows = storage.load()
+    storage.update_row(rows, 0, {'Comments': 'called back'})
+    expected = summary(rows)
+    crash(storage)
+    # A write that was cut off before it was acknowledged
+    with open(path + '.journal', 'a', encoding='utf-8') as f:
+        f.write('{"op": "delete", "_id": ')
+
+    reopened = open_storage(path)
+    assert summary(reopened.load()) == expected
+    assert reopened.replayed == 1
+    crash(reopened)
+
+
+def test_crash_between_save_and_journal_clear_does_not_apply_writes_twice(tmp_path):
+    path = str(tmp_path / 'data.xlsx')
+    storage = open_storage(path)
+    expected = summary(make_writes(storage))
+    # The workbook reached the disk, but the journal was never cleared
+    save_atomically(storage._workbook, path)
+    crash(storage)
+    assert len(Journal(path + '.journal').entries()) == 3
+
+    reopened = open_storage(path)
+    rows = reopened.load()
+    assert summary(rows) == expected
+    assert len({row[ID_FIELD] for row in rows}) == len(rows)
+    crash(reopened)
+
+
+def test_flush_saves_the_workbook_and_clears_the_journal(tmp_path):
+    path = str(tmp_path / 'data.xlsx')
+    storage = open_storage(path)
+    expected = summary(make_writes(storage))
+    assert os.path.exists(path + '.journal')
+
+    storage.flush()
+    assert not os.path.exists(path + '.journal')
+    assert storage.persistence_stats()['pending_writes'] == 0
+    crash(storage)
+
+    reopened = open_storage(path)
+    assert summary(reopened.load()) == expected
+    assert reopened.replayed == 0
+    crash(reopened)
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+
+# Seconds between background saves of the workbook while writes are pending
+SAVE_INTERVAL = 2.0
+
+
+class Journal:
+    """Append-only file of JSON lines, each flushed to disk before append() returns.
+
+    Holds the writes made since the workbook was last saved. A crash can
+    leave a half-written last line, which entries() ignores: its write was
+    never acknowledged.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.appended = 0
+
+    def append(self, entry):
+        # Opened per entry: another process may have cleared the journal since
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.appended += 1
+
+    def entries(self):
+        """Return the complete entries in the order they were written"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+        return entries
+
+    def clear(self):
+        """Drop every entry once the workbook holds them"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+# Save a workbook through a temporary file so a crash never leaves half a workbook
+def save_atomically(workbook, path):
+    temp_path = path + '.saving'
+    workbook.save(temp_path)
+    with open(temp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+class BackgroundSaver:
+    """Daemon thread that calls flush() every interval seconds once started"""
+
+    def __init__(self, flush, interval=SAVE_INTERVAL):
+        self.flush = flush
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self):
+        # Threads do not survive a fork, so a forked worker starts its own
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='workbook-saver', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                # The journal still holds the writes; try again next time
+                print(f"Error saving workbook in the background: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,4 +1,8 @@
 from app import app
 
+# The candidate data is warmed up by each worker process on its first request
+# (e.g. a /api/ready probe), not here: under a preloading server this module is
+# imported by the master before it forks, and threads do not survive a fork
+
 if __name__ == '__main__':
     app.run()
\ No newline at end of file